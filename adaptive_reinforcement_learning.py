@@ -4,7 +4,6 @@ Enables agents to learn from business outcomes and auto-optimize strategies
 """
 
 import asyncio
-import json
 import logging
 import numpy as np
 import pandas as pd
@@ -37,6 +36,7 @@ except ImportError:
     print("Warning: PyTorch not available, using simplified RL")
 
 from config import config
+from episode_sink import EpisodeSink, create_episode_sink
 from utils import generate_id, log
 
 # Configure structured logging
@@ -243,15 +243,202 @@ class SimpleQTable:
         if not self.q_table[state]:
             return 0.0
         return max(self.q_table[state].values())
+    
+    def summary(self) -> Dict[str, Any]:
+        """Table size and value statistics."""
+        return {
+            "total_states": len(self.q_table),
+            "total_actions": sum(len(actions) for actions in self.q_table.values()),
+            "average_q_value": np.mean([max(q.values()) for q in self.q_table.values() if q]) if self.q_table else 0
+        }
+
+class NumpyQTable:
+    """Q-learning table on a dense NumPy array with interned states and actions.
+    
+    Same interface as SimpleQTable, plus ``update_batch`` which applies many
+    transitions with array operations.
+    """
+    
+    def __init__(
+        self,
+        actions: Optional[List[str]] = None,
+        learning_rate: float = 0.1,
+        discount_factor: float = 0.95,
+        epsilon: float = 0.1,
+        initial_states: int = 64
+    ):
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon
+        self.state_index: Dict[str, int] = {}
+        self.action_index: Dict[str, int] = {}
+        self.actions: List[str] = []
+        self.values = np.zeros((initial_states, max(len(actions or []), 4)), dtype=np.float64)
+        self.visited = np.zeros(self.values.shape, dtype=bool)
+        self.action_counts = np.zeros(self.values.shape[1], dtype=np.int64)
+        self._action_columns: Dict[Tuple[str, ...], np.ndarray] = {}
+        for action in actions or []:
+            self._intern_action(action)
+    
+    def _intern_state(self, state: str) -> int:
+        index = self.state_index.get(state)
+        if index is None:
+            index = self.state_index[state] = len(self.state_index)
+            if index >= self.values.shape[0]:
+                self._grow(rows=self.values.shape[0] * 2)
+        return index
+    
+    def _intern_action(self, action: str) -> int:
+        index = self.action_index.get(action)
+        if index is None:
+            index = self.action_index[action] = len(self.actions)
+            self.actions.append(action)
+            if index >= self.values.shape[1]:
+                self._grow(columns=self.values.shape[1] * 2)
+        return index
+    
+    def _grow(self, rows: Optional[int] = None, columns: Optional[int] = None):
+        old_rows, old_columns = self.values.shape
+        shape = (rows or old_rows, columns or old_columns)
+        values = np.zeros(shape, dtype=self.values.dtype)
+        visited = np.zeros(shape, dtype=bool)
+        values[:old_rows, :old_columns] = self.values
+        visited[:old_rows, :old_columns] = self.visited
+        self.values, self.visited = values, visited
+        if columns:
+            self.action_counts = np.concatenate([
+                self.action_counts, np.zeros(columns - old_columns, dtype=np.int64)
+            ])
+    
+    def _columns(self, actions: List[str]) -> np.ndarray:
+        key = tuple(actions)
+        columns = self._action_columns.get(key)
+        if columns is None:
+            columns = np.array([self._intern_action(action) for action in actions], dtype=np.int64)
+            self._action_columns[key] = columns
+        return columns
+    
+    def get_action(self, state: str, available_actions: List[str]) -> str:
+        """Get action using epsilon-greedy policy."""
+        index = self.state_index.get(state)
+        if index is None or np.random.random() < self.epsilon:
+            return np.random.choice(available_actions)
+        
+        row = self.values[index, self._columns(available_actions)]
+        best = np.flatnonzero(row == row.max())
+        return available_actions[np.random.choice(best)]
+    
+    def update(self, state: str, action: str, reward: float, next_state: str, next_actions: List[str]):
+        """Update Q-table using Q-learning algorithm."""
+        self.update_batch([state], [action], [reward], [next_state], next_actions)
+    
+    def update_batch(
+        self,
+        states: List[str],
+        actions: List[str],
+        rewards: List[float],
+        next_states: List[str],
+        next_actions: List[str]
+    ):
+        """Apply many transitions at once.
+        
+        TD errors are computed against the table as it was before the batch;
+        repeated state/action pairs move by their mean error.
+        """
+        state_rows = np.fromiter((self._intern_state(s) for s in states), dtype=np.int64, count=len(states))
+        next_rows = np.fromiter((self._intern_state(s) for s in next_states), dtype=np.int64, count=len(next_states))
+        action_columns = np.fromiter((self._intern_action(a) for a in actions), dtype=np.int64, count=len(actions))
+        rewards = np.asarray(rewards, dtype=np.float64)
+        
+        if next_actions:
+            next_max_q = self.values[np.ix_(next_rows, self._columns(next_actions))].max(axis=1)
+        else:
+            next_max_q = np.zeros(len(states))
+        td_errors = rewards + self.discount_factor * next_max_q - self.values[state_rows, action_columns]
+        
+        flat = state_rows * self.values.shape[1] + action_columns
+        cells, inverse, counts = np.unique(flat, return_inverse=True, return_counts=True)
+        mean_errors = np.bincount(inverse, weights=td_errors) / counts
+        self.values.reshape(-1)[cells] += self.learning_rate * mean_errors
+        self.visited.reshape(-1)[cells] = True
+        np.add.at(self.action_counts, action_columns, 1)
+    
+    def get_state_value(self, state: str) -> float:
+        """Get the maximum Q-value for a state."""
+        index = self.state_index.get(state)
+        if index is None or not self.visited[index].any():
+            return 0.0
+        return float(self.values[index][self.visited[index]].max())
+    
+    def summary(self) -> Dict[str, Any]:
+        """Table size and value statistics."""
+        rows = len(self.state_index)
+        visited = self.visited[:rows]
+        seen = visited.any(axis=1)
+        best = np.where(visited, self.values[:rows], -np.inf).max(axis=1) if rows else np.array([])
+        return {
+            "total_states": rows,
+            "total_actions": int(visited.sum()),
+            "average_q_value": float(best[seen].mean()) if seen.any() else 0
+        }
+
+Q_TABLE_TYPES = (SimpleQTable, NumpyQTable)
+
+class EpisodeReplayBuffer:
+    """Fixed-capacity ring buffer of learning episodes for one agent type."""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._episodes = np.empty(capacity, dtype=object)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # epoch seconds
+        self.total_added = 0
+    
+    def append(self, episode: 'LearningEpisode'):
+        """Add an episode, overwriting the oldest once full."""
+        slot = self.total_added % self.capacity
+        self._episodes[slot] = episode
+        self.rewards[slot] = episode.reward
+        self.timestamps[slot] = episode.timestamp.timestamp()
+        self.total_added += 1
+    
+    def since(self, position: int) -> Tuple[List['LearningEpisode'], int]:
+        """Episodes added after ``position`` (an earlier total_added), oldest first, and the new position."""
+        start = max(position, self.total_added - self.capacity)
+        slots = np.arange(start, self.total_added) % self.capacity
+        return list(self._episodes[slots]), self.total_added
+    
+    def count_since(self, timestamp: float) -> int:
+        """Number of retained episodes at or after an epoch timestamp."""
+        return int(np.count_nonzero(self.timestamps[:len(self)] >= timestamp))
+    
+    def __len__(self) -> int:
+        return min(self.total_added, self.capacity)
 
 class AdaptiveReinforcementLearning:
     """Adaptive reinforcement learning system for self-evolving agents."""
     
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, redis_client: Optional[redis.Redis] = None, episode_sink: Optional[EpisodeSink] = None):
         self.redis_client = redis_client or redis.Redis.from_url(config.database.url.replace('sqlite', 'redis'))
+        rl_config = config.reinforcement_learning
+        self.episode_sink = episode_sink or create_episode_sink(
+            rl_config.episode_sink,
+            self.redis_client,
+            path=rl_config.episode_log_path,
+            max_per_type=rl_config.replay_capacity,
+            retention_days=rl_config.episode_retention_days,
+            max_batch_size=rl_config.sink_batch_size,
+            flush_interval=rl_config.sink_flush_interval,
+            max_buffered=rl_config.sink_max_buffered
+        )
         self.reward_calculator = RewardCalculator()
         self.agents = {}
-        self.episodes = []
+        self.replay_buffers = {
+            agent_type: EpisodeReplayBuffer(config.reinforcement_learning.replay_capacity)
+            for agent_type in AgentType
+        }
+        # Replay buffer position each agent's model has learned up to
+        self._learned_positions = {agent_type: 0 for agent_type in AgentType}
         self.learning_enabled = True
         self.min_episodes_for_learning = 10
         self.performance_threshold = 0.6
@@ -269,10 +456,27 @@ class AdaptiveReinforcementLearning:
                 self.agents[agent_type] = self._create_stable_baselines_model(agent_type)
             else:
                 # Use simple Q-learning table
-                self.agents[agent_type] = SimpleQTable()
+                self.agents[agent_type] = self._create_q_table(agent_type)
         
         logger.info(f"Initialized learning models for {len(self.agents)} agent types")
     
+    def _create_q_table(self, agent_type: AgentType):
+        """Create the configured Q-table for agent type."""
+        if config.reinforcement_learning.q_table_backend == 'numpy':
+            return NumpyQTable(actions=self._get_available_actions(agent_type))
+        return SimpleQTable()
+    
+    @property
+    def episodes(self) -> List[LearningEpisode]:
+        """Retained episodes across agent types, oldest first."""
+        episodes = [ep for buffer in self.replay_buffers.values() for ep in buffer.since(0)[0]]
+        return sorted(episodes, key=lambda ep: ep.timestamp)
+    
+    @property
+    def total_episodes(self) -> int:
+        """Episodes recorded since startup, including ones no longer retained."""
+        return sum(buffer.total_added for buffer in self.replay_buffers.values())
+    
     def _create_stable_baselines_model(self, agent_type: AgentType):
         """Create stable-baselines3 model for agent type."""
         # Define action and observation spaces based on agent type
@@ -305,62 +509,101 @@ class AdaptiveReinforcementLearning:
             metadata=metadata
         )
         
-        self.episodes.append(episode)
+        self.replay_buffers[agent_type].append(episode)
         
-        # Store in Redis for persistence
-        if self.redis_client:
-            await self._store_episode_redis(episode)
+        # Persisted in batches off the event loop
+        if self.episode_sink:
+            self.episode_sink.record(episode)
         
         # Trigger learning if enough episodes
-        if len(self.episodes) >= self.min_episodes_for_learning:
+        if self.total_episodes >= self.min_episodes_for_learning:
             await self._trigger_learning(agent_type)
         
         logger.info(f"Recorded episode for {agent_type.value}", 
                    episode_id=episode.episode_id, reward=reward)
     
-    async def _store_episode_redis(self, episode: LearningEpisode):
-        """Store episode in Redis."""
+    async def warm_start(self, limit: Optional[int] = None) -> int:
+        """Reload stored episodes into the replay buffers and learn from them.
+        
+        Returns the number of episodes loaded.
+        """
+        if not self.episode_sink:
+            return 0
+        limit = limit or config.reinforcement_learning.replay_capacity
         try:
-            episode_data = {
-                'episode_id': episode.episode_id,
-                'agent_type': episode.agent_type.value,
-                'state': json.dumps(episode.state),
-                'action': json.dumps(episode.action.__dict__),
-                'reward': episode.reward,
-                'next_state': json.dumps(episode.next_state),
-                'done': episode.done,
-                'metadata': json.dumps(episode.metadata),
-                'timestamp': episode.timestamp.isoformat()
-            }
-            
-            # Store in Redis hash
-            key = f"rl_episode:{episode.episode_id}"
-            self.redis_client.hset(key, mapping=episode_data)
-            self.redis_client.expire(key, 86400 * 30)  # 30 days TTL
-            
+            stored = await asyncio.to_thread(
+                self.episode_sink.load, [agent_type.value for agent_type in AgentType], limit
+            )
         except Exception as e:
-            logger.error(f"Failed to store episode in Redis: {e}")
+            logger.error(f"Failed to reload episodes: {e}")
+            return 0
+        
+        loaded = 0
+        for agent_type_value, records in stored.items():
+            agent_type = AgentType(agent_type_value)
+            for record in records:
+                try:
+                    self.replay_buffers[agent_type].append(self._episode_from_dict(record))
+                    loaded += 1
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable stored episode: {e}")
+            await self._trigger_learning(agent_type)
+        
+        logger.info("Reloaded episodes from storage", episodes=loaded)
+        return loaded
+    
+    @staticmethod
+    def _episode_from_dict(record: Dict[str, Any]) -> LearningEpisode:
+        """Rebuild an episode written by the episode sink."""
+        action = record.get('action')
+        if action is not None:
+            action = AgentAction(
+                agent_type=AgentType(action['agent_type']),
+                action_type=action['action_type'],
+                parameters=action.get('parameters', {}),
+                context=action.get('context', {}),
+                language=action.get('language', 'en'),
+                timestamp=datetime.fromisoformat(action['timestamp']),
+                confidence=action.get('confidence', 0.0)
+            )
+        return LearningEpisode(
+            episode_id=record['episode_id'],
+            agent_type=AgentType(record['agent_type']),
+            state=record['state'],
+            action=action,
+            reward=record['reward'],
+            next_state=record['next_state'],
+            done=record['done'],
+            metadata=record.get('metadata', {}),
+            timestamp=datetime.fromisoformat(record['timestamp'])
+        )
+    
+    def close(self):
+        """Write any buffered episodes and stop the sink."""
+        if self.episode_sink:
+            self.episode_sink.close()
     
     async def _trigger_learning(self, agent_type: AgentType):
-        """Trigger learning process for agent type."""
+        """Learn from the transitions recorded since the last update."""
         try:
-            # Get recent episodes for this agent type
-            recent_episodes = [
-                ep for ep in self.episodes[-100:]  # Last 100 episodes
-                if ep.agent_type == agent_type
-            ]
+            buffer = self.replay_buffers[agent_type]
+            if len(buffer) < 5:
+                return
             
-            if len(recent_episodes) < 5:
+            new_episodes, position = buffer.since(self._learned_positions[agent_type])
+            if not new_episodes:
                 return
+            # Advance first so a malformed episode is not replayed on every call
+            self._learned_positions[agent_type] = position
             
             # Update learning model
-            if isinstance(self.agents[agent_type], SimpleQTable):
-                await self._update_q_table(agent_type, recent_episodes)
+            if isinstance(self.agents[agent_type], Q_TABLE_TYPES):
+                await self._update_q_table(agent_type, new_episodes)
             else:
-                await self._update_stable_baselines_model(agent_type, recent_episodes)
+                await self._update_stable_baselines_model(agent_type, new_episodes)
             
             logger.info(f"Triggered learning for {agent_type.value}", 
-                       episodes_used=len(recent_episodes))
+                       episodes_used=len(new_episodes))
             
         except Exception as e:
             logger.error(f"Failed to trigger learning for {agent_type.value}: {e}")
@@ -369,6 +612,16 @@ class AdaptiveReinforcementLearning:
         """Update Q-table with recent episodes."""
         q_table = self.agents[agent_type]
         
+        if isinstance(q_table, NumpyQTable):
+            q_table.update_batch(
+                [self._state_to_string(ep.state) for ep in episodes],
+                [self._action_to_string(ep.action) for ep in episodes],
+                [ep.reward for ep in episodes],
+                [self._state_to_string(ep.next_state) for ep in episodes],
+                self._get_available_actions(agent_type)
+            )
+            return
+        
         for episode in episodes:
             state_str = self._state_to_string(episode.state)
             next_state_str = self._state_to_string(episode.next_state)
@@ -432,7 +685,7 @@ class AdaptiveReinforcementLearning:
             # Convert state to string for Q-learning
             state_str = self._state_to_string(current_state)
             
-            if isinstance(self.agents[agent_type], SimpleQTable):
+            if isinstance(self.agents[agent_type], Q_TABLE_TYPES):
                 # Use Q-table to get action
                 available_actions = self._get_available_actions(agent_type)
                 action_str = self.agents[agent_type].get_action(state_str, available_actions)
@@ -539,19 +792,14 @@ class AdaptiveReinforcementLearning:
             if agent in self.agents:
                 model = self.agents[agent]
                 
-                if isinstance(model, SimpleQTable):
+                if isinstance(model, Q_TABLE_TYPES):
                     # Calculate Q-table performance metrics
-                    total_states = len(model.q_table)
-                    total_actions = sum(len(actions) for actions in model.q_table.values())
-                    avg_q_value = np.mean([max(q_values.values()) for q_values in model.q_table.values()]) if model.q_table else 0
-                    
                     performance[agent.value] = {
                         "model_type": "q_table",
-                        "total_states": total_states,
-                        "total_actions": total_actions,
-                        "average_q_value": avg_q_value,
+                        **model.summary(),
                         "learning_rate": model.learning_rate,
-                        "epsilon": model.epsilon
+                        "epsilon": model.epsilon,
+                        "buffered_episodes": len(self.replay_buffers[agent])
                     }
                 else:
                     performance[agent.value] = {
@@ -561,14 +809,15 @@ class AdaptiveReinforcementLearning:
                     }
         
         # Overall performance metrics
-        total_episodes = len(self.episodes)
-        recent_episodes = [ep for ep in self.episodes if (datetime.utcnow() - ep.timestamp).days < 7]
+        week_ago = (datetime.utcnow() - timedelta(days=7)).timestamp()
+        recent_episodes = sum(buffer.count_since(week_ago) for buffer in self.replay_buffers.values())
         
         performance["overall"] = {
-            "total_episodes": total_episodes,
-            "recent_episodes": len(recent_episodes),
+            "total_episodes": self.total_episodes,
+            "recent_episodes": recent_episodes,
             "learning_enabled": self.learning_enabled,
-            "min_episodes_for_learning": self.min_episodes_for_learning
+            "min_episodes_for_learning": self.min_episodes_for_learning,
+            "episode_sink": self.episode_sink.get_stats() if self.episode_sink else None
         }
         
         return performance
@@ -581,7 +830,7 @@ class AdaptiveReinforcementLearning:
         discount_factor: Optional[float] = None
     ):
         """Update learning parameters for agent type."""
-        if agent_type in self.agents and isinstance(self.agents[agent_type], SimpleQTable):
+        if agent_type in self.agents and isinstance(self.agents[agent_type], Q_TABLE_TYPES):
             q_table = self.agents[agent_type]
             
             if learning_rate is not None:
@@ -599,8 +848,9 @@ class AdaptiveReinforcementLearning:
     async def reset_learning_model(self, agent_type: AgentType):
         """Reset learning model for agent type."""
         if agent_type in self.agents:
-            if isinstance(self.agents[agent_type], SimpleQTable):
-                self.agents[agent_type] = SimpleQTable()
+            if isinstance(self.agents[agent_type], Q_TABLE_TYPES):
+                self.agents[agent_type] = self._create_q_table(agent_type)
+                self._learned_positions[agent_type] = self.replay_buffers[agent_type].total_added
             else:
                 self.agents[agent_type] = self._create_stable_baselines_model(agent_type)
             
@@ -1,15 +1,22 @@
 """Agent Message Bus for real-time agent communication and coordination."""
 
 import asyncio
+import heapq
+import inspect
+import itertools
 import json
 import logging
-from typing import Dict, List, Optional, Any, Callable, Set
+import time
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import uuid
 
+import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
 from config import config
 from utils import generate_id, log
 
@@ -69,6 +76,299 @@ class SharedContext:
     ttl: int = 3600  # 1 hour default TTL
 
 
+class Subscription:
+    """Async callback delivery for one agent through a bounded priority inbox."""
+    
+    def __init__(self, agent_id: str, callback: Callable, inbox_size: int):
+        self.agent_id = agent_id
+        self.callback = callback
+        self.inbox: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=inbox_size)
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+    
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._deliver())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    async def offer(self, entry: tuple, timeout: float) -> bool:
+        """Queue a message, waiting up to timeout for inbox space."""
+        try:
+            await asyncio.wait_for(self.inbox.put(entry), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning(f"Inbox full for {self.agent_id}, dropped message {entry[2].id}")
+            return False
+    
+    async def _deliver(self):
+        while True:
+            _, _, message = await self.inbox.get()
+            try:
+                result = self.callback(message)
+                if inspect.isawaitable(result):
+                    await result
+                self.delivered += 1
+            except Exception as e:
+                logger.error(f"Subscriber {self.agent_id} failed on message {message.id}: {e}")
+            finally:
+                self.inbox.task_done()
+
+
+def encode_message(message: AgentMessage) -> bytes:
+    """Serialize a message for a cross-process transport."""
+    return json.dumps({
+        'id': message.id,
+        'sender': message.sender,
+        'recipients': message.recipients,
+        'message_type': message.message_type.value,
+        'priority': message.priority.value,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+        'ttl': message.ttl,
+        'requires_response': message.requires_response,
+        'response_to': message.response_to,
+        'metadata': message.metadata
+    }, default=str).encode()
+
+
+def decode_message(data: bytes) -> AgentMessage:
+    """Rebuild a message serialized by encode_message."""
+    payload = json.loads(data)
+    payload['message_type'] = MessageType(payload['message_type'])
+    payload['priority'] = MessagePriority(payload['priority'])
+    payload['timestamp'] = datetime.fromisoformat(payload['timestamp'])
+    return AgentMessage(**payload)
+
+
+# Consumer group that runs cluster-wide handling (conflicts, resources) once per message
+BUS_GROUP = 'bus'
+# Per-process topic that applies process-local state (shared context, handlers)
+LOCAL_TOPIC = 'local'
+
+
+@dataclass
+class StreamReceipt:
+    """Where a transported message came from, for acknowledgement."""
+    
+    group: str
+    stream: str
+    entry_id: bytes
+    topic: str = BUS_GROUP  # BUS_GROUP or the agent type the entry was read for
+
+
+class InMemoryTransport:
+    """Process-local transport: published messages go straight to the dispatch queue."""
+    
+    def bind(self, bus: 'AgentMessageBus'):
+        self.bus = bus
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    def join_group(self, group: str):
+        pass
+    
+    async def publish(self, message: AgentMessage):
+        await self.bus._enqueue(message)
+    
+    async def ack(self, receipt: StreamReceipt):
+        pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {'transport': 'memory'}
+
+
+class RedisStreamsTransport:
+    """Redis Streams transport so buses in different processes share traffic.
+    
+    Each priority level has its own stream and reads take the highest
+    priority streams first. Conflict and resource handling runs in the shared
+    ``bus`` consumer group, so one worker in the cluster resolves each
+    conflict. Shared context and registered handlers live in process memory,
+    so they run in a ``local`` group per process that every bus joins.
+    Delivery runs in one group per agent type *and* process, so every process
+    with agents of a type sees every message once and delivers it to its own
+    agents. Delivery groups start at the end of the streams rather than
+    replaying history, so give each process a stable ``consumer_name`` (or
+    ``MESSAGE_BUS_CONSUMER_NAME``) to resume its backlog after a restart;
+    without one the process's groups are destroyed on stop. Entries are acknowledged in batches
+    after local dispatch, and entries left pending by a crashed consumer are
+    claimed once idle.
+    """
+    
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        consumer_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        block_ms: Optional[int] = None,
+        max_length: Optional[int] = None,
+        claim_idle_ms: Optional[int] = None
+    ):
+        self.redis = redis_client
+        consumer_name = consumer_name or config.message_bus.consumer_name
+        # Groups named after a throwaway consumer are never resumed, so drop them on stop
+        self.ephemeral = not consumer_name
+        self.consumer_name = consumer_name or generate_id("consumer")
+        self.batch_size = batch_size or config.message_bus.stream_batch_size
+        self.block_ms = block_ms or config.message_bus.stream_block_ms
+        self.max_length = max_length or config.message_bus.stream_max_length
+        self.claim_idle_ms = claim_idle_ms if claim_idle_ms is not None else config.message_bus.stream_claim_idle_ms
+        self.groups: Dict[str, str] = {}  # consumer group name -> topic
+        self._readers: Dict[str, asyncio.Task] = {}
+        self._pending_acks: Dict[Tuple[str, str], List[bytes]] = defaultdict(list)
+        self._started = False
+        self.stats = {'published': 0, 'read': 0, 'acked': 0, 'reclaimed': 0}
+    
+    def bind(self, bus: 'AgentMessageBus'):
+        self.bus = bus
+        prefix = f"autopilot:bus:{bus.startup_id}"
+        self.streams = {priority: f"{prefix}:p{priority.value}" for priority in MessagePriority}
+        self._read_order = [
+            self.streams[priority] for priority in sorted(MessagePriority, key=lambda p: -p.value)
+        ]
+    
+    async def start(self):
+        self._started = True
+        self.groups[BUS_GROUP] = BUS_GROUP
+        self.groups[f"{LOCAL_TOPIC}:{self.consumer_name}"] = LOCAL_TOPIC
+        # Create groups before returning so nothing published from here on is missed
+        for group in self.groups:
+            await self._ensure_group(group)
+        for group in self.groups:
+            self._start_reader(group)
+    
+    async def stop(self):
+        self._started = False
+        readers = list(self._readers.values())
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        self._readers = {}
+        await self._flush_acks()
+        if self.ephemeral:
+            await self._destroy_delivery_groups()
+    
+    async def _destroy_delivery_groups(self):
+        pipeline = self.redis.pipeline(transaction=False)
+        for group in self.groups:
+            if group != BUS_GROUP:
+                for stream in self._read_order:
+                    pipeline.xgroup_destroy(stream, group)
+        await pipeline.execute(raise_on_error=False)
+    
+    def join_group(self, group: str):
+        """Consume the streams for a topic: the bus group, local or an agent type."""
+        name = group if group == BUS_GROUP else f"{group}:{self.consumer_name}"
+        self.groups[name] = group
+        if self._started:
+            self._start_reader(name)
+    
+    def _start_reader(self, group: str):
+        if group not in self._readers:
+            self._readers[group] = asyncio.create_task(self._read_loop(group))
+    
+    async def publish(self, message: AgentMessage):
+        await self.redis.xadd(
+            self.streams[message.priority], {'data': encode_message(message)},
+            maxlen=self.max_length, approximate=True
+        )
+        self.stats['published'] += 1
+    
+    async def ack(self, receipt: StreamReceipt):
+        self._pending_acks[(receipt.group, receipt.stream)].append(receipt.entry_id)
+        if sum(len(ids) for ids in self._pending_acks.values()) >= self.batch_size:
+            await self._flush_acks()
+    
+    async def _flush_acks(self):
+        if not self._pending_acks:
+            return
+        pending, self._pending_acks = self._pending_acks, defaultdict(list)
+        pipeline = self.redis.pipeline(transaction=False)
+        for (group, stream), entry_ids in pending.items():
+            pipeline.xack(stream, group, *entry_ids)
+        self.stats['acked'] += sum(await pipeline.execute())
+    
+    async def _ensure_group(self, group: str):
+        start_id = '0' if group == BUS_GROUP else '$'
+        for stream in self._read_order:
+            try:
+                await self.redis.xgroup_create(stream, group, id=start_id, mkstream=True)
+            except ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+    
+    async def _read_loop(self, group: str):
+        """Move batches from the streams into the local dispatch queue."""
+        await self._ensure_group(group)
+        last_claim = 0.0
+        while True:
+            try:
+                await self._flush_acks()
+                if time.monotonic() - last_claim >= self.claim_idle_ms / 1000:
+                    last_claim = time.monotonic()
+                    await self._reclaim(group)
+                room = self.bus.queue_capacity()
+                if room <= 0:
+                    await asyncio.sleep(0.01)
+                    continue
+                # COUNT applies per stream; with less room than streams, read the most urgent
+                per_stream = min(room // len(self._read_order), self.batch_size)
+                streams = self._read_order if per_stream else self._read_order[:room]
+                response = await self.redis.xreadgroup(
+                    group, self.consumer_name, {stream: '>' for stream in streams},
+                    count=per_stream or 1, block=self.block_ms
+                )
+                for stream, entries in response or []:
+                    self.stats['read'] += await self._dispatch(group, stream, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream read failed for group {group}: {e}")
+                await asyncio.sleep(1)
+    
+    async def _reclaim(self, group: str):
+        """Take over entries another consumer read but never acknowledged."""
+        for stream in self._read_order:
+            _, entries, *_ = await self.redis.xautoclaim(
+                stream, group, self.consumer_name, min_idle_time=self.claim_idle_ms,
+                start_id='0-0', count=self.batch_size
+            )
+            self.stats['reclaimed'] += await self._dispatch(group, stream, entries)
+    
+    async def _dispatch(self, group: str, stream: Any, entries: List[tuple]) -> int:
+        stream = stream.decode() if isinstance(stream, bytes) else stream
+        for entry_id, fields in entries:
+            receipt = StreamReceipt(group, stream, entry_id, self.groups[group])
+            data = (fields or {}).get(b'data')
+            if data is None:
+                await self.ack(receipt)  # trimmed or malformed entry
+                continue
+            await self.bus._enqueue(decode_message(data), receipt)
+        return len(entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'transport': 'redis_streams',
+            'consumer': self.consumer_name,
+            'groups': sorted(self.groups),
+            **self.stats
+        }
+
+
 class ConflictResolver:
     """Handles conflicts between agent decisions."""
     
@@ -209,59 +509,129 @@ class ConflictResolver:
 
 
 class AgentMessageBus:
-    """Real-time message bus for agent communication."""
+    """Real-time message bus for agent communication.
+    
+    Messages are dispatched highest priority first by a pool of worker
+    tasks, then delivered to subscribed agents through their own bounded
+    inboxes so one slow consumer cannot stall the rest of the bus.
+    
+    Message history is a bounded ring; messages awaiting a response are
+    kept aside until answered. A background sweeper drops expired
+    messages and shared contexts using a min-heap of expiry times.
+    """
     
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: str, transport=None):
         self.startup_id = startup_id
         self.bus_id = generate_id("message_bus")
-        self.messages: Dict[str, AgentMessage] = {}
+        self.transport = transport or InMemoryTransport()
+        self.messages: OrderedDict = OrderedDict()
+        self.pending_responses: Dict[str, AgentMessage] = {}
+        # Entries are (expires_at, sequence, kind, key); contexts are re-checked when popped
+        self._expiry_heap: List[tuple] = []
+        self.sweeper_task: Optional[asyncio.Task] = None
         self.subscribers: Dict[str, Set[str]] = defaultdict(set)
         self.shared_context: Dict[str, SharedContext] = {}
         self.conflict_resolver = ConflictResolver()
-        self.message_queue = asyncio.Queue()
-        self.processing_task = None
+        # Entries are (-priority, sequence, message): highest priority first, FIFO within a level
+        self.message_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._queue_not_full = asyncio.Event()
+        self._queue_not_full.set()
+        self.workers: List[asyncio.Task] = []
+        self.subscriptions: Dict[str, Subscription] = {}
         self.is_running = False
+        self.stats = {
+            'processed': 0, 'delivered': 0, 'backpressure_waits': 0,
+            'evicted_messages': 0, 'expired_messages': 0, 'expired_contexts': 0, 'answered': 0
+        }
         
         # Agent registry
         self.registered_agents: Set[str] = set()
+        self.agent_types: Dict[str, str] = {}
         
         # Message handlers
         self.message_handlers: Dict[MessageType, List[Callable]] = defaultdict(list)
         
+        self.transport.bind(self)
         logger.info(f"Message bus initialized for startup {startup_id}")
     
     async def start(self):
-        """Start the message bus processing."""
+        """Start the dispatch workers and subscriber deliveries."""
         if self.is_running:
             return
         
         self.is_running = True
-        self.processing_task = asyncio.create_task(self._process_messages())
+        self.workers = [
+            asyncio.create_task(self._dispatch_worker())
+            for _ in range(config.message_bus.max_concurrent_processing)
+        ]
+        for subscription in self.subscriptions.values():
+            subscription.start()
+        self.sweeper_task = asyncio.create_task(self._sweep_loop())
+        await self.transport.start()
         logger.info(f"Message bus started for startup {self.startup_id}")
     
     async def stop(self):
         """Stop the message bus processing."""
         self.is_running = False
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        await self.transport.stop()
+        tasks = self.workers + ([self.sweeper_task] if self.sweeper_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.sweeper_task = None
+        for subscription in self.subscriptions.values():
+            await subscription.stop()
+        self._queue_not_full.set()
         logger.info(f"Message bus stopped for startup {self.startup_id}")
     
+    async def drain(self):
+        """Wait until every queued message has been dispatched and delivered."""
+        await self.message_queue.join()
+        for subscription in list(self.subscriptions.values()):
+            await subscription.inbox.join()
+    
     def register_agent(self, agent_id: str, agent_type: str):
         """Register an agent with the message bus."""
         self.registered_agents.add(agent_id)
         self.subscribers[agent_type].add(agent_id)
+        self.agent_types[agent_id] = agent_type
+        self.transport.join_group(agent_type)
         logger.info(f"Agent {agent_id} ({agent_type}) registered with message bus")
     
     def unregister_agent(self, agent_id: str, agent_type: str):
         """Unregister an agent from the message bus."""
         self.registered_agents.discard(agent_id)
         self.subscribers[agent_type].discard(agent_id)
+        self.agent_types.pop(agent_id, None)
         logger.info(f"Agent {agent_id} ({agent_type}) unregistered from message bus")
     
+    def subscribe(self, agent_id: str, callback: Callable, inbox_size: Optional[int] = None):
+        """Deliver messages addressed to an agent, or to its agent type, to a callback.
+        
+        The callback may be a plain function or a coroutine function.
+        """
+        subscription = Subscription(
+            agent_id, callback, inbox_size or config.message_bus.subscriber_inbox_size
+        )
+        previous = self.subscriptions.get(agent_id)
+        if previous and previous.task:
+            previous.task.cancel()
+        self.subscriptions[agent_id] = subscription
+        if self.is_running:
+            subscription.start()
+    
+    async def unsubscribe(self, agent_id: str):
+        """Stop delivering messages to an agent."""
+        subscription = self.subscriptions.pop(agent_id, None)
+        if subscription:
+            await subscription.stop()
+    
+    def add_message_handler(self, message_type: MessageType, handler: Callable):
+        """Run a handler for every dispatched message of a type."""
+        self.message_handlers[message_type].append(handler)
+    
     async def send_message(
         self,
         sender: str,
@@ -286,12 +656,97 @@ class AgentMessageBus:
             response_to=response_to
         )
         
-        self.messages[message_id] = message
-        await self.message_queue.put(message)
+        self._record_message(message)
+        await self.transport.publish(message)
         
         logger.info(f"Message {message_id} sent from {sender} to {recipients}")
         return message_id
     
+    def _record_message(self, message: AgentMessage):
+        """Keep a message in history, or aside until answered if it expects a response."""
+        self._mark_answered(message)
+        if message.requires_response:
+            self.pending_responses[message.id] = message
+        else:
+            self.messages[message.id] = message
+            while len(self.messages) > config.message_bus.max_message_history:
+                self.messages.popitem(last=False)
+                self.stats['evicted_messages'] += 1
+        self._schedule_expiry(message.timestamp + timedelta(seconds=message.ttl), 'message', message.id)
+    
+    def _mark_answered(self, message: AgentMessage):
+        if message.response_to and self.pending_responses.pop(message.response_to, None):
+            self.stats['answered'] += 1
+    
+    def get_message(self, message_id: str) -> Optional[AgentMessage]:
+        """Look up a retained message."""
+        return self.messages.get(message_id) or self.pending_responses.get(message_id)
+    
+    def _schedule_expiry(self, expires_at: datetime, kind: str, key: str):
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), kind, key))
+    
+    def sweep_expired(self, now: Optional[datetime] = None) -> int:
+        """Drop messages and shared contexts whose TTL has passed."""
+        now = now or datetime.utcnow()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, kind, key = heapq.heappop(heap)
+            if kind == 'message':
+                if self.messages.pop(key, None) or self.pending_responses.pop(key, None):
+                    self.stats['expired_messages'] += 1
+                    removed += 1
+                continue
+            context = self.shared_context.get(key)
+            if context is None:
+                continue
+            expires_at = context.updated_at + timedelta(seconds=context.ttl)
+            if expires_at > now:
+                self._schedule_expiry(expires_at, 'context', key)  # refreshed since it was scheduled
+            else:
+                del self.shared_context[key]
+                self.stats['expired_contexts'] += 1
+                removed += 1
+        
+        # Entries for messages already evicted from the ring stay until their
+        # expiry; rebuild if they come to dominate the heap
+        live = len(self.messages) + len(self.pending_responses) + len(self.shared_context)
+        if len(heap) > 2 * live + 1024:
+            self._expiry_heap = [entry for entry in heap if self._is_tracked(entry[2], entry[3])]
+            heapq.heapify(self._expiry_heap)
+        return removed
+    
+    def _is_tracked(self, kind: str, key: str) -> bool:
+        if kind == 'message':
+            return key in self.messages or key in self.pending_responses
+        return key in self.shared_context
+    
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(config.message_bus.sweep_interval)
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.error(f"Error sweeping expired bus entries: {e}")
+    
+    async def _enqueue(self, message: AgentMessage, receipt: Optional[StreamReceipt] = None):
+        """Queue a message, making external senders wait while the queue is full.
+        
+        Dispatch workers never wait here: a handler that replies to a message
+        would otherwise deadlock the pool it is running on. Transport readers
+        size their reads to the free space instead.
+        """
+        if receipt is None and asyncio.current_task() not in self.workers:
+            while self.is_running and self.queue_capacity() <= 0:
+                self.stats['backpressure_waits'] += 1
+                self._queue_not_full.clear()
+                await self._queue_not_full.wait()
+        self.message_queue.put_nowait((-message.priority.value, next(self._sequence), message, receipt))
+    
+    def queue_capacity(self) -> int:
+        """Free slots in the dispatch queue."""
+        return config.message_bus.max_message_queue_size - self.message_queue.qsize()
+    
     async def broadcast_message(
         self,
         sender: str,
@@ -303,35 +758,56 @@ class AgentMessageBus:
         recipients = list(self.registered_agents)
         return await self.send_message(sender, recipients, message_type, content, priority)
     
-    async def _process_messages(self):
-        """Process messages in the queue."""
-        while self.is_running:
+    async def _dispatch_worker(self):
+        """Take the highest priority message and handle it."""
+        while True:
+            _, _, message, receipt = await self.message_queue.get()
             try:
-                message = await asyncio.wait_for(self.message_queue.get(), timeout=1.0)
-                await self._handle_message(message)
-            except asyncio.TimeoutError:
-                continue
+                await self._handle_message(message, receipt.topic if receipt else None)
+                self.stats['processed'] += 1
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
+            finally:
+                self.message_queue.task_done()
+                if receipt:
+                    await self.transport.ack(receipt)
+                if self.message_queue.qsize() < config.message_bus.max_message_queue_size:
+                    self._queue_not_full.set()
     
-    async def _handle_message(self, message: AgentMessage):
-        """Handle a single message."""
+    async def _handle_message(self, message: AgentMessage, group: Optional[str] = None):
+        """Handle a single message.
+        
+        ``group`` is the topic a transported message was read for: the bus
+        group resolves conflicts and resources once per cluster, the local
+        topic updates this process's shared context and runs its handlers, and
+        an agent type only delivers to local agents of that type. Local
+        messages get all three.
+        """
         try:
             # Check TTL
             if (datetime.utcnow() - message.timestamp).total_seconds() > message.ttl:
                 logger.warning(f"Message {message.id} expired, skipping")
                 return
             
-            # Handle based on message type
-            if message.message_type == MessageType.CONFLICT_ALERT:
-                await self._handle_conflict_alert(message)
-            elif message.message_type == MessageType.DATA_SHARE:
-                await self._handle_data_share(message)
-            elif message.message_type == MessageType.RESOURCE_REQUEST:
-                await self._handle_resource_request(message)
-            else:
-                # Generic message handling
-                await self._notify_recipients(message)
+            self._mark_answered(message)
+            
+            if group in (None, BUS_GROUP):
+                if message.message_type == MessageType.CONFLICT_ALERT:
+                    await self._handle_conflict_alert(message)
+                elif message.message_type == MessageType.RESOURCE_REQUEST:
+                    await self._handle_resource_request(message)
+            
+            if group in (None, LOCAL_TOPIC):
+                if message.message_type == MessageType.DATA_SHARE:
+                    await self._handle_data_share(message)
+                
+                for handler in self.message_handlers.get(message.message_type, []):
+                    result = handler(message)
+                    if inspect.isawaitable(result):
+                        await result
+            
+            if group not in (BUS_GROUP, LOCAL_TOPIC):
+                await self._notify_recipients(message, agent_type=group)
                 
         except Exception as e:
             logger.error(f"Error handling message {message.id}: {e}")
@@ -371,13 +847,13 @@ class AgentMessageBus:
                 self.shared_context[context_key].updated_at = datetime.utcnow()
                 self.shared_context[context_key].access_count += 1
             else:
-                self.shared_context[context_key] = SharedContext(
+                self._add_context(SharedContext(
                     startup_id=self.startup_id,
                     context_id=context_key,
                     data=data_value,
                     created_at=datetime.utcnow(),
                     updated_at=datetime.utcnow()
-                )
+                ))
             
             logger.info(f"Data shared: {data_key} = {data_value}")
     
@@ -408,13 +884,26 @@ class AgentMessageBus:
             response_to=message.id
         )
     
-    async def _notify_recipients(self, message: AgentMessage):
-        """Notify message recipients."""
+    def _resolve_recipients(self, message: AgentMessage) -> Set[str]:
+        """Expand agent-type topics in the recipient list to subscribed agent ids."""
+        agent_ids: Set[str] = set()
         for recipient in message.recipients:
-            if recipient in self.registered_agents:
-                # In a real implementation, this would trigger callbacks
-                # For now, we just log the notification
-                logger.info(f"Message {message.id} delivered to {recipient}")
+            if recipient in self.subscribers:
+                agent_ids.update(self.subscribers[recipient])
+            else:
+                agent_ids.add(recipient)
+        agent_ids.discard(message.sender)
+        return agent_ids
+    
+    async def _notify_recipients(self, message: AgentMessage, agent_type: Optional[str] = None):
+        """Queue the message in each recipient's inbox, optionally only for one agent type."""
+        entry = (-message.priority.value, next(self._sequence), message)
+        for agent_id in self._resolve_recipients(message):
+            if agent_type is not None and self.agent_types.get(agent_id) != agent_type:
+                continue
+            subscription = self.subscriptions.get(agent_id)
+            if subscription and await subscription.offer(entry, config.message_bus.delivery_timeout):
+                self.stats['delivered'] += 1
     
     def get_shared_context(self, context_key: str) -> Optional[SharedContext]:
         """Get shared context data."""
@@ -441,17 +930,33 @@ class AgentMessageBus:
             self.shared_context[full_key].data.update(data)
             self.shared_context[full_key].updated_at = now
         else:
-            self.shared_context[full_key] = SharedContext(
+            self._add_context(SharedContext(
                 startup_id=self.startup_id,
                 context_id=full_key,
                 data=data,
                 created_at=now,
                 updated_at=now,
                 ttl=ttl
-            )
+            ))
         
         logger.info(f"Shared context updated: {context_key}")
     
+    def _add_context(self, context: SharedContext):
+        self.shared_context[context.context_id] = context
+        self._schedule_expiry(
+            context.updated_at + timedelta(seconds=context.ttl), 'context', context.context_id
+        )
+    
+    def _estimate_history_bytes(self, sample_size: int = 100) -> int:
+        """Approximate retained message payload size from the newest messages."""
+        retained = len(self.messages) + len(self.pending_responses)
+        if not retained:
+            return 0
+        sample = list(itertools.islice(reversed(self.messages.values()), sample_size))
+        sample += list(itertools.islice(self.pending_responses.values(), sample_size - len(sample)))
+        sampled_bytes = sum(len(json.dumps(m.content, default=str)) for m in sample)
+        return int(sampled_bytes / len(sample) * retained)
+    
     def get_bus_status(self) -> Dict[str, Any]:
         """Get message bus status."""
         return {
@@ -460,9 +965,25 @@ class AgentMessageBus:
             'is_running': self.is_running,
             'registered_agents': len(self.registered_agents),
             'pending_messages': self.message_queue.qsize(),
-            'total_messages': len(self.messages),
+            'total_messages': len(self.messages) + len(self.pending_responses),
+            'history_messages': len(self.messages),
+            'history_occupancy': len(self.messages) / config.message_bus.max_message_history,
+            'pending_responses': len(self.pending_responses),
+            'estimated_history_bytes': self._estimate_history_bytes(),
+            'expiry_heap_size': len(self._expiry_heap),
             'shared_contexts': len(self.shared_context),
-            'subscribers': {k: len(v) for k, v in self.subscribers.items()}
+            'subscribers': {k: len(v) for k, v in self.subscribers.items()},
+            'dispatch_workers': len(self.workers),
+            'transport': self.transport.get_stats(),
+            'inboxes': {
+                agent_id: {
+                    'pending': sub.inbox.qsize(),
+                    'delivered': sub.delivered,
+                    'dropped': sub.dropped
+                }
+                for agent_id, sub in self.subscriptions.items()
+            },
+            **self.stats
         }
 
 
@@ -470,12 +991,21 @@ class AgentMessageBus:
 _message_bus: Optional[AgentMessageBus] = None
 
 
+def create_transport():
+    """Build the configured message bus transport."""
+    if config.message_bus.transport == 'redis_streams':
+        return RedisStreamsTransport(aioredis.from_url(config.message_bus.redis_url))
+    if config.message_bus.transport != 'memory':
+        logger.warning(f"Unknown message bus transport '{config.message_bus.transport}', using memory")
+    return InMemoryTransport()
+
+
 def get_message_bus(startup_id: str) -> AgentMessageBus:
     """Get or create message bus instance."""
     global _message_bus
     if _message_bus is None or _message_bus.startup_id != startup_id:
         if _message_bus:
             asyncio.create_task(_message_bus.stop())
-        _message_bus = AgentMessageBus(startup_id)
+        _message_bus = AgentMessageBus(startup_id, create_transport())
         asyncio.create_task(_message_bus.start())
     return _message_bus 
\ No newline at end of file
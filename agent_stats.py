@@ -0,0 +1,149 @@
+"""In-memory agent execution stats with batched write-behind to the database."""
+
+import asyncio
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils import log
+from database import db_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 10.0  # seconds
+
+
+class AgentStatsAccumulator:
+    """Aggregates agent executions in memory and flushes them periodically.
+
+    ``record`` is O(1) and never touches the database, so it is safe to call
+    from the agent hot path. A background task started on the running event
+    loop flushes pending deltas with one batched UPDATE per interval.
+    """
+
+    def __init__(self, database_manager: Any = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """Initialize accumulator."""
+        self.db = database_manager or db_manager
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._totals: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flush_count = 0
+        self.failed_flushes = 0
+
+    def record(self, agent_id: str, success: bool, timestamp: Optional[datetime] = None) -> None:
+        """Record one agent execution."""
+        timestamp = timestamp or datetime.utcnow()
+        with self._lock:
+            for table in (self._pending, self._totals):
+                entry = table.setdefault(
+                    agent_id,
+                    {'executions': 0, 'successes': 0, 'last_execution': None}
+                )
+                entry['executions'] += 1
+                entry['successes'] += 1 if success else 0
+                entry['last_execution'] = timestamp
+        self._ensure_flush_task()
+
+    def get_stats(self, agent_id: str) -> Dict[str, Any]:
+        """Get stats recorded by this process for an agent."""
+        with self._lock:
+            entry = dict(self._totals.get(
+                agent_id, {'executions': 0, 'successes': 0, 'last_execution': None}
+            ))
+        entry['success_rate'] = (
+            entry['successes'] / entry['executions'] if entry['executions'] else 0.0
+        )
+        return entry
+
+    def pending_count(self) -> int:
+        """Number of agents with unflushed stats."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write pending stats to the database; returns rows updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        batch: List[Dict[str, Any]] = [
+            {'agent_id': agent_id, **entry} for agent_id, entry in pending.items()
+        ]
+        try:
+            updated = self.db.apply_agent_stats(batch)
+            self.flush_count += 1
+            return updated
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.error(f"Failed to flush agent stats: {e}")
+            self._requeue(pending)
+            return 0
+
+    def _requeue(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        """Merge a failed batch back into the pending table."""
+        with self._lock:
+            for agent_id, entry in pending.items():
+                current = self._pending.setdefault(
+                    agent_id,
+                    {'executions': 0, 'successes': 0, 'last_execution': None}
+                )
+                current['executions'] += entry['executions']
+                current['successes'] += entry['successes']
+                if current['last_execution'] is None or (
+                    entry['last_execution'] and entry['last_execution'] > current['last_execution']
+                ):
+                    current['last_execution'] = entry['last_execution']
+
+    async def flush_async(self) -> int:
+        """Flush pending stats without blocking the event loop."""
+        return await asyncio.to_thread(self.flush)
+
+    def _ensure_flush_task(self) -> None:
+        """Start the periodic flush task on the running loop, if any."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is loop and self._flush_task and not self._flush_task.done():
+            return
+        self._loop = loop
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Periodically flush pending stats."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            updated = await self.flush_async()
+            if updated:
+                log.debug("Agent stats flushed", agents=updated)
+
+    async def stop(self) -> None:
+        """Stop the background task and flush remaining stats."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush_async()
+
+
+# Global accumulator instance
+_agent_stats: Optional[AgentStatsAccumulator] = None
+
+
+def get_agent_stats_accumulator() -> AgentStatsAccumulator:
+    """Get or create the process-wide agent stats accumulator."""
+    global _agent_stats
+    if _agent_stats is None:
+        _agent_stats = AgentStatsAccumulator()
+        atexit.register(_agent_stats.flush)
+    return _agent_stats
@@ -4,6 +4,7 @@ Enables agents to distribute tasks across local hardware and peer networks for 9
 """
 
 import asyncio
+import itertools
 import json
 import logging
 import time
@@ -57,6 +58,14 @@ class TaskPriority(Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+# Dispatch order, most urgent first
+PRIORITY_RANK = {
+    TaskPriority.CRITICAL: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.LOW: 3
+}
+
 class TaskStatus(Enum):
     """Task execution status."""
     PENDING = "pending"
@@ -110,6 +119,12 @@ class SwarmMetrics:
     cpu_usage: float
     network_latency: float
     timestamp: datetime = field(default_factory=datetime.utcnow)
+    cancelled_tasks: int = 0
+    timed_out_tasks: int = 0
+    workers: int = 0
+    running_tasks: int = 0
+    queue_depth: Dict[str, int] = field(default_factory=dict)  # queued tasks per priority
+    priority_latency: Dict[str, Dict[str, float]] = field(default_factory=dict)  # seconds, per priority
 
 class NodeDiscovery:
     """Handles discovery and registration of swarm nodes."""
@@ -380,9 +395,19 @@ class DecentralizedAgentSwarm:
         
         self.nodes: Dict[str, SwarmNode] = {}
         self.tasks: Dict[str, SwarmTask] = {}
-        self.task_queue = asyncio.Queue()
+        # Entries are (priority rank, submit time, sequence, task id)
+        self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._queued: Dict[str, SwarmTask] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self.workers: List[asyncio.Task] = []
         self.running = False
         
+        window = config.swarm.latency_window
+        self.queue_depth = {priority: 0 for priority in TaskPriority}
+        self.wait_latency = {priority: deque(maxlen=window) for priority in TaskPriority}
+        self.run_latency = {priority: deque(maxlen=window) for priority in TaskPriority}
+        
         # Initialize distributed computing frameworks
         self._initialize_distributed_frameworks()
         
@@ -407,21 +432,37 @@ class DecentralizedAgentSwarm:
     
     async def start_swarm(self):
         """Start the decentralized swarm."""
+        if self.running:
+            return
         self.running = True
         
         # Start background tasks
         asyncio.create_task(self.node_discovery.start_discovery())
         asyncio.create_task(self.health_monitor.start_monitoring(self.nodes))
-        asyncio.create_task(self._task_processor())
+        self.workers = [
+            asyncio.create_task(self._task_worker())
+            for _ in range(self._worker_count())
+        ]
         asyncio.create_task(self._heartbeat_sender())
         
-        logger.info("Decentralized swarm started")
+        logger.info("Decentralized swarm started", workers=len(self.workers))
     
     async def stop_swarm(self):
-        """Stop the decentralized swarm."""
+        """Stop the decentralized swarm; running tasks are cancelled."""
         self.running = False
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
         logger.info("Decentralized swarm stopped")
     
+    def _worker_count(self) -> int:
+        """Task workers to run, sized from local node capacity unless configured."""
+        if config.swarm.max_workers > 0:
+            return config.swarm.max_workers
+        cpu_count = sum(node.metadata.get("cpu_count", 0) for node in self.nodes.values())
+        return max(1, (cpu_count or mp.cpu_count()) * config.swarm.workers_per_cpu)
+    
     async def register_local_node(
         self,
         node_type: SwarmNodeType = SwarmNodeType.WORKER,
@@ -521,24 +562,44 @@ class DecentralizedAgentSwarm:
         )
         
         self.tasks[task_id] = task
-        await self.task_queue.put(task)
+        self._queued[task_id] = task
+        self.queue_depth[priority] += 1
+        self.task_queue.put_nowait((PRIORITY_RANK[priority], time.monotonic(), next(self._sequence), task_id))
         
         logger.info(f"Submitted task: {task_id}", task_type=task_type, priority=priority.value)
         return task_id
     
-    async def _task_processor(self):
-        """Process tasks from the queue."""
-        while self.running:
+    async def _task_worker(self):
+        """Take the most urgent, oldest queued task and run it."""
+        while True:
+            _, submitted_at, _, task_id = await self.task_queue.get()
             try:
-                task = await asyncio.wait_for(self.task_queue.get(), timeout=1.0)
-                await self._execute_task(task)
-            except asyncio.TimeoutError:
-                continue
+                task = self._queued.pop(task_id, None)
+                if task is None:  # Cancelled while queued
+                    continue
+                self.queue_depth[task.priority] -= 1
+                self.wait_latency[task.priority].append(time.monotonic() - submitted_at)
+                
+                # Run in its own task so cancel_task can stop it without killing the worker
+                execution = asyncio.create_task(self._execute_task(task))
+                self._running[task_id] = execution
+                try:
+                    await asyncio.wait({execution})
+                finally:
+                    self._running.pop(task_id, None)
+                    execution.cancel()
             except Exception as e:
-                logger.error(f"Task processor error: {e}")
+                logger.error(f"Task worker error: {e}")
+            finally:
+                self.task_queue.task_done()
+    
+    async def drain(self):
+        """Wait until every submitted task has finished or been cancelled."""
+        await self.task_queue.join()
     
     async def _execute_task(self, task: SwarmTask):
-        """Execute a task on an appropriate node."""
+        """Execute a task on an appropriate node within its timeout."""
+        start_time = None
         try:
             # Select node for task
             available_nodes = list(self.nodes.values())
@@ -556,7 +617,10 @@ class DecentralizedAgentSwarm:
             
             # Execute task
             start_time = time.time()
-            result = await self._execute_on_node(selected_node, task)
+            result = await asyncio.wait_for(
+                self._execute_on_node(selected_node, task),
+                timeout=task.timeout
+            )
             execution_time = time.time() - start_time
             
             # Update task with result
@@ -571,10 +635,20 @@ class DecentralizedAgentSwarm:
                        execution_time=execution_time,
                        node=selected_node.node_id)
             
+        except asyncio.TimeoutError:
+            logger.warning(f"Task timed out: {task.task_id}", timeout=task.timeout)
+            task.status = TaskStatus.TIMEOUT
+            task.error = f"Timed out after {task.timeout}s"
+        except asyncio.CancelledError:
+            task.status = TaskStatus.CANCELLED
+            raise
         except Exception as e:
             logger.error(f"Task execution failed: {task.task_id}", error=str(e))
             task.status = TaskStatus.FAILED
             task.error = str(e)
+        finally:
+            if start_time is not None:
+                self.run_latency[task.priority].append(time.time() - start_time)
     
     async def _execute_on_node(self, node: SwarmNode, task: SwarmTask) -> Any:
         """Execute task on a specific node."""
@@ -679,20 +753,44 @@ class DecentralizedAgentSwarm:
         return self.tasks.get(task_id)
     
     async def cancel_task(self, task_id: str) -> bool:
-        """Cancel a pending task."""
-        if task_id in self.tasks:
-            task = self.tasks[task_id]
-            if task.status == TaskStatus.PENDING:
-                task.status = TaskStatus.CANCELLED
-                logger.info(f"Task cancelled: {task_id}")
-                return True
+        """Cancel a queued or running task."""
+        task = self._queued.pop(task_id, None)
+        if task is not None:
+            # The queue entry is skipped when a worker reaches it
+            self.queue_depth[task.priority] -= 1
+            task.status = TaskStatus.CANCELLED
+            logger.info(f"Task cancelled: {task_id}")
+            return True
+        
+        execution = self._running.get(task_id)
+        if execution is not None and not execution.done():
+            execution.cancel()
+            self.tasks[task_id].status = TaskStatus.CANCELLED
+            logger.info(f"Running task cancelled: {task_id}")
+            return True
         return False
     
+    def _priority_latency(self) -> Dict[str, Dict[str, float]]:
+        """Queue wait and run time per priority over the recent window."""
+        latency = {}
+        for priority in TaskPriority:
+            waits = sorted(self.wait_latency[priority])
+            runs = self.run_latency[priority]
+            latency[priority.value] = {
+                'dispatched': len(waits),
+                'average_wait': sum(waits) / len(waits) if waits else 0.0,
+                'p95_wait': waits[max(0, int(len(waits) * 0.95) - 1)] if waits else 0.0,
+                'max_wait': waits[-1] if waits else 0.0,
+                'average_run': sum(runs) / len(runs) if runs else 0.0
+            }
+        return latency
+    
     async def get_swarm_metrics(self) -> SwarmMetrics:
         """Get swarm performance metrics."""
         active_nodes = sum(1 for node in self.nodes.values() if node.is_active)
-        completed_tasks = sum(1 for task in self.tasks.values() if task.status == TaskStatus.COMPLETED)
-        failed_tasks = sum(1 for task in self.tasks.values() if task.status == TaskStatus.FAILED)
+        status_counts = defaultdict(int)
+        for task in self.tasks.values():
+            status_counts[task.status] += 1
         
         # Calculate average response time
         response_times = [
@@ -701,8 +799,8 @@ class DecentralizedAgentSwarm:
         ]
         avg_response_time = sum(response_times) / len(response_times) if response_times else 0
         
-        # Get system metrics
-        system_load = self._get_system_load()
+        # Get system metrics; the load sample blocks for a second, so keep it off the loop
+        system_load = await asyncio.to_thread(self._get_system_load)
         memory_usage = psutil.virtual_memory().percent / 100.0
         cpu_usage = psutil.cpu_percent() / 100.0
         
@@ -710,13 +808,19 @@ class DecentralizedAgentSwarm:
             total_nodes=len(self.nodes),
             active_nodes=active_nodes,
             total_tasks=len(self.tasks),
-            completed_tasks=completed_tasks,
-            failed_tasks=failed_tasks,
+            completed_tasks=status_counts[TaskStatus.COMPLETED],
+            failed_tasks=status_counts[TaskStatus.FAILED],
             average_response_time=avg_response_time,
             system_load=system_load,
             memory_usage=memory_usage,
             cpu_usage=cpu_usage,
-            network_latency=0.0  # Would be calculated from actual network measurements
+            network_latency=0.0,  # Would be calculated from actual network measurements
+            cancelled_tasks=status_counts[TaskStatus.CANCELLED],
+            timed_out_tasks=status_counts[TaskStatus.TIMEOUT],
+            workers=len(self.workers),
+            running_tasks=len(self._running),
+            queue_depth={priority.value: depth for priority, depth in self.queue_depth.items()},
+            priority_latency=self._priority_latency()
         )
     
     async def get_node_info(self, node_id: str) -> Optional[SwarmNode]:
@@ -1,29 +1,73 @@
 """Enhanced AI agents for AutoPilot Ventures platform."""
 
-import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime
 
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 from config import config
+from cache_codec import register_cache_type
 from utils import (
     security_utils, budget_manager, generate_id, 
     AGENT_EXECUTION_COUNTER, AGENT_EXECUTION_DURATION,
     API_CALLS_COUNTER, log
 )
 from database import db_manager
+from agent_stats import get_agent_stats_accumulator
+from llm_pool import get_llm_pool, LLMPriority
+from llm_response_cache import get_llm_response_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-
+# Startup an agent call is running for, so one agent instance can serve many startups
+_current_startup_id: ContextVar[Optional[str]] = ContextVar('current_startup_id', default=None)
+# Database agent ids by agent type for that startup, from register_startup_agents
+_current_agent_ids: ContextVar[Optional[Dict[str, str]]] = ContextVar('current_agent_ids', default=None)
+
+
+@contextmanager
+def startup_context(startup_id: str, agent_ids: Optional[Dict[str, str]] = None) -> Iterator[None]:
+    """Attribute agent calls in this context (and tasks it starts) to a startup.
+
+    ``agent_ids`` maps agent types to the startup's database agent ids; they
+    only live as long as the context, so nothing accumulates per startup.
+    """
+    token = _current_startup_id.set(startup_id)
+    ids_token = _current_agent_ids.set(agent_ids)
+    try:
+        yield
+    finally:
+        _current_agent_ids.reset(ids_token)
+        _current_startup_id.reset(token)
+
+
+def register_startup_agents(startup_id: str, agent_types: List[str]) -> Dict[str, str]:
+    """Create database agent rows for a startup in one insert; blocking.
+
+    Returns agent ids by type, or an empty mapping when registration fails.
+    """
+    metadata = {'created_at': datetime.utcnow().isoformat(), 'model': config.ai.model_name}
+    try:
+        agent_ids = db_manager.create_agents_bulk([
+            {'startup_id': startup_id, 'agent_type': agent_type, 'metadata': metadata}
+            for agent_type in agent_types
+        ])
+    except Exception as e:
+        logger.error(f"Failed to register agents for startup {startup_id}: {e}")
+        return {}
+    return dict(zip(agent_types, agent_ids))
+
+
+@register_cache_type
 class AgentResult(BaseModel):
     """Base model for agent results."""
 
@@ -36,10 +80,18 @@ class AgentResult(BaseModel):
 class BaseAgent:
     """Base class for all AI agents."""
 
-    def __init__(self, agent_type: str, startup_id: str):
-        """Initialize base agent."""
+    # Priority lane used for this agent's LLM calls in the shared pool
+    llm_priority: LLMPriority = LLMPriority.NORMAL
+
+    def __init__(self, agent_type: str, startup_id: Optional[str] = None):
+        """Initialize base agent.
+
+        Without a startup_id the agent is shared: each call is attributed to
+        the startup set by ``startup_context``.
+        """
         self.agent_type = agent_type
-        self.startup_id = startup_id
+        self._startup_id = startup_id
+        self._db_agent_id: Optional[str] = None
         self.agent_id = generate_id(f"agent_{agent_type}")
         self.llm = ChatOpenAI(
             model=config.ai.model_name,
@@ -50,19 +102,40 @@ class BaseAgent:
         self.parser = PydanticOutputParser(pydantic_object=AgentResult)
 
         # Register agent in database
-        self._register_agent()
+        if startup_id is not None:
+            self._register_agent()
+
+    @property
+    def startup_id(self) -> Optional[str]:
+        """Startup the current call belongs to."""
+        return _current_startup_id.get() or self._startup_id
+
+    @property
+    def db_agent_id(self) -> Optional[str]:
+        """Database id of this agent for the current startup.
+
+        Shared agents use the ids registered for the startup in context and
+        never touch the database on the call path.
+        """
+        agent_ids = _current_agent_ids.get()
+        if agent_ids is not None:
+            return agent_ids.get(self.agent_type)
+        if _current_startup_id.get() in (None, self._startup_id):
+            return self._db_agent_id
+        return None
 
     def _register_agent(self) -> None:
         """Register agent in database."""
         try:
-            db_manager.create_agent(
-                startup_id=self.startup_id,
+            agent = db_manager.create_agent(
+                startup_id=self._startup_id,
                 agent_type=self.agent_type,
                 metadata={
                     'created_at': datetime.utcnow().isoformat(),
                     'model': config.ai.model_name
                 }
             )
+            self._db_agent_id = agent.id
         except Exception as e:
             logger.error(f"Failed to register agent: {e}")
 
@@ -70,6 +143,30 @@ class BaseAgent:
         """Execute agent task."""
         raise NotImplementedError("Subclasses must implement execute method")
 
+    async def _invoke_llm(self, messages: List[Any]) -> Any:
+        """Invoke the LLM through the response cache and shared execution pool."""
+        response_cache = get_llm_response_cache() if config.llm_cache.enabled else None
+        model_name = config.ai.model_name
+        temperature = config.ai.temperature
+
+        if response_cache is not None:
+            cached_content = await response_cache.aget(
+                model_name, temperature, messages, agent_type=self.agent_type
+            )
+            if cached_content is not None:
+                return AIMessage(content=cached_content)
+
+        response = await get_llm_pool().invoke(
+            self.llm, messages, priority=self.llm_priority
+        )
+
+        if response_cache is not None and isinstance(getattr(response, 'content', None), str):
+            await response_cache.aset(
+                model_name, temperature, messages, response.content,
+                agent_type=self.agent_type
+            )
+        return response
+
     def _check_budget(self, estimated_cost: float) -> bool:
         """Check if we have budget for operation."""
         return budget_manager.can_spend(estimated_cost)
@@ -83,26 +180,15 @@ class BaseAgent:
         return security_utils.check_content_safety(content)
 
     def _update_agent_stats(self, success: bool) -> None:
-        """Update agent statistics."""
-        try:
-            agents = db_manager.get_agents_by_startup(self.startup_id)
-            if agents:
-                agent = agents[0]  # Get first agent of this type
-                current_count = agent.execution_count
-                current_rate = agent.success_rate
-
-                new_count = current_count + 1
-                new_rate = (
-                    (current_rate * current_count + (1 if success else 0)) / new_count
-                )
+        """Update agent statistics.
 
-                db_manager.update_agent(agent.id, {
-                    'execution_count': new_count,
-                    'success_rate': new_rate,
-                    'last_execution': datetime.utcnow()
-                })
-        except Exception as e:
-            logger.error(f"Failed to update agent stats: {e}")
+        Stats are accumulated in memory and flushed to the agents table in
+        batches by the shared AgentStatsAccumulator.
+        """
+        agent_id = self.db_agent_id
+        if agent_id is None:
+            return
+        get_agent_stats_accumulator().record(agent_id, success)
 
     def _log_execution(self, success: bool, duration: float) -> None:
         """Log execution metrics."""
@@ -128,7 +214,7 @@ class BaseAgent:
 class NicheResearchAgent(BaseAgent):
     """Agent for niche research and market analysis."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('niche_research', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -186,9 +272,7 @@ class NicheResearchAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -228,7 +312,7 @@ class NicheResearchAgent(BaseAgent):
 class MVPDesignAgent(BaseAgent):
     """Agent for MVP design and development planning."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('mvp_design', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -294,9 +378,7 @@ class MVPDesignAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -337,7 +419,7 @@ class MVPDesignAgent(BaseAgent):
 class MarketingStrategyAgent(BaseAgent):
     """Agent for marketing strategy development."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('marketing_strategy', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -403,9 +485,7 @@ class MarketingStrategyAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -447,7 +527,7 @@ class MarketingStrategyAgent(BaseAgent):
 class ContentCreationAgent(BaseAgent):
     """Agent for content creation and copywriting."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('content_creation', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -515,9 +595,7 @@ class ContentCreationAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -560,7 +638,9 @@ class ContentCreationAgent(BaseAgent):
 class AnalyticsAgent(BaseAgent):
     """Agent for data analysis and insights."""
 
-    def __init__(self, startup_id: str):
+    llm_priority = LLMPriority.LOW
+
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('analytics', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -626,9 +706,7 @@ class AnalyticsAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -670,7 +748,7 @@ class AnalyticsAgent(BaseAgent):
 class OperationsMonetizationAgent(BaseAgent):
     """Agent for operations optimization and monetization."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('operations_monetization', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -733,9 +811,7 @@ class OperationsMonetizationAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -778,7 +854,7 @@ class OperationsMonetizationAgent(BaseAgent):
 class FundingInvestorAgent(BaseAgent):
     """Agent for funding and investor relations."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('funding_investor', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -844,9 +920,7 @@ class FundingInvestorAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -888,7 +962,7 @@ class FundingInvestorAgent(BaseAgent):
 class LegalComplianceAgent(BaseAgent):
     """Agent for legal and compliance management."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('legal_compliance', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -954,9 +1028,7 @@ class LegalComplianceAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -998,7 +1070,7 @@ class LegalComplianceAgent(BaseAgent):
 class HRTeamBuildingAgent(BaseAgent):
     """Agent for HR and team building."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('hr_team_building', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -1064,9 +1136,7 @@ class HRTeamBuildingAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -1108,7 +1178,7 @@ class HRTeamBuildingAgent(BaseAgent):
 class CustomerSupportScalingAgent(BaseAgent):
     """Agent for customer support and scaling."""
 
-    def __init__(self, startup_id: str):
+    def __init__(self, startup_id: Optional[str] = None):
         super().__init__('customer_support_scaling', startup_id)
 
         self.prompt_template = PromptTemplate(
@@ -1174,9 +1244,7 @@ class CustomerSupportScalingAgent(BaseAgent):
                 HumanMessage(content=prompt)
             ]
 
-            response = await asyncio.to_thread(
-                self.llm.invoke, messages
-            )
+            response = await self._invoke_llm(messages)
 
             # Parse response
             result_data = {
@@ -1212,4 +1280,29 @@ class CustomerSupportScalingAgent(BaseAgent):
                 data={},
                 message=f"Support strategy failed: {str(e)}",
                 cost=0.0
-            ) 
\ No newline at end of file
+            ) 
+
+
+AGENT_CLASSES = {
+    'niche_research': NicheResearchAgent,
+    'mvp_design': MVPDesignAgent,
+    'marketing_strategy': MarketingStrategyAgent,
+    'content_creation': ContentCreationAgent,
+    'analytics': AnalyticsAgent,
+    'operations_monetization': OperationsMonetizationAgent,
+    'funding_investor': FundingInvestorAgent,
+    'legal_compliance': LegalComplianceAgent,
+    'hr_team_building': HRTeamBuildingAgent,
+    'customer_support_scaling': CustomerSupportScalingAgent
+}
+
+# Global shared agent set instance
+_shared_agents: Optional[Dict[str, BaseAgent]] = None
+
+
+def get_shared_agents() -> Dict[str, BaseAgent]:
+    """One agent of each type, shared by every startup via ``startup_context``."""
+    global _shared_agents
+    if _shared_agents is None:
+        _shared_agents = {agent_type: agent_class() for agent_type, agent_class in AGENT_CLASSES.items()}
+    return _shared_agents
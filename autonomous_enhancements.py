@@ -11,7 +11,6 @@ import redis
 import chromadb
 from chromadb.config import Settings
 import logging
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import KMeans
 from sklearn.ensemble import RandomForestClassifier
@@ -21,6 +20,10 @@ import os
 from dataclasses import dataclass
 from enum import Enum
 
+from config import config
+from embeddings import EmbeddingService, get_embedding_service
+from write_buffer import AsyncBatchBuffer
+
 # Configure structured logging
 logging.basicConfig(
     level=logging.INFO,
@@ -73,60 +76,95 @@ class LearningOutcome:
 class VectorMemoryManager:
     """Manages vector memory for agent experiences using ChromaDB"""
     
-    def __init__(self, collection_name: str = "autopilot_ventures"):
+    def __init__(self, collection_name: str = "autopilot_ventures", embedding_service: Optional[EmbeddingService] = None):
         self.collection_name = collection_name
-        self.client = chromadb.PersistentClient(path="./chroma_db")
+        self.client = chromadb.PersistentClient(path=config.vector_memory.chroma_path)
         
-        # Create or get collection
-        try:
-            self.collection = self.client.get_collection(collection_name)
-        except:
-            self.collection = self.client.create_collection(collection_name)
+        # Local embeddings, cached on disk by text hash
+        self.embeddings = embedding_service or get_embedding_service()
+        self.collection = self._get_collection(collection_name)
+        
+        # Per-step writes are coalesced into batched Chroma adds
+        self.write_buffer = AsyncBatchBuffer(
+            self._flush_records,
+            name=f"chroma:{self.collection.name}",
+            max_batch_size=config.vector_memory.write_batch_size,
+            flush_interval=config.vector_memory.write_flush_interval,
+            max_pending=config.vector_memory.max_pending_writes
+        )
+        
+        logger.info(f"VectorMemoryManager initialized for collection: {self.collection.name}")
+    
+    def _get_collection(self, collection_name: str):
+        """Get or create a cosine collection matching the embedding backend.
         
-        # Initialize vectorizer for text embeddings
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.vectorizer_fitted = False
+        A collection embedded by a different backend or dimension cannot be
+        queried with our vectors, so one is created alongside it instead.
+        """
+        metadata = {
+            "hnsw:space": "cosine",
+            "embedding_backend": self.embeddings.name,
+            "embedding_dimension": self.embeddings.dimension
+        }
+        collection = self.client.get_or_create_collection(collection_name, metadata=metadata)
+        existing = collection.metadata or {}
+        if (existing.get("embedding_backend") == self.embeddings.name
+                and existing.get("embedding_dimension") == self.embeddings.dimension):
+            return collection
         
-        logger.info(f"VectorMemoryManager initialized for collection: {collection_name}")
+        versioned_name = f"{collection_name}_{self.embeddings.name}"
+        logger.warning(
+            f"Collection {collection_name} uses different embeddings, using {versioned_name}"
+        )
+        return self.client.get_or_create_collection(versioned_name, metadata=metadata)
     
     def _get_text_embedding(self, text: str) -> List[float]:
-        """Generate text embedding using TF-IDF"""
-        try:
-            if not self.vectorizer_fitted:
-                # Fit on sample data first
-                sample_texts = ["business creation", "market research", "revenue generation", "customer acquisition"]
-                self.vectorizer.fit(sample_texts)
-                self.vectorizer_fitted = True
-            
-            # Transform the input text
-            embedding = self.vectorizer.transform([text]).toarray()[0]
-            return embedding.tolist()
-        except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            # Return random embedding as fallback
-            return np.random.rand(1000).tolist()
+        """Generate text embedding"""
+        return self.embeddings.embed(text)
+    
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts in one batch"""
+        return self.embeddings.embed_batch(texts)
+    
+    @staticmethod
+    def _memory_record(memory: Memory) -> Dict[str, Any]:
+        """Build the Chroma record for a memory"""
+        return {
+            "id": memory.id,
+            "document": f"{memory.action}: {memory.context}",
+            "embedding_text": f"{memory.action} {memory.context} {memory.outcome}",
+            "metadata": {
+                "kind": "memory",
+                "agent_type": memory.agent_type.value,
+                "action": memory.action,
+                "outcome": memory.outcome,
+                "success_score": memory.success_score,
+                "importance_score": memory.importance_score,
+                "timestamp": memory.timestamp.isoformat(),
+                "id": memory.id
+            }
+        }
+    
+    def _add_records(self, records: List[Dict[str, Any]]) -> int:
+        """Embed records in one batch and add them in one Chroma call"""
+        if not records:
+            return 0
+        self.collection.add(
+            embeddings=self._get_text_embeddings([record["embedding_text"] for record in records]),
+            documents=[record["document"] for record in records],
+            metadatas=[record["metadata"] for record in records],
+            ids=[record["id"] for record in records]
+        )
+        return len(records)
+    
+    async def _flush_records(self, records: List[Dict[str, Any]]) -> None:
+        """Write a buffered batch without blocking the event loop"""
+        await asyncio.to_thread(self._add_records, records)
     
     async def add_memory(self, memory: Memory) -> bool:
-        """Add a new memory to vector storage"""
+        """Add a new memory to vector storage without blocking the event loop"""
         try:
-            # Generate embedding for the memory
-            text_for_embedding = f"{memory.action} {memory.context} {memory.outcome}"
-            embedding = self._get_text_embedding(text_for_embedding)
-            
-            # Add to ChromaDB
-            self.collection.add(
-                embeddings=[embedding],
-                documents=[f"{memory.action}: {memory.context}"],
-                metadatas=[{
-                    "agent_type": memory.agent_type.value,
-                    "outcome": memory.outcome,
-                    "success_score": memory.success_score,
-                    "importance_score": memory.importance_score,
-                    "timestamp": memory.timestamp.isoformat(),
-                    "id": memory.id
-                }],
-                ids=[memory.id]
-            )
+            await asyncio.to_thread(self._add_records, [self._memory_record(memory)])
             
             logger.info(f"Memory added: {memory.id} for agent {memory.agent_type.value}")
             return True
@@ -135,6 +173,31 @@ class VectorMemoryManager:
             logger.error(f"Error adding memory: {e}")
             return False
     
+    async def add_memories(self, memories: List[Memory]) -> int:
+        """Add many memories with one embedding batch and one Chroma round trip"""
+        try:
+            added = await asyncio.to_thread(
+                self._add_records, [self._memory_record(memory) for memory in memories]
+            )
+            logger.info(f"Added {added} memories to {self.collection.name}")
+            return added
+            
+        except Exception as e:
+            logger.error(f"Error adding memories: {e}")
+            return 0
+    
+    async def buffer_memory(self, memory: Memory) -> None:
+        """Queue a memory for a batched write; waits if the buffer is full"""
+        await self.write_buffer.put(self._memory_record(memory))
+    
+    async def flush_writes(self) -> int:
+        """Write all buffered records now"""
+        return await self.write_buffer.flush()
+    
+    async def close(self) -> None:
+        """Stop the write buffer after flushing it"""
+        await self.write_buffer.close()
+    
     async def search_similar_memories(self, query: str, agent_type: Optional[AgentType] = None, 
                                     limit: int = 10) -> List[Dict]:
         """Search for similar memories using vector similarity"""
@@ -146,7 +209,10 @@ class VectorMemoryManager:
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=limit,
-                where={"agent_type": agent_type.value} if agent_type else None
+                where=(
+                    {"$and": [{"kind": "memory"}, {"agent_type": agent_type.value}]}
+                    if agent_type else {"kind": "memory"}
+                )
             )
             
             # Format results
@@ -172,11 +238,14 @@ class VectorMemoryManager:
         try:
             # Query for successful memories
             results = self.collection.query(
-                query_texts=["successful business creation"],
+                query_embeddings=[self._get_text_embedding("successful business creation")],
                 n_results=50,
                 where={
-                    "agent_type": agent_type.value,
-                    "success_score": {"$gte": min_success_score}
+                    "$and": [
+                        {"kind": "memory"},
+                        {"agent_type": agent_type.value},
+                        {"success_score": {"$gte": min_success_score}}
+                    ]
                 }
             )
             
@@ -197,6 +266,58 @@ class VectorMemoryManager:
             logger.error(f"Error getting successful patterns: {e}")
             return []
 
+    async def store_workflow_memory(self, workflow_id: str, insights: Dict[str, Any], timestamp: str) -> bool:
+        """Store a completed workflow's insights for later retrieval"""
+        document = json.dumps(insights, sort_keys=True, default=str)
+        try:
+            await asyncio.to_thread(self._add_records, [{
+                "id": f"workflow_{workflow_id}",
+                "document": document,
+                "embedding_text": document,
+                "metadata": {"kind": "workflow", "workflow_id": workflow_id, "timestamp": timestamp}
+            }])
+            return True
+        except Exception as e:
+            logger.error(f"Error storing workflow memory: {e}")
+            return False
+    
+    async def store_agent_result(self, agent_type: str, params: Dict[str, Any], result: Any, success: bool) -> bool:
+        """Queue an agent execution result for a batched write"""
+        document = json.dumps({"params": params, "result": result}, sort_keys=True, default=str)
+        await self.write_buffer.put({
+            "id": f"result_{uuid.uuid4().hex}",
+            "document": document,
+            "embedding_text": document,
+            "metadata": {
+                "kind": "agent_result",
+                "agent_type": str(agent_type),
+                "success_score": 1.0 if success else 0.0,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        })
+        return True
+    
+    async def search_similar_workflows(self, query: str, limit: int = 5) -> List[Dict]:
+        """Search stored workflows most similar to a workflow description"""
+        try:
+            results = self.collection.query(
+                query_embeddings=[self._get_text_embedding(query)],
+                n_results=limit,
+                where={"kind": "workflow"}
+            )
+            return [
+                {
+                    "id": results['ids'][0][i],
+                    "document": results['documents'][0][i],
+                    "metadata": results['metadatas'][0][i],
+                    "distance": results['distances'][0][i]
+                }
+                for i in range(len(results['ids'][0]))
+            ]
+        except Exception as e:
+            logger.error(f"Error searching workflows: {e}")
+            return []
+
 class SelfTuningAgent:
     """Self-tuning agent with reinforcement learning capabilities"""
     
@@ -0,0 +1,209 @@
+"""Run workflows for many startups over one shared set of agents."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from agents import register_startup_agents, startup_context
+from utils import generate_id
+from workflow_scheduler import DAGScheduler, StepOutcome
+
+logger = logging.getLogger(__name__)
+
+
+class FairConcurrencyLimiter:
+    """Global concurrency budget granted round-robin between startups.
+
+    A plain semaphore wakes waiters in arrival order, so a startup that
+    queues fifty steps at once starves everyone queued behind it. Here each
+    startup has its own wait queue and a freed slot goes to the next startup
+    in rotation.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: 'OrderedDict[str, Deque[asyncio.Future]]' = OrderedDict()
+        self.stats = {'acquired': 0, 'waited': 0}
+
+    async def acquire(self, key: str) -> None:
+        """Wait for a slot on behalf of ``key``."""
+        self.stats['acquired'] += 1
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        self.stats['waited'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the slot to the next waiting startup, or free it."""
+        while self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block."""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def waiting(self) -> Dict[str, int]:
+        """Queued acquisitions per startup."""
+        return {key: len(queue) for key, queue in self._waiters.items()}
+
+
+@dataclass
+class StartupContext:
+    """Per-startup state for one batch run; everything else is shared."""
+
+    startup_id: str
+    workflow_id: str = field(default_factory=lambda: generate_id("workflow"))
+    outcomes: Dict[str, StepOutcome] = field(default_factory=dict)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    error: Optional[str] = None
+    schedule: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def execution_time(self) -> float:
+        return self.finished_at - self.started_at
+
+
+class BatchWorkflowRunner:
+    """Runs one workflow per startup with shared agents and a global budget.
+
+    ``execute_step(context, step, upstream)`` runs inside
+    ``startup_context(context.startup_id)``, so shared agents attribute
+    their stats, logs and database rows to the right startup. With
+    ``register_agents`` each startup's agent rows are created in one insert
+    off the event loop before its steps run. ``run`` takes optional
+    ``on_start(context)`` and ``on_outcome(context, outcome)`` hooks, e.g.
+    to checkpoint each startup's workflow under ``context.workflow_id``.
+    """
+
+    def __init__(
+        self,
+        execute_step: Callable[[StartupContext, Any, Dict[str, Any]], Awaitable[Any]],
+        max_concurrent: int = 20,
+        max_concurrent_per_startup: int = 3,
+        max_active_startups: int = 100,
+        duration_estimates: Optional[Dict[str, float]] = None,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        register_agents: bool = True
+    ):
+        """Initialize runner.
+
+        Args:
+            execute_step: coroutine function running one step for a startup
+            max_concurrent: steps running at once across all startups
+            max_concurrent_per_startup: steps running at once for one startup
+            max_active_startups: startups with a workflow in progress at once
+            duration_estimates: expected step durations used for critical-path ordering
+            register_agents: create database agent rows for each startup's step types
+        """
+        self.execute_step = execute_step
+        self.max_concurrent_per_startup = max_concurrent_per_startup
+        self.duration_estimates = duration_estimates if duration_estimates is not None else {}
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.register_agents = register_agents
+        self.limiter = FairConcurrencyLimiter(max_concurrent)
+        self._startup_slots = asyncio.Semaphore(max(1, max_active_startups))
+        self.stats = {'startups': 0, 'failed_startups': 0, 'steps': 0}
+
+    async def run(
+        self,
+        workflows: Dict[str, List[Any]],
+        on_start: Optional[Callable[[StartupContext], None]] = None,
+        on_outcome: Optional[Callable[[StartupContext, StepOutcome], None]] = None
+    ) -> Dict[str, StartupContext]:
+        """Run the given steps for each startup id; returns contexts by startup id.
+
+        ``on_start`` is called before a startup's first step and
+        ``on_outcome`` as each of its steps finishes or is skipped.
+        """
+        contexts = {startup_id: StartupContext(startup_id) for startup_id in workflows}
+        await asyncio.gather(*(
+            self._run_startup(contexts[startup_id], steps, on_start, on_outcome)
+            for startup_id, steps in workflows.items()
+        ))
+        return contexts
+
+    async def _run_startup(
+        self,
+        context: StartupContext,
+        steps: List[Any],
+        on_start: Optional[Callable[[StartupContext], None]] = None,
+        on_outcome: Optional[Callable[[StartupContext, StepOutcome], None]] = None
+    ) -> None:
+        """Run one startup's workflow; failures are recorded on the context."""
+        async with self._startup_slots:
+            context.started_at = time.time()
+            agent_ids = None
+            if self.register_agents:
+                agent_types = list(dict.fromkeys(step.agent_type for step in steps))
+                agent_ids = await asyncio.to_thread(register_startup_agents, context.startup_id, agent_types)
+            with startup_context(context.startup_id, agent_ids):
+                try:
+                    if on_start is not None:
+                        on_start(context)
+                    scheduler = DAGScheduler(
+                        steps,
+                        max_concurrent=self.max_concurrent_per_startup,
+                        duration_estimates=self.duration_estimates,
+                        retry_backoff=self.retry_backoff,
+                        max_retry_backoff=self.max_retry_backoff,
+                        slot=lambda: self.limiter.slot(context.startup_id)
+                    )
+
+                    async def execute(step: Any, upstream: Dict[str, Any]) -> Any:
+                        return await self.execute_step(context, step, upstream)
+
+                    context.outcomes = await scheduler.run(
+                        execute,
+                        on_outcome=(lambda outcome: on_outcome(context, outcome)) if on_outcome else None
+                    )
+                    context.schedule = scheduler.get_stats()
+                except Exception as e:
+                    logger.error(f"Batch workflow for {context.startup_id} failed: {e}")
+                    context.error = str(e)
+            context.finished_at = time.time()
+
+        self.stats['startups'] += 1
+        self.stats['steps'] += len(context.outcomes)
+        if context.error or not all(outcome.success for outcome in context.outcomes.values()):
+            self.stats['failed_startups'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput and fairness counters."""
+        return {
+            **self.stats,
+            'active_steps': self.limiter.active,
+            'waiting_steps': self.limiter.waiting(),
+            'slot_waits': self.limiter.stats['waited']
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Cache Client Benchmark
+Compares the blocking CacheManager path with AsyncCacheManager against a
+local Redis stand-in (fakeredis over TCP, so every call is a real round trip)
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import redis
+import redis.asyncio as aioredis
+from fakeredis import TcpFakeServer
+
+from redis_cache import CacheManager, AsyncCacheManager, LocalCache
+
+
+class BenchmarkServer(TcpFakeServer):
+    """fakeredis TCP server with a listen backlog sized for concurrent clients"""
+    request_queue_size = 128
+
+
+def start_server(port: int) -> TcpFakeServer:
+    """Run a fakeredis TCP server on a background thread"""
+    server = BenchmarkServer(("127.0.0.1", port), server_type="redis")
+    # Real Redis sets TCP_NODELAY; without it pipelined replies stall on delayed ACKs
+    server.RequestHandlerClass.disable_nagle_algorithm = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def report(label: str, latencies):
+    """Print p50/p95 for a list of millisecond latencies"""
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<44} p50 {statistics.median(latencies):8.3f}ms | p95 {p95:8.3f}ms")
+
+
+async def measure(request, concurrency: int, rounds: int):
+    """Run concurrent handlers while a heartbeat measures event loop stalls
+
+    Returns per-request latencies, wall time and the worst heartbeat delay,
+    all in milliseconds.
+    """
+    latencies = []
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append((time.perf_counter() - started) * 1000 - 1)
+
+    async def handler():
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    wall = (time.perf_counter() - started) * 1000
+    done.set()
+    await beat
+    return latencies, wall, max(stalls) if stalls else 0.0
+
+
+async def run(args):
+    server = start_server(args.port)
+    sync_client = redis.Redis(port=args.port, decode_responses=False)
+    # No local tier so every lookup measures the Redis path itself
+    manager = CacheManager(sync_client, local_cache=LocalCache(max_entries=0))
+    async_manager = AsyncCacheManager(
+        manager, aioredis.Redis(port=args.port, decode_responses=False, max_connections=args.concurrency)
+    )
+
+    keys = [f"autopilot:bench:{i}" for i in range(args.keys)]
+    await async_manager.mset({key: {"value": i, "payload": "x" * 200} for i, key in enumerate(keys)}, ttl=600)
+
+    print("🧪 CACHE CLIENT BENCHMARK")
+    print("=" * 72)
+    print(f"{args.keys} keys per request, {args.rounds} requests per handler")
+
+    async def sync_request():
+        # One blocking GET per key, as the domain caches did before
+        for key in keys:
+            manager.get(key)
+
+    async def async_request():
+        await async_manager.mget(keys)
+
+    for concurrency in (1, args.concurrency):
+        print(f"\n{concurrency} concurrent handler(s):")
+        for label, request in (
+            ("sync CacheManager, one GET per key", sync_request),
+            ("AsyncCacheManager, pipelined MGET", async_request),
+        ):
+            latencies, wall, stall = await measure(request, concurrency, args.rounds)
+            report(label, latencies)
+            print(f"{'':<44} wall {wall:8.1f}ms | worst loop stall {stall:7.2f}ms")
+
+    manager.close()
+    await async_manager.close()
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async cache client paths")
+    parser.add_argument("--keys", type=int, default=20, help="keys read per request")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent handlers")
+    parser.add_argument("--rounds", type=int, default=25, help="requests per handler")
+    parser.add_argument("--port", type=int, default=16390, help="fakeredis TCP port")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Memory Search Benchmark
+Measures SimpleVectorMemory query latency as the memory table grows
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from phase1_autonomous_integration import SimpleVectorMemory, Memory, AgentType
+
+VOCABULARY = [f"term{i}" for i in range(20000)]
+COMMON_WORDS = ["the", "and", "for", "market", "customer", "growth", "launch", "product"]
+BATCH_SIZE = 10000
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    """Synthetic text mixing common words with a long-tail vocabulary"""
+    tokens = rng.sample(COMMON_WORDS, 2) + [rng.choice(VOCABULARY) for _ in range(words)]
+    rng.shuffle(tokens)
+    return " ".join(tokens)
+
+
+def populate(memory: SimpleVectorMemory, target: int, rng: random.Random):
+    """Grow the memory table to ``target`` rows"""
+    agent_types = list(AgentType)
+    start = datetime.utcnow() - timedelta(days=365)
+    while memory._memory_count < target:
+        count = min(BATCH_SIZE, target - memory._memory_count)
+        offset = memory._memory_count
+        memory.add_memories_sync([
+            Memory(
+                id=f"bench_{offset + i}",
+                agent_type=rng.choice(agent_types),
+                action=random_text(rng, 3),
+                context=random_text(rng, 8),
+                outcome=random_text(rng, 3),
+                success_score=rng.random(),
+                timestamp=start + timedelta(seconds=offset + i),
+                importance_score=rng.random()
+            )
+            for i in range(count)
+        ])
+
+
+def full_scan_search(db_path: str, query: str, limit: int = 10):
+    """Previous implementation: load every memory and score it in Python"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT * FROM memories ORDER BY timestamp DESC').fetchall()
+    conn.close()
+    words = set(query.lower().split())
+    scored = []
+    for row in rows:
+        other = set(f"{row[2]} {row[3]} {row[4]}".lower().split())
+        scored.append((len(words & other) / len(words | other), row[0]))
+    scored.sort(reverse=True)
+    return scored[:limit]
+
+
+def time_queries(search, queries):
+    """Latencies in milliseconds for each query"""
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimpleVectorMemory search latency")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma separated memory counts")
+    parser.add_argument("--queries", type=int, default=50, help="queries per size")
+    parser.add_argument("--compare", action="store_true", help="also time the old full-scan search")
+    parser.add_argument("--db", help="database path (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "memory_benchmark.db")
+    memory = SimpleVectorMemory(db_path)
+    queries = [random_text(rng, 4) for _ in range(args.queries)]
+
+    print("🔎 MEMORY SEARCH BENCHMARK")
+    print("=" * 60)
+    print(f"Database: {db_path}")
+
+    for size in sorted(int(value) for value in args.sizes.split(",")):
+        started = time.perf_counter()
+        populate(memory, size, rng)
+        load_time = time.perf_counter() - started
+
+        latencies = time_queries(lambda q: memory.search_similar_memories_sync(q, limit=10), queries)
+        latencies.sort()
+        line = (
+            f"{size:>9,} memories | load {load_time:6.1f}s | "
+            f"p50 {statistics.median(latencies):7.2f}ms | "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:7.2f}ms"
+        )
+        if args.compare:
+            scan = time_queries(lambda q: full_scan_search(db_path, q), queries[:5])
+            line += f" | full scan p50 {statistics.median(scan):8.2f}ms"
+        print(line)
+
+    memory.close()
+
+
+if __name__ == "__main__":
+    main()
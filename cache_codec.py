@@ -0,0 +1,264 @@
+"""Binary value codecs for the Redis cache layer.
+
+Every encoded value starts with a five byte header: magic byte, format
+version, serializer id, compression id and flags. Instances of types
+registered with ``register_cache_type`` are written with a type tag and
+decode back to their class, at any depth. Version 1 values (four byte
+header, no flags) and values written before the header existed are still
+readable.
+"""
+
+import dataclasses
+import json
+import logging
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Optional faster serializers / compressors
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xAC
+FORMAT_VERSION = 2
+HEADER_SIZES = {1: 4, 2: 5}  # by format version
+FLAG_TYPED = 0x01  # payload contains type-tagged values
+
+TYPE_TAG = '__cache_type__'
+
+SERIALIZERS = {'json': 1, 'orjson': 2, 'msgpack': 3}
+COMPRESSIONS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024  # bytes
+
+# Type name <-> class for values that decode back to their class
+_registered_types: Dict[str, type] = {}
+_type_names: Dict[type, str] = {}
+
+
+def register_cache_type(cls: type = None, name: Optional[str] = None):
+    """Register a dataclass or pydantic model so cached instances keep their class.
+
+    Usable as a plain call or a class decorator. The name is stored with each
+    value, so it must stay stable across deploys (defaults to module.qualname).
+    """
+    def register(target: type) -> type:
+        type_name = name or f"{target.__module__}.{target.__qualname__}"
+        _registered_types[type_name] = target
+        _type_names[target] = type_name
+        return target
+    return register(cls) if cls is not None else register
+
+
+def _restore_type(type_name: str, data: Any) -> Any:
+    cls = _registered_types.get(type_name)
+    if cls is None:
+        logger.warning(f"Cached value has unregistered type {type_name}; returning plain data")
+        return data
+    if hasattr(cls, 'model_validate'):
+        return cls.model_validate(data)
+    if hasattr(cls, 'parse_obj'):
+        return cls.parse_obj(data)
+    return cls(**data)
+
+
+def restore_types(value: Any) -> Any:
+    """Rebuild type-tagged values, innermost first."""
+    if isinstance(value, dict):
+        restored = {key: restore_types(item) for key, item in value.items()}
+        if TYPE_TAG in restored and len(restored) == 2 and 'value' in restored:
+            return _restore_type(restored[TYPE_TAG], restored['value'])
+        return restored
+    if isinstance(value, list):
+        return [restore_types(item) for item in value]
+    return value
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert values serializers cannot handle natively into plain data."""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if hasattr(value, 'dict') and callable(value.dict):
+        return value.dict()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class CacheCodec:
+    """Serializes cache values to compact, self-describing bytes."""
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+    ):
+        """Initialize codec.
+
+        Args:
+            serializer: 'msgpack', 'orjson' or 'json'; defaults to the fastest installed
+            compression: 'zstd', 'lz4', 'zlib' or 'none'; defaults to the best installed
+            compression_threshold: payloads smaller than this are stored uncompressed
+        """
+        self.serializer = serializer or (
+            'msgpack' if MSGPACK_AVAILABLE else 'orjson' if ORJSON_AVAILABLE else 'json'
+        )
+        self.compression = compression or (
+            'zstd' if ZSTD_AVAILABLE else 'lz4' if LZ4_AVAILABLE else 'zlib'
+        )
+        if self.serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer: {self.serializer}")
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown cache compression: {self.compression}")
+        self.compression_threshold = compression_threshold
+
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+        self.stats = {'encoded': 0, 'compressed': 0, 'payload_bytes': 0, 'stored_bytes': 0}
+
+    def encode(self, value: Any) -> bytes:
+        """Encode a value with header."""
+        payload, typed = self._serialize(value)
+        compression = 'none'
+        if self.compression != 'none' and len(payload) >= self.compression_threshold:
+            compressed = self._compress(payload, self.compression)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+
+        encoded = bytes((
+            MAGIC, FORMAT_VERSION, SERIALIZERS[self.serializer], COMPRESSIONS[compression],
+            FLAG_TYPED if typed else 0
+        )) + payload
+        self.stats['encoded'] += 1
+        self.stats['compressed'] += compression != 'none'
+        self.stats['stored_bytes'] += len(encoded)
+        return encoded
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a value written by any serializer/compression combination."""
+        serializer_id, compression_id, flags, header_size = self._parse_header(data)
+        payload = self._decompress(data[header_size:], compression_id)
+        value = self._deserialize(payload, serializer_id)
+        return restore_types(value) if flags & FLAG_TYPED else value
+
+    @staticmethod
+    def is_encoded(data: Any) -> bool:
+        """Whether data carries a codec header."""
+        return (
+            isinstance(data, (bytes, bytearray))
+            and len(data) >= 2
+            and data[0] == MAGIC
+            and data[1] in HEADER_SIZES
+            and len(data) >= HEADER_SIZES[data[1]]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Codec settings and size counters."""
+        payload, stored = self.stats['payload_bytes'], self.stats['stored_bytes']
+        return {
+            'serializer': self.serializer,
+            'compression': self.compression,
+            'compression_threshold': self.compression_threshold,
+            **self.stats,
+            'compression_ratio': stored / payload if payload else 1.0
+        }
+
+    def _parse_header(self, data: bytes) -> Tuple[int, int, int, int]:
+        """Returns serializer id, compression id, flags and header size."""
+        if not self.is_encoded(data):
+            raise ValueError("Value has no cache codec header")
+        header_size = HEADER_SIZES[data[1]]
+        flags = data[4] if header_size > 4 else 0
+        return data[2], data[3], flags, header_size
+
+    @staticmethod
+    def _tagging_default() -> Tuple[Callable[[Any], Any], list]:
+        """Serializer ``default`` hook that tags registered types; the list records if it did."""
+        tagged = []
+
+        def default(value: Any) -> Any:
+            type_name = _type_names.get(type(value))
+            if type_name is None:
+                return to_builtin(value)
+            tagged.append(type_name)
+            return {TYPE_TAG: type_name, 'value': to_builtin(value)}
+        return default, tagged
+
+    def _serialize(self, value: Any) -> Tuple[bytes, bool]:
+        default, tagged = self._tagging_default()
+        if self.serializer == 'msgpack':
+            payload = msgpack.packb(value, default=default, use_bin_type=True)
+        elif self.serializer == 'orjson':
+            payload = orjson.dumps(value, default=default, option=(
+                orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+            ))
+        else:
+            payload = json.dumps(value, default=default, separators=(',', ':')).encode()
+        self.stats['payload_bytes'] += len(payload)
+        return payload, bool(tagged)
+
+    @staticmethod
+    def _deserialize(payload: bytes, serializer_id: int) -> Any:
+        if serializer_id == SERIALIZERS['msgpack']:
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Value was encoded with msgpack, which is not installed")
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if serializer_id == SERIALIZERS['orjson']:
+            return orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+        if serializer_id == SERIALIZERS['json']:
+            return json.loads(payload)
+        raise ValueError(f"Unknown serializer id {serializer_id}")
+
+    def _compress(self, payload: bytes, compression: str) -> bytes:
+        if compression == 'zstd':
+            return self._zstd_compressor.compress(payload)
+        if compression == 'lz4':
+            return lz4.frame.compress(payload)
+        return zlib.compress(payload, 6)
+
+    def _decompress(self, payload: bytes, compression_id: int) -> bytes:
+        if compression_id == COMPRESSIONS['none']:
+            return payload
+        if compression_id == COMPRESSIONS['zlib']:
+            return zlib.decompress(payload)
+        if compression_id == COMPRESSIONS['zstd']:
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Value was compressed with zstd, which is not installed")
+            return self._zstd_decompressor.decompress(payload)
+        if compression_id == COMPRESSIONS['lz4']:
+            if not LZ4_AVAILABLE:
+                raise ValueError("Value was compressed with lz4, which is not installed")
+            return lz4.frame.decompress(payload)
+        raise ValueError(f"Unknown compression id {compression_id}")
@@ -2,7 +2,7 @@
 
 import os
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 import base64
 from cryptography.fernet import Fernet
@@ -41,6 +41,7 @@ class SecurityConfig:
         default_factory=lambda: ['malicious.com', 'spam.com']
     )
     content_safety_threshold: float = field(default=0.7)
+    content_safety_cache_size: int = field(default=10000)
     max_file_size: int = field(default=10 * 1024 * 1024)  # 10MB
     
     # New security settings
@@ -80,6 +81,23 @@ class DatabaseConfig:
     )
     backup_interval: int = field(default=24)  # hours
     max_startups: int = field(default=100)
+    pool_size: int = field(
+        default_factory=lambda: int(os.getenv('DATABASE_POOL_SIZE', '10'))
+    )
+    max_overflow: int = field(
+        default_factory=lambda: int(os.getenv('DATABASE_MAX_OVERFLOW', '20'))
+    )
+    pool_timeout: int = field(default=30)  # seconds
+    pool_recycle: int = field(default=1800)  # seconds
+    statement_cache_size: int = field(default=500)
+    write_batch_size: int = field(default=500)
+    write_flush_interval: float = field(default=2.0)  # seconds
+    cleanup_batch_size: int = field(default=5000)
+    cleanup_pause: float = field(default=0.05)  # seconds between chunks
+    partition_metrics: bool = field(
+        default_factory=lambda: os.getenv('DATABASE_PARTITION_METRICS', 'false').lower() == 'true'
+    )
+    metrics_partitions_ahead: int = field(default=2)  # months
 
 
 @dataclass
@@ -132,10 +150,158 @@ class MessageBusConfig:
     message_ttl: int = field(default=300)  # 5 minutes
     context_ttl: int = field(default=3600)  # 1 hour
     max_concurrent_processing: int = field(default=10)
+    subscriber_inbox_size: int = field(default=100)
+    delivery_timeout: float = field(default=5.0)  # seconds a full inbox may block dispatch
+    max_message_history: int = field(default=10000)
+    sweep_interval: float = field(default=1.0)  # seconds between expiry sweeps
+    transport: str = field(
+        default_factory=lambda: os.getenv('MESSAGE_BUS_TRANSPORT', 'memory')
+    )  # 'memory' or 'redis_streams'
+    redis_url: str = field(
+        default_factory=lambda: os.getenv('MESSAGE_BUS_REDIS_URL', 'redis://localhost:6379/0')
+    )
+    stream_batch_size: int = field(default=100)
+    stream_block_ms: int = field(default=1000)
+    stream_max_length: int = field(default=100000)  # approximate MAXLEN per priority stream
+    stream_claim_idle_ms: int = field(default=60000)  # reclaim entries a crashed consumer left pending
+    consumer_name: str = field(
+        default_factory=lambda: os.getenv('MESSAGE_BUS_CONSUMER_NAME', '')
+    )  # stable per-process name so delivery groups survive restarts; empty for an ephemeral one
     enable_conflict_resolution: bool = field(default=True)
     enable_shared_context: bool = field(default=True)
 
 
+@dataclass
+class LLMPoolConfig:
+    """Shared LLM execution pool configuration."""
+    
+    max_workers: int = field(
+        default_factory=lambda: int(os.getenv('LLM_POOL_WORKERS', '8'))
+    )
+    max_queue_size: int = field(default=1000)
+    default_tokens_per_minute: int = field(default=90000)
+    model_tokens_per_minute: Dict[str, int] = field(
+        default_factory=lambda: {
+            'gpt-4': 40000,
+            'gpt-3.5-turbo': 90000,
+        }
+    )
+    enable_coalescing: bool = field(default=True)
+
+
+@dataclass
+class LLMCacheConfig:
+    """Agent LLM response cache configuration."""
+    
+    enabled: bool = field(
+        default_factory=lambda: os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    )
+    max_entries: int = field(default=2000)
+    default_ttl: int = field(default=3600)  # 1 hour
+    agent_ttls: Dict[str, int] = field(
+        default_factory=lambda: {
+            'niche_research': 86400,
+            'mvp_design': 43200,
+            'marketing_strategy': 43200,
+            'content_creation': 3600,
+            'analytics': 900,
+            'operations_monetization': 43200,
+            'funding_investor': 43200,
+            'legal_compliance': 86400,
+            'hr_team_building': 43200,
+            'customer_support_scaling': 43200,
+        }
+    )
+    enable_near_duplicate: bool = field(default=False)
+    near_duplicate_threshold: float = field(default=0.9)
+    near_duplicate_window: int = field(default=200)
+
+
+@dataclass
+class VectorMemoryConfig:
+    """Agent vector memory and embedding configuration."""
+    
+    embedding_backend: str = field(
+        default_factory=lambda: os.getenv('EMBEDDING_BACKEND', 'hashing')
+    )
+    embedding_model: str = field(
+        default_factory=lambda: os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    )
+    embedding_dimension: int = field(default=1024)  # hashing backend only
+    embedding_cache_path: str = field(
+        default_factory=lambda: os.getenv('EMBEDDING_CACHE_PATH', 'embedding_cache.db')
+    )
+    chroma_path: str = field(
+        default_factory=lambda: os.getenv('CHROMA_PATH', './chroma_db')
+    )
+    write_batch_size: int = field(default=64)
+    write_flush_interval: float = field(default=1.0)  # seconds
+    max_pending_writes: int = field(default=1000)
+
+
+@dataclass
+class ReinforcementLearningConfig:
+    """Adaptive reinforcement learning configuration."""
+    
+    replay_capacity: int = field(
+        default_factory=lambda: int(os.getenv('RL_REPLAY_CAPACITY', '10000'))
+    )  # episodes kept per agent type
+    q_table_backend: str = field(
+        default_factory=lambda: os.getenv('RL_Q_TABLE_BACKEND', 'dict')
+    )  # 'dict' or 'numpy'
+    episode_sink: str = field(
+        default_factory=lambda: os.getenv('RL_EPISODE_SINK', 'redis')
+    )  # 'redis', 'file' or 'none'
+    episode_log_path: str = field(
+        default_factory=lambda: os.getenv('RL_EPISODE_LOG', 'rl_episodes.jsonl')
+    )
+    episode_retention_days: int = field(default=30)
+    sink_batch_size: int = field(default=200)
+    sink_flush_interval: float = field(default=1.0)  # seconds
+    sink_max_buffered: int = field(default=10000)
+
+
+@dataclass
+class WorkflowConfig:
+    """Enhanced orchestrator workflow scheduling configuration."""
+    
+    retry_backoff: float = field(default=1.0)  # seconds before the first retry, doubled after each
+    max_retry_backoff: float = field(default=30.0)
+    duration_smoothing: float = field(default=0.3)  # weight of the latest run in step duration estimates
+    upstream_context_chars: int = field(default=1500)  # upstream output passed to each dependent step
+    batch_max_concurrent: int = field(
+        default_factory=lambda: int(os.getenv('WORKFLOW_BATCH_CONCURRENCY', '20'))
+    )  # steps running at once across all startups in a batch
+    batch_max_concurrent_per_startup: int = field(default=3)
+    batch_max_active_startups: int = field(default=100)
+    checkpoint_backend: str = field(
+        default_factory=lambda: os.getenv('WORKFLOW_CHECKPOINT_BACKEND', 'sqlite')
+    )  # 'sqlite', 'redis' or 'none'
+    checkpoint_path: str = field(
+        default_factory=lambda: os.getenv('WORKFLOW_CHECKPOINT_PATH', 'workflow_checkpoints.db')
+    )
+    checkpoint_redis_url: str = field(
+        default_factory=lambda: os.getenv('WORKFLOW_CHECKPOINT_REDIS_URL', 'redis://localhost:6379/0')
+    )
+    checkpoint_ttl: int = field(default=7 * 86400)  # seconds since a workflow's last update
+    checkpoint_flush_interval: float = field(default=0.5)  # seconds
+    history_max_entries: int = field(default=1000)  # workflow summaries kept in memory per orchestrator
+    result_archive_path: str = field(
+        default_factory=lambda: os.getenv('WORKFLOW_RESULT_ARCHIVE', 'workflow_results.db')
+    )  # empty disables archiving full results
+
+
+@dataclass
+class SwarmConfig:
+    """Decentralized agent swarm task dispatch configuration."""
+    
+    max_workers: int = field(
+        default_factory=lambda: int(os.getenv('SWARM_MAX_WORKERS', '0'))
+    )  # 0 sizes the pool from local node CPU capacity
+    workers_per_cpu: int = field(default=4)  # tasks are mostly I/O bound
+    latency_window: int = field(default=1000)  # latency samples kept per priority
+
+
 @dataclass
 class CulturalConfig:
     """Cultural intelligence configuration."""
@@ -162,6 +328,14 @@ class Config:
     )
     stripe: StripeConfig = field(default_factory=StripeConfig)
     message_bus: MessageBusConfig = field(default_factory=MessageBusConfig)
+    llm_pool: LLMPoolConfig = field(default_factory=LLMPoolConfig)
+    llm_cache: LLMCacheConfig = field(default_factory=LLMCacheConfig)
+    vector_memory: VectorMemoryConfig = field(default_factory=VectorMemoryConfig)
+    reinforcement_learning: ReinforcementLearningConfig = field(
+        default_factory=ReinforcementLearningConfig
+    )
+    workflow: WorkflowConfig = field(default_factory=WorkflowConfig)
+    swarm: SwarmConfig = field(default_factory=SwarmConfig)
     cultural: CulturalConfig = field(default_factory=CulturalConfig)
     
     def __post_init__(self):
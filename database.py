@@ -9,7 +9,7 @@ from pathlib import Path
 
 from sqlalchemy import (
     create_engine, Column, String, Integer, Float, DateTime, 
-    Text, Boolean, ForeignKey, JSON
+    Text, Boolean, ForeignKey, JSON, Index, update, insert, bindparam, func
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
@@ -17,6 +17,8 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from config import config
 from utils import generate_id, TimeUtils
+from write_buffer import WriteBehindBuffer
+from db_maintenance import delete_in_chunks
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -114,6 +116,12 @@ class Task(Base):
     # Relationships
     startup = relationship("Startup", back_populates="tasks")
     
+    # Indexes for hot query paths
+    __table_args__ = (
+        Index('idx_tasks_startup_status_created', 'startup_id', 'status', 'created_at'),
+        Index('idx_tasks_created_at', 'created_at'),
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -145,6 +153,12 @@ class Metrics(Base):
     # Relationships
     startup = relationship("Startup", back_populates="metrics")
     
+    # Indexes for hot query paths
+    __table_args__ = (
+        Index('idx_metrics_startup_type_time', 'startup_id', 'metric_type', 'timestamp'),
+        Index('idx_metrics_timestamp', 'timestamp'),
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -157,6 +171,38 @@ class Metrics(Base):
         }
 
 
+def agent_stats_update_statement():
+    """Build the executemany UPDATE that merges stats deltas into agents."""
+    current_count = func.coalesce(Agent.execution_count, 0)
+    current_rate = func.coalesce(Agent.success_rate, 0.0)
+    return (
+        update(Agent)
+        .where(Agent.id == bindparam('b_agent_id'))
+        .values(
+            execution_count=current_count + bindparam('b_executions'),
+            success_rate=(
+                current_rate * current_count + bindparam('b_successes')
+            ) / (current_count + bindparam('b_executions')),
+            last_execution=bindparam('b_last_execution')
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def agent_stats_params(stats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert accumulator entries to bind parameters for the stats UPDATE."""
+    return [
+        {
+            'b_agent_id': entry['agent_id'],
+            'b_executions': entry['executions'],
+            'b_successes': float(entry['successes']),
+            'b_last_execution': entry['last_execution']
+        }
+        for entry in stats or []
+        if entry.get('executions')
+    ]
+
+
 class DatabaseManager:
     """Database management class."""
     
@@ -165,6 +211,7 @@ class DatabaseManager:
         self.database_url = database_url or config.database.url
         self.engine = None
         self.SessionLocal = None
+        self._write_buffer: Optional[WriteBehindBuffer] = None
         self._initialize_database()
     
     def _initialize_database(self) -> None:
@@ -184,8 +231,9 @@ class DatabaseManager:
                 bind=self.engine
             )
             
-            # Create tables
+            # Create tables, and indexes added after a table already existed
             Base.metadata.create_all(bind=self.engine)
+            self._ensure_indexes()
             
             # Set proper permissions for SQLite file
             if 'sqlite' in self.database_url:
@@ -202,6 +250,12 @@ class DatabaseManager:
             logger.error(f"Database initialization failed: {e}")
             raise
     
+    def _ensure_indexes(self) -> None:
+        """Create any model indexes missing from existing tables."""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+    
     def get_session(self) -> Session:
         """Get database session."""
         return self.SessionLocal()
@@ -304,6 +358,20 @@ class DatabaseManager:
                 session.refresh(agent)
             return agent
     
+    def apply_agent_stats(self, stats: List[Dict[str, Any]]) -> int:
+        """Apply accumulated execution stats to agents in one batched UPDATE.
+
+        Each entry needs ``agent_id``, ``executions``, ``successes`` and
+        ``last_execution``; counts are added to the stored totals.
+        """
+        params = agent_stats_params(stats)
+        if not params:
+            return 0
+
+        with self.engine.begin() as connection:
+            connection.execute(agent_stats_update_statement(), params)
+        return len(params)
+    
     def create_task(
         self, 
         startup_id: str, 
@@ -369,6 +437,128 @@ class DatabaseManager:
             session.refresh(metric)
             return metric
     
+    @staticmethod
+    def _agent_row(
+        startup_id: str,
+        agent_type: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build an insert row for the agents table."""
+        return {
+            'id': generate_id("agent"),
+            'startup_id': startup_id,
+            'agent_type': agent_type,
+            'status': 'active',
+            'execution_count': 0,
+            'success_rate': 0.0,
+            'created_at': datetime.utcnow(),
+            'metadata_json': metadata or {}
+        }
+    
+    @staticmethod
+    def _task_row(
+        startup_id: str,
+        task_type: str,
+        description: str = "",
+        priority: int = 1,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build an insert row for the tasks table."""
+        return {
+            'id': generate_id("task"),
+            'startup_id': startup_id,
+            'task_type': task_type,
+            'status': 'pending',
+            'description': description,
+            'priority': priority,
+            'created_at': datetime.utcnow(),
+            'metadata_json': metadata or {}
+        }
+    
+    @staticmethod
+    def _metric_row(
+        startup_id: str,
+        metric_type: str,
+        value: float,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Build an insert row for the metrics table."""
+        return {
+            'id': generate_id("metric"),
+            'startup_id': startup_id,
+            'metric_type': metric_type,
+            'value': value,
+            'timestamp': timestamp or datetime.utcnow(),
+            'metadata_json': metadata or {}
+        }
+    
+    def _insert_rows(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows into a table with a single executemany."""
+        if not rows:
+            return 0
+        table = Base.metadata.tables[table_name]
+        with self.engine.begin() as connection:
+            connection.execute(insert(table), rows)
+        return len(rows)
+    
+    def create_agents_bulk(self, agents: List[Dict[str, Any]]) -> List[str]:
+        """Create many agents in one transaction; returns the new agent IDs.
+
+        Each entry takes the keyword arguments of ``create_agent``.
+        """
+        rows = [self._agent_row(**agent) for agent in agents]
+        self._insert_rows(Agent.__tablename__, rows)
+        return [row['id'] for row in rows]
+    
+    def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        """Create many tasks in one transaction; returns the new task IDs.
+
+        Each entry takes the keyword arguments of ``create_task``.
+        """
+        rows = [self._task_row(**task) for task in tasks]
+        self._insert_rows(Task.__tablename__, rows)
+        return [row['id'] for row in rows]
+    
+    def create_metrics_bulk(self, metrics: List[Dict[str, Any]]) -> List[str]:
+        """Create many metrics in one transaction; returns the new metric IDs.
+
+        Each entry takes the keyword arguments of ``create_metric`` plus an
+        optional ``timestamp``.
+        """
+        rows = [self._metric_row(**metric) for metric in metrics]
+        self._insert_rows(Metrics.__tablename__, rows)
+        return [row['id'] for row in rows]
+    
+    @property
+    def write_buffer(self) -> WriteBehindBuffer:
+        """Write-behind buffer shared by buffer_task and buffer_metric."""
+        if self._write_buffer is None:
+            self._write_buffer = WriteBehindBuffer(
+                self._insert_rows,
+                max_batch_size=config.database.write_batch_size,
+                flush_interval=config.database.write_flush_interval
+            )
+        return self._write_buffer
+    
+    def buffer_task(self, startup_id: str, task_type: str, **kwargs) -> str:
+        """Queue a task insert on the write-behind buffer; returns its ID."""
+        row = self._task_row(startup_id, task_type, **kwargs)
+        self.write_buffer.add(Task.__tablename__, row)
+        return row['id']
+    
+    def buffer_metric(self, startup_id: str, metric_type: str, value: float, **kwargs) -> str:
+        """Queue a metric insert on the write-behind buffer; returns its ID."""
+        row = self._metric_row(startup_id, metric_type, value, **kwargs)
+        self.write_buffer.add(Metrics.__tablename__, row)
+        return row['id']
+    
+    def flush_writes(self) -> int:
+        """Flush buffered inserts now; returns rows written."""
+        if self._write_buffer is None:
+            return 0
+        return self._write_buffer.flush()
+    
     def get_metrics_by_startup(
         self, 
         startup_id: str, 
@@ -396,29 +586,29 @@ class DatabaseManager:
             logger.error(f"Backup failed: {e}")
             return False
     
-    def cleanup_old_data(self, days: int = 30) -> int:
-        """Clean up old data."""
+    def cleanup_old_data(
+        self,
+        days: int = 30,
+        batch_size: Optional[int] = None,
+        pause: Optional[float] = None
+    ) -> int:
+        """Clean up old data.
+
+        Rows are removed with set-based DELETEs of ``batch_size`` rows per
+        transaction, pausing ``pause`` seconds between chunks.
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        deleted_count = 0
+        batch_size = batch_size or config.database.cleanup_batch_size
+        pause = config.database.cleanup_pause if pause is None else pause
         
-        with self.get_session() as session:
-            # Clean up old metrics
-            old_metrics = session.query(Metrics).filter(
-                Metrics.timestamp < cutoff_date
-            ).all()
-            for metric in old_metrics:
-                session.delete(metric)
-                deleted_count += 1
-            
-            # Clean up old tasks
-            old_tasks = session.query(Task).filter(
-                Task.created_at < cutoff_date
-            ).all()
-            for task in old_tasks:
-                session.delete(task)
-                deleted_count += 1
-            
-            session.commit()
+        deleted_count = delete_in_chunks(
+            self.engine, Metrics.__table__, Metrics.timestamp < cutoff_date,
+            batch_size=batch_size, pause=pause
+        )
+        deleted_count += delete_in_chunks(
+            self.engine, Task.__table__, Task.created_at < cutoff_date,
+            batch_size=batch_size, pause=pause
+        )
         
         logger.info(f"Cleaned up {deleted_count} old records")
         return deleted_count
@@ -0,0 +1,422 @@
+"""Async database management for AutoPilot Ventures platform.
+
+Mirrors the ``database.DatabaseManager`` API with ``async`` methods backed by
+SQLAlchemy's asyncio extension (aiosqlite for SQLite, asyncpg for PostgreSQL),
+so coroutines can hit the database without blocking the event loop.
+"""
+
+import asyncio
+import logging
+import shutil
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, func, insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+)
+
+from config import config
+from utils import generate_id
+from database import (
+    Base, Startup, Agent, Task, Metrics, DatabaseManager,
+    agent_stats_update_statement, agent_stats_params
+)
+from db_maintenance import chunked_delete_statement
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a sync database URL to use an asyncio driver."""
+    scheme, separator, rest = database_url.partition('://')
+    if not separator:
+        return database_url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+class AsyncDatabaseManager:
+    """Async database management class."""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        statement_cache_size: Optional[int] = None
+    ):
+        """Initialize async database manager.
+
+        Call ``await initialize()`` before use to create tables.
+        """
+        self.database_url = to_async_url(database_url or config.database.url)
+        self.pool_size = pool_size if pool_size is not None else config.database.pool_size
+        self.max_overflow = (
+            max_overflow if max_overflow is not None else config.database.max_overflow
+        )
+        self.statement_cache_size = (
+            statement_cache_size if statement_cache_size is not None
+            else config.database.statement_cache_size
+        )
+        self.engine: AsyncEngine = create_async_engine(
+            self.database_url, **self._engine_options()
+        )
+        self.SessionLocal = async_sessionmaker(
+            self.engine,
+            expire_on_commit=False,
+            autoflush=False
+        )
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
+
+    def _engine_options(self) -> Dict[str, Any]:
+        """Build engine options for the configured backend."""
+        options: Dict[str, Any] = {
+            'echo': False,
+            'pool_pre_ping': True,
+            # Compiled SQL cache shared by all sessions on this engine
+            'query_cache_size': self.statement_cache_size,
+        }
+        if ':memory:' in self.database_url:
+            return options
+
+        options.update(
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=config.database.pool_timeout,
+            pool_recycle=config.database.pool_recycle,
+        )
+        if self.database_url.startswith('postgresql+asyncpg'):
+            # Server-side prepared statements cached per connection
+            options['connect_args'] = {
+                'prepared_statement_cache_size': self.statement_cache_size
+            }
+        return options
+
+    async def initialize(self) -> None:
+        """Create tables if needed."""
+        if self._initialized:
+            return
+        async with self._init_lock:
+            if self._initialized:
+                return
+            async with self.engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            self._initialized = True
+            logger.info("Async database initialized successfully")
+
+    def get_session(self) -> AsyncSession:
+        """Get async database session."""
+        return self.SessionLocal()
+
+    async def dispose(self) -> None:
+        """Close all pooled connections."""
+        await self.engine.dispose()
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Get connection pool status."""
+        pool = self.engine.pool
+        status = {'pool_class': type(pool).__name__}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            method = getattr(pool, name, None)
+            if callable(method):
+                status[name] = method()
+        return status
+
+    async def create_startup(
+        self,
+        name: str,
+        description: str = "",
+        niche: str = "",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Startup:
+        """Create a new startup."""
+        async with self.get_session() as session:
+            startup = Startup(
+                id=generate_id("startup"),
+                name=name,
+                description=description,
+                niche=niche,
+                metadata_json=metadata or {}
+            )
+            session.add(startup)
+            await session.commit()
+            await session.refresh(startup)
+            return startup
+
+    async def get_startup(self, startup_id: str) -> Optional[Startup]:
+        """Get startup by ID."""
+        async with self.get_session() as session:
+            return await session.get(Startup, startup_id)
+
+    async def get_all_startups(self) -> List[Startup]:
+        """Get all startups."""
+        async with self.get_session() as session:
+            result = await session.execute(select(Startup))
+            return list(result.scalars().all())
+
+    async def update_startup(
+        self,
+        startup_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Startup]:
+        """Update startup."""
+        async with self.get_session() as session:
+            startup = await session.get(Startup, startup_id)
+            if startup:
+                for key, value in updates.items():
+                    if hasattr(startup, key):
+                        setattr(startup, key, value)
+                startup.updated_at = datetime.utcnow()
+                await session.commit()
+                await session.refresh(startup)
+            return startup
+
+    async def delete_startup(self, startup_id: str) -> bool:
+        """Delete startup."""
+        async with self.get_session() as session:
+            startup = await session.get(Startup, startup_id)
+            if startup:
+                await session.delete(startup)
+                await session.commit()
+                return True
+            return False
+
+    async def create_agent(
+        self,
+        startup_id: str,
+        agent_type: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Agent:
+        """Create a new agent."""
+        async with self.get_session() as session:
+            agent = Agent(
+                id=generate_id("agent"),
+                startup_id=startup_id,
+                agent_type=agent_type,
+                metadata_json=metadata or {}
+            )
+            session.add(agent)
+            await session.commit()
+            await session.refresh(agent)
+            return agent
+
+    async def get_agents_by_startup(self, startup_id: str) -> List[Agent]:
+        """Get agents by startup ID."""
+        async with self.get_session() as session:
+            result = await session.execute(
+                select(Agent).where(Agent.startup_id == startup_id)
+            )
+            return list(result.scalars().all())
+
+    async def update_agent(
+        self,
+        agent_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Agent]:
+        """Update agent."""
+        async with self.get_session() as session:
+            agent = await session.get(Agent, agent_id)
+            if agent:
+                for key, value in updates.items():
+                    if hasattr(agent, key):
+                        setattr(agent, key, value)
+                await session.commit()
+                await session.refresh(agent)
+            return agent
+
+    async def apply_agent_stats(self, stats: List[Dict[str, Any]]) -> int:
+        """Apply accumulated execution stats to agents in one batched UPDATE."""
+        params = agent_stats_params(stats)
+        if not params:
+            return 0
+
+        async with self.engine.begin() as connection:
+            await connection.execute(agent_stats_update_statement(), params)
+        return len(params)
+
+    async def create_task(
+        self,
+        startup_id: str,
+        task_type: str,
+        description: str = "",
+        priority: int = 1,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Task:
+        """Create a new task."""
+        async with self.get_session() as session:
+            task = Task(
+                id=generate_id("task"),
+                startup_id=startup_id,
+                task_type=task_type,
+                description=description,
+                priority=priority,
+                metadata_json=metadata or {}
+            )
+            session.add(task)
+            await session.commit()
+            await session.refresh(task)
+            return task
+
+    async def get_tasks_by_startup(self, startup_id: str) -> List[Task]:
+        """Get tasks by startup ID."""
+        async with self.get_session() as session:
+            result = await session.execute(
+                select(Task).where(Task.startup_id == startup_id)
+            )
+            return list(result.scalars().all())
+
+    async def update_task(
+        self,
+        task_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Task]:
+        """Update task."""
+        async with self.get_session() as session:
+            task = await session.get(Task, task_id)
+            if task:
+                for key, value in updates.items():
+                    if hasattr(task, key):
+                        setattr(task, key, value)
+                await session.commit()
+                await session.refresh(task)
+            return task
+
+    async def create_metric(
+        self,
+        startup_id: str,
+        metric_type: str,
+        value: float,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Metrics:
+        """Create a new metric."""
+        async with self.get_session() as session:
+            metric = Metrics(
+                id=generate_id("metric"),
+                startup_id=startup_id,
+                metric_type=metric_type,
+                value=value,
+                metadata_json=metadata or {}
+            )
+            session.add(metric)
+            await session.commit()
+            await session.refresh(metric)
+            return metric
+
+    async def get_metrics_by_startup(
+        self,
+        startup_id: str,
+        metric_type: Optional[str] = None
+    ) -> List[Metrics]:
+        """Get metrics by startup ID."""
+        async with self.get_session() as session:
+            query = select(Metrics).where(Metrics.startup_id == startup_id)
+            if metric_type:
+                query = query.where(Metrics.metric_type == metric_type)
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
+    async def create_agents_bulk(self, agents: List[Dict[str, Any]]) -> List[str]:
+        """Create many agents in one transaction; returns the new agent IDs."""
+        rows = [DatabaseManager._agent_row(**agent) for agent in agents]
+        if rows:
+            async with self.engine.begin() as connection:
+                await connection.execute(insert(Agent), rows)
+        return [row['id'] for row in rows]
+
+    async def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        """Create many tasks in one transaction; returns the new task IDs."""
+        rows = [DatabaseManager._task_row(**task) for task in tasks]
+        if rows:
+            async with self.engine.begin() as connection:
+                await connection.execute(insert(Task), rows)
+        return [row['id'] for row in rows]
+
+    async def create_metrics_bulk(self, metrics: List[Dict[str, Any]]) -> List[str]:
+        """Create many metrics in one transaction; returns the new metric IDs."""
+        rows = [DatabaseManager._metric_row(**metric) for metric in metrics]
+        if rows:
+            async with self.engine.begin() as connection:
+                await connection.execute(insert(Metrics), rows)
+        return [row['id'] for row in rows]
+
+    async def backup_database(self, backup_path: str) -> bool:
+        """Backup database."""
+        try:
+            if 'sqlite' in self.database_url:
+                db_path = self.database_url.split(':///', 1)[1]
+                await asyncio.to_thread(shutil.copy2, db_path, backup_path)
+                return True
+            else:
+                logger.warning("Backup only supported for SQLite databases")
+                return False
+        except Exception as e:
+            logger.error(f"Backup failed: {e}")
+            return False
+
+    async def cleanup_old_data(
+        self,
+        days: int = 30,
+        batch_size: Optional[int] = None,
+        pause: Optional[float] = None
+    ) -> int:
+        """Clean up old data in chunks, yielding to the event loop between them."""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        batch_size = batch_size or config.database.cleanup_batch_size
+        pause = config.database.cleanup_pause if pause is None else pause
+
+        deleted_count = 0
+        for table, condition in (
+            (Metrics.__table__, Metrics.timestamp < cutoff_date),
+            (Task.__table__, Task.created_at < cutoff_date),
+        ):
+            statement = chunked_delete_statement(table, condition, batch_size)
+            while True:
+                async with self.engine.begin() as connection:
+                    rowcount = (await connection.execute(statement)).rowcount or 0
+                deleted_count += rowcount
+                if rowcount < batch_size:
+                    break
+                await asyncio.sleep(pause)
+
+        logger.info(f"Cleaned up {deleted_count} old records")
+        return deleted_count
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics."""
+        async with self.get_session() as session:
+            async def count(model, *criteria) -> int:
+                query = select(func.count()).select_from(model)
+                if criteria:
+                    query = query.where(*criteria)
+                return (await session.execute(query)).scalar_one()
+
+            return {
+                'startups': await count(Startup),
+                'agents': await count(Agent),
+                'tasks': await count(Task),
+                'metrics': await count(Metrics),
+                'active_startups': await count(Startup, Startup.status == 'active'),
+                'pending_tasks': await count(Task, Task.status == 'pending')
+            }
+
+
+# Global async database manager instance (created lazily)
+_async_db_manager: Optional[AsyncDatabaseManager] = None
+
+
+async def get_async_db_manager() -> AsyncDatabaseManager:
+    """Get or create the initialized async database manager."""
+    global _async_db_manager
+    if _async_db_manager is None:
+        _async_db_manager = AsyncDatabaseManager()
+    await _async_db_manager.initialize()
+    return _async_db_manager
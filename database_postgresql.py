@@ -16,7 +16,7 @@ from psycopg2.extras import RealDictCursor, Json
 from psycopg2.pool import SimpleConnectionPool
 from sqlalchemy import (
     create_engine, Column, String, Integer, Float, DateTime, 
-    Text, Boolean, ForeignKey, JSON, Index
+    Text, Boolean, ForeignKey, JSON, Index, insert, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
@@ -25,6 +25,8 @@ from sqlalchemy.pool import QueuePool
 
 from config import config
 from utils import generate_id, TimeUtils
+from write_buffer import WriteBehindBuffer
+from db_maintenance import delete_in_chunks
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -117,6 +119,7 @@ class Task(Base):
         Index('idx_tasks_agent_id', 'agent_id'),
         Index('idx_tasks_status', 'status'),
         Index('idx_tasks_created_at', 'created_at'),
+        Index('idx_tasks_startup_status_created', 'startup_id', 'status', 'created_at'),
     )
 
 
@@ -140,6 +143,7 @@ class Metrics(Base):
         Index('idx_metrics_startup_id', 'startup_id'),
         Index('idx_metrics_type', 'metric_type'),
         Index('idx_metrics_timestamp', 'timestamp'),
+        Index('idx_metrics_startup_type_time', 'startup_id', 'metric_type', 'timestamp'),
     )
 
 
@@ -174,6 +178,9 @@ class DatabaseManager:
         self.engine = None
         self.SessionLocal = None
         self.connection_pool = None
+        self._write_buffer = None
+        self._metrics_partitioned = False
+        self._partitions_month = None  # month partitions were last rolled forward for
         self._initialize_database()
     
     def _initialize_database(self):
@@ -208,14 +215,144 @@ class DatabaseManager:
             )
             
             # Create tables
-            Base.metadata.create_all(bind=self.engine)
-            
-            logger.info("PostgreSQL database initialized successfully")
+            if not config.database.partition_metrics:
+                Base.metadata.create_all(bind=self.engine)
+                self._ensure_indexes()
             
         except Exception as e:
             logger.error(f"Failed to initialize PostgreSQL database: {e}")
             # Fallback to SQLite if PostgreSQL is not available
             self._fallback_to_sqlite()
+            return
+        
+        if config.database.partition_metrics:
+            # PostgreSQL is reachable here, so partitioning problems are raised
+            # rather than silently moving the deployment to SQLite
+            self._create_partitioned_metrics()
+            self._ensure_indexes()
+        
+        logger.info("PostgreSQL database initialized successfully")
+    
+    def _ensure_indexes(self):
+        """Create any model indexes missing from existing tables."""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+    
+    def _create_partitioned_metrics(self):
+        """Create the metrics table range-partitioned by month on timestamp.
+        
+        Retention then becomes a partition drop instead of a row DELETE.
+        The primary key includes ``timestamp`` as PostgreSQL requires. Rows
+        outside the monthly partitions (backfills, old timestamps) land in
+        ``metrics_default``. Raises RuntimeError when a plain ``metrics``
+        table already exists, since it has to be migrated by hand.
+        """
+        other_tables = [t for t in Base.metadata.sorted_tables if t.name != Metrics.__tablename__]
+        Base.metadata.create_all(bind=self.engine, tables=other_tables)
+        
+        with self.engine.connect() as connection:
+            exists = connection.execute(text("SELECT to_regclass('metrics') IS NOT NULL")).scalar()
+        if exists and not self.is_metrics_partitioned():
+            raise RuntimeError(
+                "DATABASE_PARTITION_METRICS is enabled but 'metrics' is an existing unpartitioned "
+                "table; rename it, restart to create the partitioned table, then copy the rows "
+                "across with INSERT INTO metrics SELECT * FROM <renamed table>"
+            )
+        
+        with self.engine.begin() as connection:
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS metrics (
+                    id VARCHAR(50) NOT NULL,
+                    startup_id VARCHAR(50) NOT NULL REFERENCES startups(id),
+                    metric_type VARCHAR(50) NOT NULL,
+                    value DOUBLE PRECISION NOT NULL,
+                    timestamp TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+                    metadata_json JSON,
+                    PRIMARY KEY (id, timestamp)
+                ) PARTITION BY RANGE (timestamp)
+            """))
+            connection.execute(text(
+                "CREATE TABLE IF NOT EXISTS metrics_default PARTITION OF metrics DEFAULT"
+            ))
+        self._metrics_partitioned = True
+        self.ensure_metrics_partitions()
+    
+    @staticmethod
+    def _month_start(value: datetime, offset: int = 0) -> datetime:
+        """First day of the month ``offset`` months after ``value``."""
+        month_index = value.year * 12 + (value.month - 1) + offset
+        return datetime(month_index // 12, month_index % 12 + 1, 1)
+    
+    def is_metrics_partitioned(self) -> bool:
+        """Check whether the metrics table is a partitioned table."""
+        if self.engine.dialect.name != 'postgresql':
+            return False
+        with self.engine.connect() as connection:
+            return bool(connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'metrics'"
+            )).scalar())
+    
+    def ensure_metrics_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Create monthly metrics partitions from this month up to ``months_ahead``.
+        
+        Each partition is created in its own transaction; one that fails
+        (typically because ``metrics_default`` already holds rows for that
+        month) is logged and those rows stay in the default partition.
+        """
+        months_ahead = config.database.metrics_partitions_ahead if months_ahead is None else months_ahead
+        created = []
+        now = datetime.utcnow()
+        for offset in range(months_ahead + 1):
+            start = self._month_start(now, offset)
+            end = self._month_start(now, offset + 1)
+            name = f"metrics_p{start:%Y%m}"
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF metrics "
+                        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+                    ))
+                created.append(name)
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to create metrics partition {name}: {e}")
+        self._partitions_month = self._month_start(now)
+        return created
+    
+    def _roll_metrics_partitions(self):
+        """Extend metrics partitions once per calendar month from the write path."""
+        if self._metrics_partitioned and self._partitions_month != self._month_start(datetime.utcnow()):
+            self.ensure_metrics_partitions()
+    
+    def drop_expired_metric_partitions(self, cutoff_date: datetime) -> Dict[str, int]:
+        """Drop monthly metrics partitions that end on or before ``cutoff_date``.
+        
+        Returns the number of rows each dropped partition held, counted in
+        the same transaction as the drop.
+        """
+        dropped = {}
+        with self.engine.begin() as connection:
+            partitions = connection.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'metrics'"
+            )).scalars().all()
+            for name in partitions:
+                try:
+                    start = datetime.strptime(name, 'metrics_p%Y%m')
+                except ValueError:
+                    continue
+                if self._month_start(start, 1) <= cutoff_date:
+                    dropped[name] = connection.execute(text(f"SELECT count(*) FROM {name}")).scalar_one()
+                    connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        if dropped:
+            logger.info(
+                "Dropped expired metrics partitions: "
+                + ', '.join(f"{name} ({rows} rows)" for name, rows in dropped.items())
+            )
+        return dropped
     
     def _get_database_config(self):
         """Get database configuration from environment."""
@@ -373,6 +510,96 @@ class DatabaseManager:
             logger.error(f"Failed to create task: {e}")
             raise
     
+    def _insert_rows(self, table_name: str, rows: List[Dict]) -> int:
+        """Insert rows into a table with a single executemany."""
+        if not rows:
+            return 0
+        table = Base.metadata.tables[table_name]
+        if table_name == Metrics.__tablename__:
+            self._roll_metrics_partitions()
+        with self.engine.begin() as connection:
+            connection.execute(insert(table), rows)
+        return len(rows)
+    
+    @staticmethod
+    def _task_row(startup_id: str, agent_id: str, task_type: str, metadata: Dict = None) -> Dict:
+        """Build an insert row for the tasks table."""
+        return {
+            'id': generate_id("task"),
+            'startup_id': startup_id,
+            'agent_id': agent_id,
+            'task_type': task_type,
+            'status': 'pending',
+            'cost': 0.0,
+            'duration': 0.0,
+            'created_at': datetime.utcnow(),
+            'metadata_json': metadata or {}
+        }
+    
+    @staticmethod
+    def _metric_row(startup_id: str, metric_type: str, value: float,
+                    metadata: Dict = None, timestamp: datetime = None) -> Dict:
+        """Build an insert row for the metrics table."""
+        return {
+            'id': generate_id("metric"),
+            'startup_id': startup_id,
+            'metric_type': metric_type,
+            'value': value,
+            'timestamp': timestamp or datetime.utcnow(),
+            'metadata_json': metadata or {}
+        }
+    
+    def create_tasks_bulk(self, tasks: List[Dict]) -> List[str]:
+        """Create many tasks in one transaction; returns the new task IDs."""
+        try:
+            rows = [self._task_row(**task) for task in tasks]
+            self._insert_rows(Task.__tablename__, rows)
+            logger.info(f"Created {len(rows)} tasks")
+            return [row['id'] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to create tasks in bulk: {e}")
+            raise
+    
+    def create_metrics_bulk(self, metrics: List[Dict]) -> List[str]:
+        """Create many metrics in one transaction; returns the new metric IDs."""
+        try:
+            rows = [self._metric_row(**metric) for metric in metrics]
+            self._insert_rows(Metrics.__tablename__, rows)
+            return [row['id'] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to create metrics in bulk: {e}")
+            raise
+    
+    @property
+    def write_buffer(self) -> WriteBehindBuffer:
+        """Write-behind buffer shared by buffer_task and buffer_metric."""
+        if self._write_buffer is None:
+            self._write_buffer = WriteBehindBuffer(
+                self._insert_rows,
+                max_batch_size=config.database.write_batch_size,
+                flush_interval=config.database.write_flush_interval
+            )
+        return self._write_buffer
+    
+    def buffer_task(self, startup_id: str, agent_id: str, task_type: str, metadata: Dict = None) -> str:
+        """Queue a task insert on the write-behind buffer; returns its ID."""
+        row = self._task_row(startup_id, agent_id, task_type, metadata)
+        self.write_buffer.add(Task.__tablename__, row)
+        return row['id']
+    
+    def buffer_metric(self, startup_id: str, metric_type: str, value: float,
+                      metadata: Dict = None, timestamp: datetime = None) -> str:
+        """Queue a metric insert on the write-behind buffer; returns its ID."""
+        row = self._metric_row(startup_id, metric_type, value, metadata, timestamp)
+        self.write_buffer.add(Metrics.__tablename__, row)
+        return row['id']
+    
+    def flush_writes(self) -> int:
+        """Flush buffered inserts now; returns rows written."""
+        if self._write_buffer is None:
+            return 0
+        return self._write_buffer.flush()
+    
     def update_task(self, task_id: str, status: str, result: str = None, cost: float = 0.0, duration: float = 0.0) -> bool:
         """Update task status and results."""
         try:
@@ -483,22 +710,38 @@ class DatabaseManager:
             logger.error(f"Failed to get database stats: {e}")
             return {}
     
-    def cleanup_old_data(self, days: int = 90) -> int:
-        """Clean up old data to maintain performance."""
+    def cleanup_old_data(self, days: int = 90, batch_size: int = None, pause: float = None) -> int:
+        """Clean up old data to maintain performance.
+        
+        Expired metrics partitions are dropped outright when the metrics
+        table is partitioned; remaining rows are removed with chunked
+        set-based DELETEs so no single transaction holds locks for long.
+        """
         try:
-            with self.get_session() as session:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                
-                # Clean up old tasks
-                old_tasks = session.query(Task).filter(Task.created_at < cutoff_date).delete()
-                
-                # Clean up old metrics
-                old_metrics = session.query(Metrics).filter(Metrics.timestamp < cutoff_date).delete()
-                
-                session.commit()
-                
-                logger.info(f"Cleaned up {old_tasks} old tasks and {old_metrics} old metrics")
-                return old_tasks + old_metrics
+            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            batch_size = batch_size or config.database.cleanup_batch_size
+            pause = config.database.cleanup_pause if pause is None else pause
+            
+            dropped_metrics = 0
+            if self.is_metrics_partitioned():
+                dropped_metrics = sum(self.drop_expired_metric_partitions(cutoff_date).values())
+                self.ensure_metrics_partitions()
+            
+            old_tasks = delete_in_chunks(
+                self.engine, Task.__table__, Task.created_at < cutoff_date,
+                batch_size=batch_size, pause=pause
+            )
+            old_metrics = delete_in_chunks(
+                self.engine, Metrics.__table__, Metrics.timestamp < cutoff_date,
+                batch_size=batch_size, pause=pause
+            )
+            
+            old_metrics += dropped_metrics
+            logger.info(
+                f"Cleaned up {old_tasks} old tasks and {old_metrics} old metrics "
+                f"({dropped_metrics} in dropped partitions)"
+            )
+            return old_tasks + old_metrics
                 
         except Exception as e:
             logger.error(f"Failed to cleanup old data: {e}")
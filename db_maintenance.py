@@ -0,0 +1,45 @@
+"""Set-based maintenance helpers shared by the database managers."""
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import delete, select, Table
+
+logger = logging.getLogger(__name__)
+
+
+def chunked_delete_statement(table: Table, condition: Any, batch_size: int):
+    """DELETE of at most ``batch_size`` rows matching ``condition``.
+
+    Uses ``id IN (SELECT id ... LIMIT n)`` which works on both SQLite and
+    PostgreSQL, neither of which supports ``DELETE ... LIMIT`` portably.
+    """
+    ids = select(table.c.id).where(condition).limit(batch_size).scalar_subquery()
+    return delete(table).where(table.c.id.in_(ids))
+
+
+def delete_in_chunks(
+    engine: Any,
+    table: Table,
+    condition: Any,
+    batch_size: int = 5000,
+    pause: float = 0.0
+) -> int:
+    """Delete matching rows in short transactions of ``batch_size`` rows.
+
+    Sleeps ``pause`` seconds between chunks so other writers get the lock.
+    Returns the number of rows deleted.
+    """
+    statement = chunked_delete_statement(table, condition, batch_size)
+    deleted = 0
+    while True:
+        with engine.begin() as connection:
+            rowcount = connection.execute(statement).rowcount or 0
+        deleted += rowcount
+        if rowcount < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    logger.debug(f"Deleted {deleted} rows from {table.name}")
+    return deleted
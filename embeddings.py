@@ -0,0 +1,189 @@
+"""Local text embeddings with a persistent cache for agent vector memory."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from config import config
+
+# Optional on-disk transformer model
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbeddingBackend:
+    """Stateless bag-of-words embeddings via the hashing trick.
+
+    Needs no fitting, so every process maps the same text to the same
+    vector and embeddings stay comparable across restarts.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        """Initialize backend."""
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+        self.vectorizer = HashingVectorizer(
+            n_features=dimension,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            norm='l2'
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts."""
+        return self.vectorizer.transform(texts).toarray().astype(np.float32)
+
+
+class SentenceTransformerBackend:
+    """Dense embeddings from a local sentence-transformers model."""
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+        """Initialize backend."""
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers is not installed")
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name.replace('/', '_')}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts."""
+        return np.asarray(
+            self.model.encode(texts, batch_size=64, normalize_embeddings=True),
+            dtype=np.float32
+        )
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by backend and text hash."""
+
+    def __init__(self, db_path: str = 'embedding_cache.db'):
+        """Initialize cache."""
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB
+            ) WITHOUT ROWID
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(backend_name: str, text: str) -> str:
+        """Cache key for a text embedded by a backend."""
+        return hashlib.sha256(f"{backend_name}:{text}".encode()).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store vectors."""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingService:
+    """Batched, cached text embedding."""
+
+    def __init__(self, backend=None, cache: Optional[EmbeddingCache] = None):
+        """Initialize service with a backend and optional persistent cache."""
+        self.backend = backend or HashingEmbeddingBackend(config.vector_memory.embedding_dimension)
+        self.cache = cache
+        self.stats = {'cache_hits': 0, 'computed': 0}
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts, computing only uncached ones in a single backend call."""
+        if not texts:
+            return []
+
+        keys = [EmbeddingCache.make_key(self.backend.name, text) for text in texts]
+        vectors = self.cache.get_many(list(set(keys))) if self.cache else {}
+        self.stats['cache_hits'] += sum(1 for key in keys if key in vectors)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            computed = self.backend.embed(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), computed))
+            vectors.update(new_vectors)
+            self.stats['computed'] += len(new_vectors)
+            if self.cache:
+                self.cache.set_many(new_vectors)
+
+        return [vectors[key].tolist() for key in keys]
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return self.embed_batch([text])[0]
+
+
+def create_embedding_backend(name: Optional[str] = None):
+    """Build the configured embedding backend, falling back to hashing."""
+    name = name or config.vector_memory.embedding_backend
+    if name == 'sentence_transformers':
+        try:
+            return SentenceTransformerBackend(config.vector_memory.embedding_model)
+        except Exception as e:
+            logger.warning(f"Sentence-transformers backend unavailable, using hashing: {e}")
+    elif name != 'hashing':
+        logger.warning(f"Unknown embedding backend '{name}', using hashing")
+    return HashingEmbeddingBackend(config.vector_memory.embedding_dimension)
+
+
+# Global embedding service instance
+_embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get or create the process-wide embedding service."""
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService(
+            create_embedding_backend(),
+            EmbeddingCache(config.vector_memory.embedding_cache_path)
+        )
+    return _embedding_service
@@ -0,0 +1,218 @@
+"""Write-behind persistence for reinforcement learning episodes."""
+
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from write_buffer import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+EPISODE_TABLE = 'rl_episodes'
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_episode(episode: Any) -> str:
+    """Serialize an episode dataclass to one JSON document."""
+    return json.dumps(dataclasses.asdict(episode), default=_json_default, separators=(',', ':'))
+
+
+class RedisEpisodeStore:
+    """Episodes in one sorted set per agent type, scored by timestamp.
+
+    A single ZADD per episode replaces the per-episode hash and EXPIRE, and
+    trimming by rank and age keeps each set bounded.
+    """
+
+    def __init__(self, redis_client: redis.Redis, max_per_type: int, retention_days: int):
+        self.redis_client = redis_client
+        self.max_per_type = max_per_type
+        self.retention_seconds = retention_days * 86400
+
+    def _key(self, agent_type: str) -> str:
+        return f"rl_episodes:{agent_type}"
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        """Write a batch of episodes in one pipeline."""
+        by_type: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for row in rows:
+            by_type[row['agent_type']][encode_episode(row['episode'])] = row['timestamp']
+
+        cutoff = time.time() - self.retention_seconds
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for agent_type, members in by_type.items():
+            key = self._key(agent_type)
+            pipeline.zadd(key, members)
+            pipeline.zremrangebyrank(key, 0, -(self.max_per_type + 1))
+            pipeline.zremrangebyscore(key, '-inf', cutoff)
+            pipeline.expire(key, self.retention_seconds)
+        pipeline.execute()
+
+    def load(self, agent_types: List[str], limit: int) -> Dict[str, List[str]]:
+        """Newest ``limit`` encoded episodes per agent type, oldest first."""
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for agent_type in agent_types:
+            pipeline.zrange(self._key(agent_type), -limit, -1)
+        return {
+            agent_type: [m.decode() if isinstance(m, bytes) else m for m in members]
+            for agent_type, members in zip(agent_types, pipeline.execute())
+        }
+
+
+class FileEpisodeStore:
+    """Append-only JSON lines file for deployments without Redis.
+
+    Loading compacts the file down to the episodes it returns, so it does
+    not grow without bound across restarts. Appends and the read-and-compact
+    pass share a lock, so a batch written by the sink's flush thread while
+    ``load`` runs (e.g. during ``warm_start``) is not lost to the rewrite.
+    The lock is per process; one file must not be shared between processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        """Append a batch of episodes."""
+        lines = ''.join(
+            json.dumps({'agent_type': row['agent_type'], 'episode': encode_episode(row['episode'])}) + '\n'
+            for row in rows
+        )
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def load(self, agent_types: List[str], limit: int) -> Dict[str, List[str]]:
+        """Newest ``limit`` encoded episodes per agent type, oldest first."""
+        with self._lock:
+            return self._load_and_compact(agent_types, limit)
+
+    def _load_and_compact(self, agent_types: List[str], limit: int) -> Dict[str, List[str]]:
+        kept = {agent_type: deque(maxlen=limit) for agent_type in agent_types}
+        if not os.path.exists(self.path):
+            return {agent_type: [] for agent_type in agent_types}
+
+        total = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                total += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('agent_type') in kept:
+                    kept[record['agent_type']].append(record['episode'])
+
+        retained = sum(len(episodes) for episodes in kept.values())
+        if retained < total:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for agent_type, episodes in kept.items():
+                    for episode in episodes:
+                        f.write(json.dumps({'agent_type': agent_type, 'episode': episode}) + '\n')
+            os.replace(tmp_path, self.path)
+        return {agent_type: list(episodes) for agent_type, episodes in kept.items()}
+
+
+class EpisodeSink:
+    """Buffers episodes and writes them in batches on a background thread.
+
+    ``record`` only appends to an in-memory buffer, so the event loop never
+    waits on Redis or the disk. When the buffer is full the oldest episodes
+    are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        store,
+        max_batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_buffered: int = 10000
+    ):
+        """Initialize sink over a RedisEpisodeStore or FileEpisodeStore."""
+        self.store = store
+        self.buffer = WriteBehindBuffer(
+            lambda table, rows: self.store.write(rows),
+            max_batch_size=max_batch_size,
+            flush_interval=flush_interval,
+            max_buffered_rows=max_buffered
+        )
+
+    def record(self, episode: Any) -> None:
+        """Queue an episode for persistence."""
+        self.buffer.add(EPISODE_TABLE, {
+            'agent_type': episode.agent_type.value,
+            'timestamp': time.time(),
+            'episode': episode
+        })
+
+    def load(self, agent_types: List[str], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Read stored episodes back as dictionaries; blocking."""
+        return {
+            agent_type: [json.loads(encoded) for encoded in episodes]
+            for agent_type, episodes in self.store.load(agent_types, limit).items()
+        }
+
+    def flush(self) -> int:
+        """Write buffered episodes now; blocking."""
+        return self.buffer.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput, lag and drop counters."""
+        oldest = self.buffer.oldest_pending(EPISODE_TABLE)
+        return {
+            'store': type(self.store).__name__,
+            'pending': self.buffer.pending().get(EPISODE_TABLE, 0),
+            'written': self.buffer.stats['rows_written'],
+            'flushes': self.buffer.stats['flushes'],
+            'failures': self.buffer.stats['failures'],
+            'dropped': self.buffer.stats['dropped'],
+            'lag_seconds': time.time() - oldest['timestamp'] if oldest else 0.0
+        }
+
+    def close(self) -> None:
+        """Stop the flush thread after writing remaining episodes."""
+        self.buffer.close()
+
+
+def create_episode_sink(
+    backend: str,
+    redis_client: Optional[redis.Redis] = None,
+    path: str = 'rl_episodes.jsonl',
+    max_per_type: int = 10000,
+    retention_days: int = 30,
+    **buffer_options
+) -> Optional[EpisodeSink]:
+    """Build an episode sink for 'redis', 'file' or 'none'.
+
+    'redis' falls back to the file store when no client is given or the
+    server does not answer a ping.
+    """
+    if backend == 'none':
+        return None
+    if backend == 'redis' and redis_client is not None:
+        try:
+            redis_client.ping()
+            return EpisodeSink(RedisEpisodeStore(redis_client, max_per_type, retention_days), **buffer_options)
+        except Exception as e:
+            logger.warning(f"Redis episode store unavailable, using file: {e}")
+    elif backend not in ('redis', 'file'):
+        logger.warning(f"Unknown episode sink '{backend}', using file")
+    return EpisodeSink(FileEpisodeStore(path), **buffer_options)
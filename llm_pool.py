@@ -0,0 +1,375 @@
+"""Shared LLM execution pool for AutoPilot Ventures agents."""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from config import config
+from utils import log
+
+logger = logging.getLogger(__name__)
+
+LLM_POOL_REQUESTS = Counter(
+    'llm_pool_requests_total',
+    'Total number of LLM pool requests',
+    ['model', 'status']
+)
+
+LLM_POOL_QUEUE_DEPTH = Gauge(
+    'llm_pool_queue_depth',
+    'Number of LLM requests waiting for a worker or for rate limit budget'
+)
+
+
+class LLMPriority(Enum):
+    """Priority lanes for LLM requests (lower value runs first)."""
+
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+@dataclass(order=True)
+class LLMRequest:
+    """Queued LLM request."""
+
+    priority: int
+    sequence: int
+    key: str = field(compare=False)
+    llm: Any = field(compare=False)
+    messages: List[Any] = field(compare=False)
+    model_name: str = field(compare=False)
+    estimated_tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    submitted_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class TokenBucket:
+    """Token bucket enforcing a tokens-per-minute budget."""
+
+    def __init__(self, tokens_per_minute: int):
+        """Initialize a full bucket."""
+        self.capacity = float(tokens_per_minute)
+        self.tokens = float(tokens_per_minute)
+        self.refill_rate = tokens_per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.refill_rate
+        )
+        self.updated_at = now
+
+    def available(self) -> float:
+        """Tokens that can be spent right now."""
+        self._refill()
+        return self.tokens
+
+    def try_acquire(self, tokens: int) -> float:
+        """Take the tokens if available; otherwise return the seconds until they will be."""
+        tokens = min(float(tokens), self.capacity)
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.refill_rate
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until the requested number of tokens is available."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class LLMExecutionPool:
+    """Bounded-concurrency LLM executor with priorities, rate limits and coalescing.
+
+    Workers only run requests whose model has rate limit budget now. A
+    request for a model that is out of tokens is parked per model and put
+    back on the queue when its bucket refills, so one throttled model does
+    not hold worker slots that other models could use.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_queue_size: int = 1000,
+        default_tokens_per_minute: int = 90000,
+        model_tokens_per_minute: Optional[Dict[str, int]] = None,
+        enable_coalescing: bool = True
+    ):
+        """Initialize execution pool."""
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.default_tokens_per_minute = default_tokens_per_minute
+        self.model_tokens_per_minute = model_tokens_per_minute or {}
+        self.enable_coalescing = enable_coalescing
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._parked: Dict[str, List[LLMRequest]] = {}
+        self._wakeups: Dict[str, asyncio.TimerHandle] = {}
+        self._sequence = 0
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'coalesced': 0,
+            'rate_limited': 0,
+            'total_wait_time': 0.0
+        }
+
+    def _ensure_started(self) -> None:
+        """Start worker tasks on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='llm-pool'
+            )
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._in_flight = {}
+        self._parked = {}
+        self._wakeups = {}
+        self._workers = [
+            loop.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+
+    def _get_bucket(self, model_name: str) -> TokenBucket:
+        """Get token bucket for model."""
+        if model_name not in self._buckets:
+            tokens_per_minute = self.model_tokens_per_minute.get(
+                model_name, self.default_tokens_per_minute
+            )
+            self._buckets[model_name] = TokenBucket(tokens_per_minute)
+        return self._buckets[model_name]
+
+    @staticmethod
+    def _model_name(llm: Any) -> str:
+        model_name = getattr(llm, 'model_name', None)
+        return model_name if isinstance(model_name, str) else 'unknown'
+
+    @staticmethod
+    def _serialize_messages(messages: List[Any]) -> List[List[str]]:
+        return [
+            [str(getattr(m, 'type', type(m).__name__)), str(getattr(m, 'content', m))]
+            for m in messages
+        ]
+
+    def _request_key(self, llm: Any, messages: List[Any]) -> str:
+        """Build coalescing key from model, temperature and prompt."""
+        payload = json.dumps({
+            'model': self._model_name(llm),
+            'temperature': str(getattr(llm, 'temperature', '')),
+            'messages': self._serialize_messages(messages)
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _estimate_tokens(self, llm: Any, messages: List[Any]) -> int:
+        """Estimate tokens charged against the model's rate limit."""
+        prompt_chars = sum(len(content) for _, content in self._serialize_messages(messages))
+        max_tokens = getattr(llm, 'max_tokens', None)
+        completion_tokens = max_tokens if isinstance(max_tokens, int) else 0
+        return prompt_chars // 4 + completion_tokens
+
+    async def invoke(
+        self,
+        llm: Any,
+        messages: List[Any],
+        priority: LLMPriority = LLMPriority.NORMAL
+    ) -> Any:
+        """Run ``llm.invoke(messages)`` through the shared pool."""
+        self._ensure_started()
+        model_name = self._model_name(llm)
+        key = self._request_key(llm, messages)
+
+        if self.enable_coalescing and key in self._in_flight:
+            self.stats['coalesced'] += 1
+            LLM_POOL_REQUESTS.labels(model=model_name, status='coalesced').inc()
+            return await asyncio.shield(self._in_flight[key])
+
+        future = self._loop.create_future()
+        if self.enable_coalescing:
+            self._in_flight[key] = future
+
+        self._sequence += 1
+        request = LLMRequest(
+            priority=priority.value,
+            sequence=self._sequence,
+            key=key,
+            llm=llm,
+            messages=messages,
+            model_name=model_name,
+            estimated_tokens=self._estimate_tokens(llm, messages),
+            future=future
+        )
+
+        self.stats['submitted'] += 1
+        try:
+            await self._queue.put(request)
+        except BaseException:
+            self._release(request)
+            raise
+        self._update_queue_depth()
+
+        return await asyncio.shield(future)
+
+    def _update_queue_depth(self) -> None:
+        LLM_POOL_QUEUE_DEPTH.set(self._queue.qsize() + self._parked_count())
+
+    def _parked_count(self) -> int:
+        return sum(len(parked) for parked in self._parked.values())
+
+    def _park(self, request: LLMRequest, wait: float) -> None:
+        """Hold a request whose model is out of tokens until its bucket refills."""
+        self.stats['rate_limited'] += 1
+        heapq.heappush(self._parked.setdefault(request.model_name, []), request)
+        if request.model_name not in self._wakeups:
+            self._wakeups[request.model_name] = self._loop.call_later(
+                wait, self._unpark, request.model_name
+            )
+
+    def _unpark(self, model_name: str) -> None:
+        """Requeue the parked requests the model's bucket can pay for now, in priority order."""
+        del self._wakeups[model_name]
+        parked = self._parked[model_name]
+        bucket = self._get_bucket(model_name)
+        budget = bucket.available()
+        wait = 0.0
+        while parked:
+            tokens = min(float(parked[0].estimated_tokens), bucket.capacity)
+            if tokens > budget:
+                wait = (tokens - budget) / bucket.refill_rate
+                break
+            try:
+                self._queue.put_nowait(parked[0])
+            except asyncio.QueueFull:
+                wait = 0.1
+                break
+            heapq.heappop(parked)
+            budget -= tokens
+
+        if parked:
+            self._wakeups[model_name] = self._loop.call_later(wait, self._unpark, model_name)
+        else:
+            del self._parked[model_name]
+        self._update_queue_depth()
+
+    def _release(self, request: LLMRequest) -> None:
+        """Remove request from the in-flight table."""
+        if self._in_flight.get(request.key) is request.future:
+            del self._in_flight[request.key]
+
+    async def _worker(self, worker_id: int) -> None:
+        """Consume queued requests in priority order."""
+        while True:
+            request = await self._queue.get()
+            wait = self._get_bucket(request.model_name).try_acquire(request.estimated_tokens)
+            if wait:
+                # Free this worker for models that still have budget
+                self._park(request, wait)
+                self._queue.task_done()
+                self._update_queue_depth()
+                continue
+
+            self._update_queue_depth()
+            try:
+                self.stats['total_wait_time'] += time.monotonic() - request.submitted_at
+                result = await self._loop.run_in_executor(
+                    self._executor, request.llm.invoke, request.messages
+                )
+                if not request.future.done():
+                    request.future.set_result(result)
+                self.stats['completed'] += 1
+                LLM_POOL_REQUESTS.labels(model=request.model_name, status='success').inc()
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.cancel()
+                raise
+            except Exception as e:
+                if not request.future.done():
+                    request.future.set_exception(e)
+                self.stats['failed'] += 1
+                LLM_POOL_REQUESTS.labels(model=request.model_name, status='failure').inc()
+                log.warning(
+                    "LLM pool request failed",
+                    worker_id=worker_id,
+                    model=request.model_name,
+                    error=str(e)
+                )
+            finally:
+                self._release(request)
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        completed = self.stats['completed'] + self.stats['failed']
+        return {
+            **self.stats,
+            'max_workers': self.max_workers,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'parked': self._parked_count(),
+            'in_flight': len(self._in_flight),
+            'average_wait_time': (
+                self.stats['total_wait_time'] / completed if completed else 0.0
+            )
+        }
+
+    async def shutdown(self) -> None:
+        """Stop workers, cancel rate-limited requests and release the thread pool."""
+        for wakeup in self._wakeups.values():
+            wakeup.cancel()
+        for parked in self._parked.values():
+            for request in parked:
+                request.future.cancel()
+                self._release(request)
+        self._wakeups = {}
+        self._parked = {}
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global pool instance
+_llm_pool: Optional[LLMExecutionPool] = None
+
+
+def get_llm_pool() -> LLMExecutionPool:
+    """Get or create the shared LLM execution pool."""
+    global _llm_pool
+    if _llm_pool is None:
+        _llm_pool = LLMExecutionPool(
+            max_workers=config.llm_pool.max_workers,
+            max_queue_size=config.llm_pool.max_queue_size,
+            default_tokens_per_minute=config.llm_pool.default_tokens_per_minute,
+            model_tokens_per_minute=config.llm_pool.model_tokens_per_minute,
+            enable_coalescing=config.llm_pool.enable_coalescing
+        )
+    return _llm_pool
@@ -0,0 +1,270 @@
+"""Two-tier prompt/response cache for agent LLM calls."""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from config import config
+from utils import LRUCache, log
+from redis_cache import cache_manager, async_cache_manager
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_LOOKUPS = Counter(
+    'llm_response_cache_lookups_total',
+    'Total number of LLM response cache lookups',
+    ['agent_type', 'outcome']
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so template indentation does not change the key."""
+    return " ".join(text.split())
+
+
+class LLMResponseCache:
+    """In-process LRU (L1) in front of the shared Redis CacheManager (L2).
+
+    Coroutines use ``aget``/``aset``, which reach L2 through the async cache
+    manager (or a worker thread) so a Redis round trip never blocks the loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        default_ttl: int = 3600,
+        agent_ttls: Optional[Dict[str, int]] = None,
+        enable_near_duplicate: bool = False,
+        near_duplicate_threshold: float = 0.9,
+        near_duplicate_window: int = 200,
+        l2_cache: Any = None,
+        async_l2_cache: Any = None
+    ):
+        """Initialize response cache."""
+        self.default_ttl = default_ttl
+        self.agent_ttls = agent_ttls or {}
+        self.enable_near_duplicate = enable_near_duplicate
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.l1 = LRUCache(max_entries)
+        self.l2 = l2_cache
+        self.async_l2 = async_l2_cache
+        # Recent prompt token sets per (model, temperature, agent type)
+        self._recent: Dict[Tuple[str, str, str], Deque[Tuple[frozenset, str]]] = defaultdict(
+            lambda: deque(maxlen=near_duplicate_window)
+        )
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'near_hits': 0, 'misses': 0}
+
+    def get_ttl(self, agent_type: str) -> int:
+        """Get TTL for an agent type."""
+        return self.agent_ttls.get(agent_type, self.default_ttl)
+
+    @staticmethod
+    def _prompt_text(messages: List[Any]) -> str:
+        return "\n".join(
+            f"{getattr(m, 'type', type(m).__name__)}: {normalize_prompt(str(getattr(m, 'content', m)))}"
+            for m in messages
+        )
+
+    def make_key(self, model_name: str, temperature: Any, messages: List[Any]) -> str:
+        """Build cache key from model, temperature and normalized prompt hash."""
+        prompt_hash = hashlib.sha256(self._prompt_text(messages).encode('utf-8')).hexdigest()
+        return cache_manager._get_cache_key(
+            'llm_response', f"{model_name}:{temperature}:{prompt_hash}"
+        )
+
+    def _record(self, outcome: str, agent_type: str) -> None:
+        self.stats[outcome] += 1
+        LLM_CACHE_LOOKUPS.labels(agent_type=agent_type, outcome=outcome).inc()
+
+    def _get_l1(self, key: str) -> Optional[str]:
+        entry = self.l1.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > time.time():
+                return content
+        return None
+
+    def _promote(self, key: str, cached: Any) -> Optional[str]:
+        """Copy an L2 entry into L1; returns its content."""
+        if isinstance(cached, dict) and 'content' in cached:
+            expires_at = cached.get('expires_at', time.time() + self.default_ttl)
+            self.l1.set(key, (expires_at, cached['content']))
+            return cached['content']
+        return None
+
+    def _get_by_key(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Look a key up in L1 then L2; returns (content, tier)."""
+        content = self._get_l1(key)
+        if content is not None:
+            return content, 'l1_hits'
+        if self.l2 is not None:
+            content = self._promote(key, self.l2.get(key))
+            if content is not None:
+                return content, 'l2_hits'
+        return None, None
+
+    async def _aget_by_key(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Async ``_get_by_key``."""
+        content = self._get_l1(key)
+        if content is not None:
+            return content, 'l1_hits'
+        if self.async_l2 is not None:
+            cached = await self.async_l2.get(key)
+        elif self.l2 is not None:
+            cached = await asyncio.to_thread(self.l2.get, key)
+        else:
+            return None, None
+        content = self._promote(key, cached)
+        return (content, 'l2_hits') if content is not None else (None, None)
+
+    def _find_near_duplicate(
+        self, namespace: Tuple[str, str, str], tokens: frozenset
+    ) -> Optional[str]:
+        """Find the most similar recent prompt above the threshold."""
+        best_key, best_score = None, self.near_duplicate_threshold
+        for candidate_tokens, candidate_key in self._recent[namespace]:
+            union = len(tokens | candidate_tokens)
+            if not union:
+                continue
+            score = len(tokens & candidate_tokens) / union
+            if score >= best_score:
+                best_key, best_score = candidate_key, score
+        return best_key
+
+    def _near_key(
+        self, model_name: str, temperature: Any, messages: List[Any], agent_type: str
+    ) -> Optional[str]:
+        """Key of a similar recent prompt, when near-duplicate lookup is on."""
+        if not self.enable_near_duplicate:
+            return None
+        namespace = (model_name, str(temperature), agent_type)
+        tokens = frozenset(_TOKEN_PATTERN.findall(self._prompt_text(messages).lower()))
+        return self._find_near_duplicate(namespace, tokens)
+
+    def get(
+        self,
+        model_name: str,
+        temperature: Any,
+        messages: List[Any],
+        agent_type: str = 'default'
+    ) -> Optional[str]:
+        """Get cached response content for a prompt."""
+        key = self.make_key(model_name, temperature, messages)
+        content, tier = self._get_by_key(key)
+
+        if content is None:
+            near_key = self._near_key(model_name, temperature, messages, agent_type)
+            if near_key is not None:
+                content, _ = self._get_by_key(near_key)
+                tier = 'near_hits' if content is not None else None
+
+        self._record(tier or 'misses', agent_type)
+        return content
+
+    async def aget(
+        self,
+        model_name: str,
+        temperature: Any,
+        messages: List[Any],
+        agent_type: str = 'default'
+    ) -> Optional[str]:
+        """Get cached response content for a prompt without blocking the event loop."""
+        key = self.make_key(model_name, temperature, messages)
+        content, tier = await self._aget_by_key(key)
+
+        if content is None:
+            near_key = self._near_key(model_name, temperature, messages, agent_type)
+            if near_key is not None:
+                content, _ = await self._aget_by_key(near_key)
+                tier = 'near_hits' if content is not None else None
+
+        self._record(tier or 'misses', agent_type)
+        return content
+
+    def _set_l1(
+        self,
+        model_name: str,
+        temperature: Any,
+        messages: List[Any],
+        content: str,
+        agent_type: str
+    ) -> Tuple[str, Dict[str, Any], int]:
+        """Store in L1 and the near-duplicate index; returns the L2 key, value and TTL."""
+        key = self.make_key(model_name, temperature, messages)
+        ttl = self.get_ttl(agent_type)
+        expires_at = time.time() + ttl
+        self.l1.set(key, (expires_at, content))
+
+        if self.enable_near_duplicate:
+            namespace = (model_name, str(temperature), agent_type)
+            tokens = frozenset(_TOKEN_PATTERN.findall(self._prompt_text(messages).lower()))
+            self._recent[namespace].append((tokens, key))
+        return key, {'content': content, 'expires_at': expires_at}, ttl
+
+    def set(
+        self,
+        model_name: str,
+        temperature: Any,
+        messages: List[Any],
+        content: str,
+        agent_type: str = 'default'
+    ) -> None:
+        """Store response content for a prompt in both tiers."""
+        key, value, ttl = self._set_l1(model_name, temperature, messages, content, agent_type)
+        if self.l2 is not None:
+            self.l2.set(key, value, ttl)
+
+    async def aset(
+        self,
+        model_name: str,
+        temperature: Any,
+        messages: List[Any],
+        content: str,
+        agent_type: str = 'default'
+    ) -> None:
+        """Store response content for a prompt in both tiers without blocking the event loop."""
+        key, value, ttl = self._set_l1(model_name, temperature, messages, content, agent_type)
+        if self.async_l2 is not None:
+            await self.async_l2.set(key, value, ttl)
+        elif self.l2 is not None:
+            await asyncio.to_thread(self.l2.set, key, value, ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = sum(self.stats.values())
+        hits = lookups - self.stats['misses']
+        return {
+            **self.stats,
+            'l1_entries': len(self.l1),
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+
+# Global response cache instance
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get or create the shared LLM response cache."""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache(
+            max_entries=config.llm_cache.max_entries,
+            default_ttl=config.llm_cache.default_ttl,
+            agent_ttls=config.llm_cache.agent_ttls,
+            enable_near_duplicate=config.llm_cache.enable_near_duplicate,
+            near_duplicate_threshold=config.llm_cache.near_duplicate_threshold,
+            near_duplicate_window=config.llm_cache.near_duplicate_window,
+            l2_cache=cache_manager,
+            async_l2_cache=async_cache_manager
+        )
+        log.info("LLM response cache initialized", max_entries=config.llm_cache.max_entries)
+    return _llm_response_cache
@@ -531,11 +531,12 @@ class NicheScraper:
     def _filter_viable_niches(self, niches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Filter niches for viability with market size proxy."""
         viable_niches = []
-        for niche in niches:
-            if niche.get("relevance_score", 0) < 0.3:
-                continue
+        candidates = [niche for niche in niches if niche.get("relevance_score", 0) >= 0.3]
+        safety_results = security_utils.check_content_safety_batch(
+            [f"{niche['title']} {niche['snippet']}" for niche in candidates]
+        )
+        for niche, safety_result in zip(candidates, safety_results):
             combined_text = f"{niche['title']} {niche['snippet']}"
-            safety_result = security_utils.check_content_safety(combined_text)
             if safety_result["toxicity"] > config.security.content_safety_threshold:
                 continue
             business_keywords = [
@@ -22,6 +22,7 @@ from database import db_manager
 from agent_message_bus import get_message_bus, MessageType, MessagePriority
 from payment_processor import get_payment_processor, get_marketing_funnel
 from cultural_intelligence import get_cultural_intelligence_agent
+from workflow_history import WorkflowHistory, get_workflow_result_archive
 
 # Import autonomous enhancements
 from autonomous_enhancements import (
@@ -69,8 +70,9 @@ class AgentOrchestrator:
         self.startup_id = startup_id
         self.workflow_id = generate_id("workflow")
         self.agents = {}
-        self.workflow_results = {}
-        self.execution_history = []
+        self.execution_history = WorkflowHistory(
+            config.workflow.history_max_entries, get_workflow_result_archive()
+        )
         
         # Initialize message bus for agent communication
         self.message_bus = get_message_bus(startup_id)
@@ -130,6 +132,9 @@ class AgentOrchestrator:
     ) -> WorkflowResult:
         """Execute workflow with autonomous enhancements."""
         start_time = datetime.utcnow()
+        # Each run gets its own id so history and archive keep every run
+        workflow_id = generate_id("workflow")
+        self.workflow_id = workflow_id
         
         try:
             # Use autonomous workflow engine for enhanced execution
@@ -144,7 +149,7 @@ class AgentOrchestrator:
                     if step_name in workflow_config:
                         # Store step context in vector memory
                         await self.vector_memory.store_context(
-                            f"workflow_{self.workflow_id}",
+                            f"workflow_{workflow_id}",
                             {
                                 'step': step_name,
                                 'config': workflow_config[step_name],
@@ -163,7 +168,7 @@ class AgentOrchestrator:
                 execution_time = (datetime.utcnow() - start_time).total_seconds()
                 
                 workflow_result = WorkflowResult(
-                    workflow_id=self.workflow_id,
+                    workflow_id=workflow_id,
                     startup_id=self.startup_id,
                     success=True,
                     steps_completed=autonomous_result.get('steps_completed', []),
@@ -176,7 +181,7 @@ class AgentOrchestrator:
             else:
                 # Handle failed autonomous workflow
                 workflow_result = WorkflowResult(
-                    workflow_id=self.workflow_id,
+                    workflow_id=workflow_id,
                     startup_id=self.startup_id,
                     success=False,
                     steps_completed=autonomous_result.get('steps_completed', []),
@@ -187,8 +192,7 @@ class AgentOrchestrator:
                     timestamp=datetime.utcnow().isoformat()
                 )
             
-            self.workflow_results[self.workflow_id] = workflow_result
-            self.execution_history.append(workflow_result)
+            self.execution_history.record(workflow_result)
             
             # Learn from workflow outcome
             await self._learn_from_workflow(workflow_result)
@@ -198,7 +202,7 @@ class AgentOrchestrator:
         except Exception as e:
             logger.error(f"Autonomous workflow execution failed: {e}")
             return WorkflowResult(
-                workflow_id=self.workflow_id,
+                workflow_id=workflow_id,
                 startup_id=self.startup_id,
                 success=False,
                 steps_completed=[],
@@ -218,9 +222,9 @@ class AgentOrchestrator:
             
             # Store learning outcome in vector memory
             await self.vector_memory.store_context(
-                f"learning_{self.workflow_id}",
+                f"learning_{workflow_result.workflow_id}",
                 {
-                    'workflow_id': self.workflow_id,
+                    'workflow_id': workflow_result.workflow_id,
                     'success_rate': success_rate,
                     'cost_efficiency': cost_efficiency,
                     'execution_time': workflow_result.execution_time,
@@ -237,7 +241,7 @@ class AgentOrchestrator:
                     'execution_time': workflow_result.execution_time
                 })
             
-            logger.info(f"Learning completed for workflow {self.workflow_id}")
+            logger.info(f"Learning completed for workflow {workflow_result.workflow_id}")
             
         except Exception as e:
             logger.error(f"Failed to learn from workflow: {e}")
@@ -419,11 +423,11 @@ class AgentOrchestrator:
             'reinforcement_learning': {
                 'enabled': True,
                 'agents_registered': len(self.agents),
-                'optimizations_performed': len(self.execution_history)
+                'optimizations_performed': self.execution_history.total_workflows
             },
             'autonomous_workflow': {
                 'enabled': True,
-                'workflows_executed': len(self.execution_history),
+                'workflows_executed': self.execution_history.total_workflows,
                 'self_healing_enabled': True
             },
             'message_bus': {
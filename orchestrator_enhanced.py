@@ -3,17 +3,12 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import time
 
-from agents import (
-    NicheResearchAgent, MVPDesignAgent, MarketingStrategyAgent,
-    ContentCreationAgent, AnalyticsAgent, OperationsMonetizationAgent,
-    FundingInvestorAgent, LegalComplianceAgent, HRTeamBuildingAgent,
-    CustomerSupportScalingAgent
-)
+from agents import AgentResult, AGENT_CLASSES, get_shared_agents
 from config import config
 from utils import (
     budget_manager, generate_id, log, AGENT_EXECUTION_COUNTER,
@@ -38,6 +33,10 @@ from adaptive_reinforcement_learning import AdaptiveReinforcementLearning, Busin
 from cultural_intelligence_engine import CulturalIntelligenceEngine, CulturalAdaptation, BusinessAspect
 from agent_swarm import DecentralizedAgentSwarm, SwarmTask, TaskPriority
 from income_prediction_simulator import IncomePredictionSimulator, BusinessMetrics, BusinessType
+from workflow_scheduler import DAGScheduler, StepOutcome
+from workflow_checkpoint import get_workflow_checkpointer
+from workflow_history import WorkflowHistory, get_workflow_result_archive
+from batch_runner import BatchWorkflowRunner, StartupContext
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -81,13 +80,35 @@ class EnhancedWorkflowResult:
 class EnhancedAgentOrchestrator:
     """Enhanced orchestrator for managing AI agents with 70-80% autonomous capabilities."""
 
-    def __init__(self, startup_id: str):
-        """Initialize enhanced orchestrator with autonomous features."""
+    # Parameter of each agent that receives the outputs of its dependencies
+    UPSTREAM_CONTEXT_PARAMS = {
+        'niche_research': 'market_data',
+        'mvp_design': 'requirements',
+        'marketing_strategy': 'product',
+        'content_creation': 'topic',
+        'analytics': 'data',
+        'operations_monetization': 'current_operations',
+        'funding_investor': 'startup_info',
+        'legal_compliance': 'content',
+        'hr_team_building': 'company_info',
+        'customer_support_scaling': 'customer_queries'
+    }
+
+    def __init__(self, startup_id: str, shared_agents: bool = False):
+        """Initialize enhanced orchestrator with autonomous features.
+        
+        With ``shared_agents`` the process-wide agent set is reused instead of
+        building ten new agents, as needed for batch runs.
+        """
         self.startup_id = startup_id
+        self.shared_agents = shared_agents
         self.workflow_id = generate_id("workflow")
         self.agents = {}
-        self.workflow_results = {}
-        self.execution_history = []
+        self.execution_history = WorkflowHistory(
+            config.workflow.history_max_entries, get_workflow_result_archive()
+        )
+        self.step_duration_estimates: Dict[str, float] = {}
+        self.checkpointer = get_workflow_checkpointer()
         self.autonomy_level = 0.75  # 75% autonomous task handling
         
         # Initialize message bus for agent communication
@@ -125,18 +146,13 @@ class EnhancedAgentOrchestrator:
         """Initialize all 10 agents with enhanced autonomous capabilities."""
         try:
             # Initialize all 10 agents with autonomous features
-            self.agents = {
-                'niche_research': NicheResearchAgent(self.startup_id),
-                'mvp_design': MVPDesignAgent(self.startup_id),
-                'marketing_strategy': MarketingStrategyAgent(self.startup_id),
-                'content_creation': ContentCreationAgent(self.startup_id),
-                'analytics': AnalyticsAgent(self.startup_id),
-                'operations_monetization': OperationsMonetizationAgent(self.startup_id),
-                'funding_investor': FundingInvestorAgent(self.startup_id),
-                'legal_compliance': LegalComplianceAgent(self.startup_id),
-                'hr_team_building': HRTeamBuildingAgent(self.startup_id),
-                'customer_support_scaling': CustomerSupportScalingAgent(self.startup_id)
-            }
+            if self.shared_agents:
+                self.agents = dict(get_shared_agents())
+            else:
+                self.agents = {
+                    agent_type: agent_class(self.startup_id)
+                    for agent_type, agent_class in AGENT_CLASSES.items()
+                }
             
             # Wrap agents with autonomous capabilities
             for agent_type, agent in self.agents.items():
@@ -171,8 +187,108 @@ class EnhancedAgentOrchestrator:
         language: str = "en"
     ) -> EnhancedWorkflowResult:
         """Execute enhanced workflow with 70-80% autonomous task handling."""
-        start_time = time.time()
+        return await self._run_enhanced_workflow(generate_id("workflow"), workflow_config, max_concurrent)
+
+    async def stream_workflow_events(
+        self,
+        workflow_config: Dict[str, Any],
+        max_concurrent: int = 3
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a workflow, yielding each step's result as soon as it finishes.
+        
+        The last event is 'workflow_completed' with the workflow summary.
+        Closing the iterator early cancels the remaining steps; finished ones
+        stay checkpointed for resume_workflow.
+        """
         workflow_id = generate_id("workflow")
+        events: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self._run_enhanced_workflow(
+            workflow_id, workflow_config, max_concurrent, on_event=events.put_nowait
+        ))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            
+            result = task.result()
+            yield {
+                'event': 'workflow_completed',
+                'workflow_id': workflow_id,
+                'success': result.success,
+                'steps_completed': result.steps_completed,
+                'steps_failed': result.steps_failed,
+                'total_cost': result.total_cost,
+                'execution_time': result.execution_time,
+                'autonomy_percentage': result.autonomy_percentage
+            }
+        finally:
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    def _step_event(workflow_id: str, outcome: StepOutcome) -> Dict[str, Any]:
+        """Client-facing event for a finished, failed or skipped step."""
+        event = {
+            'event': 'step_skipped' if outcome.skipped else 'step_completed' if outcome.success else 'step_failed',
+            'workflow_id': workflow_id,
+            'step': outcome.name,
+            'attempts': outcome.attempts,
+            'duration': outcome.duration
+        }
+        if outcome.success:
+            event['data'] = getattr(outcome.result, 'data', outcome.result)
+        else:
+            event['error'] = outcome.error
+        return event
+
+    async def resume_workflow(self, workflow_id: str, max_concurrent: int = 3) -> EnhancedWorkflowResult:
+        """Continue a checkpointed workflow, reusing the results of steps that already finished."""
+        if self.checkpointer is None:
+            raise ValueError("Workflow checkpointing is disabled")
+        checkpoint = await asyncio.to_thread(self.checkpointer.load, workflow_id)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint found for workflow {workflow_id}")
+        if checkpoint['startup_id'] and checkpoint['startup_id'] != self.startup_id:
+            logger.warning(f"Resuming workflow {workflow_id} of startup {checkpoint['startup_id']} from {self.startup_id}")
+        
+        completed = {}
+        for agent_type, stored in checkpoint['steps'].items():
+            result = stored['result']
+            if isinstance(result, dict):
+                try:
+                    result = AgentResult(**result)
+                except Exception:
+                    pass
+            completed[agent_type] = StepOutcome(
+                agent_type, True, result=result, attempts=stored['attempts'], restored=True
+            )
+        
+        logger.info(f"Resuming workflow {workflow_id} with {len(completed)} finished steps")
+        return await self._run_enhanced_workflow(
+            workflow_id, checkpoint['config'], max_concurrent, completed,
+            startup_id=checkpoint['startup_id']
+        )
+
+    async def _run_enhanced_workflow(
+        self,
+        workflow_id: str,
+        workflow_config: Dict[str, Any],
+        max_concurrent: int,
+        completed: Optional[Dict[str, StepOutcome]] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        startup_id: Optional[str] = None
+    ) -> EnhancedWorkflowResult:
+        """Run a workflow, checkpointing each step as it finishes.
+        
+        ``on_event`` receives a 'workflow_started' event and one event per step.
+        ``startup_id`` is the startup a resumed workflow was checkpointed for.
+        """
+        start_time = time.time()
+        startup_id = startup_id or self.startup_id
         
         try:
             logger.info(f"Starting enhanced workflow {workflow_id} with {self.autonomy_level*100}% autonomy")
@@ -180,94 +296,56 @@ class EnhancedAgentOrchestrator:
             # Parse workflow configuration
             steps = self._parse_workflow_config(workflow_config)
             
+            if self.checkpointer:
+                self.checkpointer.begin(workflow_id, startup_id, workflow_config)
+            if on_event:
+                on_event({
+                    'event': 'workflow_started',
+                    'workflow_id': workflow_id,
+                    'steps': [step.agent_type for step in steps],
+                    'restored': sorted(completed or {})
+                })
+            
             # Search for similar workflows in memory
             similar_workflows = await self._search_similar_workflows(workflow_config)
             
-            # Execute steps with autonomous decision making
-            steps_completed = []
-            steps_failed = []
-            results = {}
-            total_cost = 0.0
-            autonomous_features_used = []
-            
-            # Execute steps with concurrency control
-            semaphore = asyncio.Semaphore(max_concurrent)
-            
-            async def execute_step(step: EnhancedWorkflowStep):
-                async with semaphore:
-                    try:
-                        result = await self._execute_enhanced_step(step, similar_workflows)
-                        
-                        if result.success:
-                            steps_completed.append(step.agent_type)
-                            results[step.agent_type] = result.data
-                            total_cost += result.cost
-                            
-                            # Use autonomous features if confidence is high
-                            if hasattr(result, 'confidence') and result.confidence > step.confidence_threshold:
-                                autonomous_features_used.append(f"{step.agent_type}_autonomous")
-                                
-                        else:
-                            steps_failed.append(step.agent_type)
-                            results[step.agent_type] = {"error": result.message}
-                            
-                    except Exception as e:
-                        logger.error(f"Step {step.agent_type} failed: {e}")
-                        steps_failed.append(step.agent_type)
-                        results[step.agent_type] = {"error": str(e)}
-            
-            # Execute all steps concurrently
-            tasks = [execute_step(step) for step in steps]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Calculate execution time and success rate
-            execution_time = time.time() - start_time
-            success_rate = len(steps_completed) / len(steps) if steps else 0
-            
-            # Generate learning insights
-            learning_insights = await self._learn_from_enhanced_workflow(
-                workflow_id, steps_completed, steps_failed, results, execution_time
+            # Run each step as soon as its dependencies have finished
+            scheduler = DAGScheduler(
+                steps,
+                max_concurrent=max_concurrent,
+                duration_estimates=self.step_duration_estimates,
+                retry_backoff=config.workflow.retry_backoff,
+                max_retry_backoff=config.workflow.max_retry_backoff
             )
             
-            # Generate performance metrics
-            performance_metrics = self._generate_workflow_metrics(
-                steps_completed, steps_failed, total_cost, execution_time
-            )
+            async def execute_step(step: EnhancedWorkflowStep, upstream: Dict[str, Any]):
+                return await self._execute_enhanced_step(step, similar_workflows, upstream)
             
-            # Calculate autonomy percentage
-            autonomy_percentage = (len(autonomous_features_used) / len(steps)) * 100 if steps else 0
+            def step_finished(outcome: StepOutcome):
+                if self.checkpointer:
+                    self.checkpointer.record_step(workflow_id, outcome)
+                if on_event:
+                    on_event(self._step_event(workflow_id, outcome))
             
-            # Store workflow memory
-            await self._store_workflow_memory(workflow_id, learning_insights)
+            outcomes = await scheduler.run(execute_step, completed=completed, on_outcome=step_finished)
+            self._update_step_duration_estimates(outcomes)
             
-            workflow_result = EnhancedWorkflowResult(
-                workflow_id=workflow_id,
-                startup_id=self.startup_id,
-                success=success_rate >= 0.7,  # 70% success threshold
-                steps_completed=steps_completed,
-                steps_failed=steps_failed,
-                total_cost=total_cost,
-                execution_time=execution_time,
-                results=results,
-                timestamp=datetime.utcnow().isoformat(),
-                learning_insights=learning_insights,
-                performance_metrics=performance_metrics,
-                autonomous_features_used=autonomous_features_used,
-                autonomy_percentage=autonomy_percentage
-            )
-            
-            self.workflow_results[workflow_id] = workflow_result
-            self.execution_history.append(workflow_result)
-            
-            logger.info(f"Enhanced workflow {workflow_id} completed with {autonomy_percentage:.1f}% autonomy")
+            if self.checkpointer:
+                finished = all(outcome.success for outcome in outcomes.values())
+                self.checkpointer.finish(workflow_id, 'completed' if finished else 'failed')
             
-            return workflow_result
+            return await self._build_workflow_result(
+                workflow_id, startup_id, steps, outcomes,
+                time.time() - start_time, scheduler.get_stats()
+            )
             
         except Exception as e:
             logger.error(f"Enhanced workflow execution failed: {e}")
+            if self.checkpointer:
+                self.checkpointer.finish(workflow_id, 'failed')
             return EnhancedWorkflowResult(
                 workflow_id=workflow_id,
-                startup_id=self.startup_id,
+                startup_id=startup_id,
                 success=False,
                 steps_completed=[],
                 steps_failed=[],
@@ -281,6 +359,162 @@ class EnhancedAgentOrchestrator:
                 autonomy_percentage=0.0
             )
 
+    async def execute_batch_workflows(
+        self,
+        startup_ids: List[str],
+        workflow_config: Optional[Dict[str, Any]] = None,
+        max_concurrent: Optional[int] = None,
+        max_concurrent_per_startup: Optional[int] = None
+    ) -> Dict[str, EnhancedWorkflowResult]:
+        """Execute the workflow for many startups over this orchestrator's agents.
+        
+        Each startup only gets a small context object; agents, clients and
+        the LLM pool are shared, and steps from all startups share one
+        round-robin concurrency budget. Results and workflow insights are
+        stored in each startup's own memory, and every startup's workflow is
+        checkpointed under its own workflow id so resume_workflow can
+        continue it.
+        """
+        workflow_config = workflow_config or {}
+        batch_config = config.workflow
+        similar_workflows = await self._search_similar_workflows(workflow_config)
+        steps = self._parse_workflow_config(workflow_config)
+        # Each startup's results and insights go to its own memory collection
+        memories: Dict[str, VectorMemoryManager] = {}
+        
+        def memory_for(startup_id: str) -> VectorMemoryManager:
+            if startup_id == self.startup_id:
+                return self.vector_memory
+            if startup_id not in memories:
+                memories[startup_id] = VectorMemoryManager(startup_id)
+            return memories[startup_id]
+        
+        async def execute_step(context: StartupContext, step: EnhancedWorkflowStep, upstream: Dict[str, Any]):
+            return await self._execute_enhanced_step(
+                step, similar_workflows, upstream, memory_for(context.startup_id)
+            )
+        
+        def startup_started(context: StartupContext):
+            if self.checkpointer:
+                self.checkpointer.begin(context.workflow_id, context.startup_id, workflow_config)
+        
+        def step_finished(context: StartupContext, outcome: StepOutcome):
+            if self.checkpointer:
+                self.checkpointer.record_step(context.workflow_id, outcome)
+        
+        runner = BatchWorkflowRunner(
+            execute_step,
+            max_concurrent=max_concurrent or batch_config.batch_max_concurrent,
+            max_concurrent_per_startup=max_concurrent_per_startup or batch_config.batch_max_concurrent_per_startup,
+            max_active_startups=batch_config.batch_max_active_startups,
+            duration_estimates=self.step_duration_estimates,
+            retry_backoff=batch_config.retry_backoff,
+            max_retry_backoff=batch_config.max_retry_backoff
+        )
+        contexts = await runner.run(
+            {startup_id: steps for startup_id in startup_ids},
+            on_start=startup_started, on_outcome=step_finished
+        )
+        
+        results = {}
+        for startup_id, context in contexts.items():
+            if self.checkpointer:
+                finished = not context.error and all(outcome.success for outcome in context.outcomes.values())
+                self.checkpointer.finish(context.workflow_id, 'completed' if finished else 'failed')
+            self._update_step_duration_estimates(context.outcomes)
+            results[startup_id] = await self._build_workflow_result(
+                context.workflow_id, startup_id, steps, context.outcomes,
+                context.execution_time, context.schedule, memory_for(startup_id)
+            )
+        for memory in memories.values():
+            await memory.close()
+        
+        logger.info(f"Batch of {len(startup_ids)} workflows completed: {runner.get_stats()}")
+        return results
+
+    async def _build_workflow_result(
+        self,
+        workflow_id: str,
+        startup_id: str,
+        steps: List[EnhancedWorkflowStep],
+        outcomes: Dict[str, Any],
+        execution_time: float,
+        schedule: Dict[str, Any],
+        vector_memory: Optional[VectorMemoryManager] = None
+    ) -> EnhancedWorkflowResult:
+        """Summarize step outcomes, learn from them and record the result.
+        
+        Workflow memory goes to ``vector_memory``, the startup's own memory
+        in batch runs, or this orchestrator's.
+        """
+        steps_completed = []
+        steps_failed = []
+        results = {}
+        total_cost = 0.0
+        autonomous_features_used = []
+        
+        for step in steps:
+            outcome = outcomes.get(step.agent_type)
+            if outcome is None:
+                steps_failed.append(step.agent_type)
+                results[step.agent_type] = {"error": "Step did not run"}
+                continue
+            if outcome.result is not None:
+                total_cost += getattr(outcome.result, 'cost', 0.0)
+            if outcome.success:
+                steps_completed.append(step.agent_type)
+                # Restored results that no longer fit AgentResult stay plain dicts
+                results[step.agent_type] = getattr(outcome.result, 'data', outcome.result)
+                
+                # Use autonomous features if confidence is high
+                if getattr(outcome.result, 'confidence', 0.0) > step.confidence_threshold:
+                    autonomous_features_used.append(f"{step.agent_type}_autonomous")
+            else:
+                logger.error(f"Step {step.agent_type} failed: {outcome.error}")
+                steps_failed.append(step.agent_type)
+                results[step.agent_type] = {"error": outcome.error}
+        
+        success_rate = len(steps_completed) / len(steps) if steps else 0
+        
+        # Generate learning insights
+        learning_insights = await self._learn_from_enhanced_workflow(
+            workflow_id, steps_completed, steps_failed, results, execution_time
+        )
+        
+        # Generate performance metrics
+        performance_metrics = self._generate_workflow_metrics(
+            steps_completed, steps_failed, total_cost, execution_time
+        )
+        performance_metrics['schedule'] = schedule
+        
+        # Calculate autonomy percentage
+        autonomy_percentage = (len(autonomous_features_used) / len(steps)) * 100 if steps else 0
+        
+        # Store workflow memory
+        await self._store_workflow_memory(workflow_id, learning_insights, vector_memory)
+        
+        workflow_result = EnhancedWorkflowResult(
+            workflow_id=workflow_id,
+            startup_id=startup_id,
+            success=success_rate >= 0.7,  # 70% success threshold
+            steps_completed=steps_completed,
+            steps_failed=steps_failed,
+            total_cost=total_cost,
+            execution_time=execution_time,
+            results=results,
+            timestamp=datetime.utcnow().isoformat(),
+            learning_insights=learning_insights,
+            performance_metrics=performance_metrics,
+            autonomous_features_used=autonomous_features_used,
+            autonomy_percentage=autonomy_percentage
+        )
+        
+        self.execution_history.record(workflow_result)
+        
+        logger.info(f"Enhanced workflow {workflow_id} completed with {autonomy_percentage:.1f}% autonomy")
+        
+        return workflow_result
+
     def _parse_workflow_config(self, workflow_config: Dict[str, Any]) -> List[EnhancedWorkflowStep]:
         """Parse workflow configuration into enhanced steps."""
         steps = []
@@ -375,7 +609,9 @@ class EnhancedAgentOrchestrator:
     async def _execute_enhanced_step(
         self, 
         step: EnhancedWorkflowStep, 
-        similar_workflows: List[Dict]
+        similar_workflows: List[Dict],
+        upstream_results: Optional[Dict[str, Any]] = None,
+        vector_memory: Optional[VectorMemoryManager] = None
     ) -> Any:
         """Execute enhanced step with autonomous decision making."""
         try:
@@ -385,7 +621,7 @@ class EnhancedAgentOrchestrator:
                 raise ValueError(f"Agent {step.agent_type} not found")
             
             # Prepare parameters with autonomous decision making
-            params = self._prepare_step_parameters(step, similar_workflows)
+            params = self._prepare_step_parameters(step, similar_workflows, upstream_results)
             
             # Execute agent with autonomous capabilities
             if hasattr(agent, 'execute_autonomous'):
@@ -395,7 +631,7 @@ class EnhancedAgentOrchestrator:
             
             # Improve result with memory if enabled
             if step.memory_search and similar_workflows:
-                result = await self._improve_result_with_memory(agent, params, result)
+                result = await self._improve_result_with_memory(agent, params, result, vector_memory)
             
             return result
             
@@ -403,7 +639,12 @@ class EnhancedAgentOrchestrator:
             logger.error(f"Enhanced step execution failed: {e}")
             raise
 
-    def _prepare_step_parameters(self, step: EnhancedWorkflowStep, similar_workflows: List[Dict]) -> Dict[str, Any]:
+    def _prepare_step_parameters(
+        self,
+        step: EnhancedWorkflowStep,
+        similar_workflows: List[Dict],
+        upstream_results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Prepare step parameters with autonomous decision making."""
         # Base parameters for each agent type
         base_params = {
@@ -466,8 +707,46 @@ class EnhancedAgentOrchestrator:
             insights = self._extract_workflow_insights(similar_workflows, step.agent_type)
             params.update(insights)
         
+        # Feed upstream step outputs into the agent's free-text input
+        context_param = self.UPSTREAM_CONTEXT_PARAMS.get(step.agent_type)
+        if upstream_results and context_param in params:
+            upstream_context = self._summarize_upstream_results(upstream_results)
+            if upstream_context:
+                params[context_param] = f"{params[context_param]}\n\n{upstream_context}"
+        
         return params
 
+    def _summarize_upstream_results(self, upstream_results: Dict[str, Any]) -> str:
+        """Condense upstream agent results into a bounded text block."""
+        budget = config.workflow.upstream_context_chars
+        per_step = max(1, budget // len(upstream_results))
+        lines = ["Results from earlier steps:"]
+        for agent_type, result in upstream_results.items():
+            data = getattr(result, 'data', result)
+            if isinstance(data, dict):
+                text = ' '.join(
+                    str(value) for key, value in data.items()
+                    if key != 'timestamp' and isinstance(value, str)
+                )
+            else:
+                text = str(data)
+            if text:
+                lines.append(f"- {agent_type}: {text[:per_step]}")
+        return '\n'.join(lines) if len(lines) > 1 else ''
+
+    def _update_step_duration_estimates(self, outcomes: Dict[str, Any]):
+        """Blend the latest step durations into the estimates used for scheduling."""
+        smoothing = config.workflow.duration_smoothing
+        for agent_type, outcome in outcomes.items():
+            # Restored steps did not run here and carry no timing
+            if not outcome.success or outcome.restored:
+                continue
+            previous = self.step_duration_estimates.get(agent_type)
+            self.step_duration_estimates[agent_type] = (
+                outcome.duration if previous is None
+                else smoothing * outcome.duration + (1 - smoothing) * previous
+            )
+
     def _extract_workflow_insights(self, similar_workflows: List[Dict], agent_type: str) -> Dict[str, Any]:
         """Extract insights from similar workflows for autonomous decision making."""
         insights = {}
@@ -499,12 +778,13 @@ class EnhancedAgentOrchestrator:
         self, 
         agent: Any, 
         params: Dict[str, Any], 
-        original_result: Any
+        original_result: Any,
+        vector_memory: Optional[VectorMemoryManager] = None
     ) -> Any:
         """Improve agent result using memory and learning."""
         try:
             # Store result in vector memory
-            await self.vector_memory.store_agent_result(
+            await (vector_memory or self.vector_memory).store_agent_result(
                 agent_type=agent.agent_type,
                 params=params,
                 result=original_result.data,
@@ -604,14 +884,22 @@ class EnhancedAgentOrchestrator:
         
         return suggestions
 
-    async def _store_workflow_memory(self, workflow_id: str, learning_insights: Dict[str, Any]):
+    async def _store_workflow_memory(
+        self,
+        workflow_id: str,
+        learning_insights: Dict[str, Any],
+        vector_memory: Optional[VectorMemoryManager] = None
+    ):
         """Store workflow memory for future autonomous decision making."""
+        vector_memory = vector_memory or self.vector_memory
         try:
-            await self.vector_memory.store_workflow_memory(
+            await vector_memory.store_workflow_memory(
                 workflow_id=workflow_id,
                 insights=learning_insights,
                 timestamp=datetime.utcnow().isoformat()
             )
+            # Persist step results still waiting in the write buffer
+            await vector_memory.flush_writes()
             
         except Exception as e:
             logger.error(f"Failed to store workflow memory: {e}")
@@ -717,9 +1005,10 @@ class EnhancedAgentOrchestrator:
                 }
             }
             
-            # Get performance for each agent
+            # Get performance for each agent from one query
+            db_agents = db_manager.get_agents_by_startup(self.startup_id)
             for agent_type, agent in self.agents.items():
-                agent_stats = self._get_agent_stats(agent_type)
+                agent_stats = self._get_agent_stats(agent_type, db_agents)
                 performance['agents'][agent_type] = agent_stats
                 
                 # Aggregate overall metrics
@@ -735,17 +1024,20 @@ class EnhancedAgentOrchestrator:
                     performance['overall_metrics']['total_executions']
                 )
             
+            performance['workflow_history'] = self.execution_history.get_stats()
+            
             return performance
             
         except Exception as e:
             logger.error(f"Failed to get enhanced agent performance: {e}")
             return {}
 
-    def _get_agent_stats(self, agent_type: str) -> Dict[str, Any]:
+    def _get_agent_stats(self, agent_type: str, agents: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Get statistics for a specific agent."""
         try:
             # Get agent from database
-            agents = db_manager.get_agents_by_startup(self.startup_id)
+            if agents is None:
+                agents = db_manager.get_agents_by_startup(self.startup_id)
             agent = next((a for a in agents if a.agent_type == agent_type), None)
             
             if agent:
@@ -786,8 +1078,8 @@ class EnhancedAgentOrchestrator:
                 'cultural_intelligence_status': 'active',
                 'payment_processor_status': 'active',
                 'marketing_funnel_status': 'active',
-                'last_workflow_execution': self.execution_history[-1].timestamp if self.execution_history else None,
-                'total_workflows_executed': len(self.execution_history),
+                'last_workflow_execution': self.execution_history.last_timestamp,
+                'total_workflows_executed': self.execution_history.total_workflows,
                 'average_workflow_success_rate': self._calculate_average_success_rate(),
                 'system_health': 'healthy'
             }
@@ -798,16 +1090,12 @@ class EnhancedAgentOrchestrator:
 
     def _calculate_average_success_rate(self) -> float:
         """Calculate average success rate across all workflows."""
-        if not self.execution_history:
-            return 0.0
-        
-        total_success_rate = sum(
-            len(workflow.steps_completed) / (len(workflow.steps_completed) + len(workflow.steps_failed))
-            for workflow in self.execution_history
-            if len(workflow.steps_completed) + len(workflow.steps_failed) > 0
-        )
-        
-        return total_success_rate / len(self.execution_history)
+        return self.execution_history.average_success_rate
+
+    async def get_workflow_result(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Full result of a past workflow from the archive, or its summary if not archived."""
+        result = await asyncio.to_thread(self.execution_history.load_full, workflow_id)
+        return result or self.execution_history.get(workflow_id)
 
     # ===== NEW GROUNDBREAKING FEATURES INTEGRATION =====
     
@@ -1079,7 +1367,7 @@ class EnhancedAgentOrchestrator:
                 'adaptive_reinforcement_learning': {
                     'status': 'active',
                     'performance': rl_performance,
-                    'total_episodes': len(self.adaptive_rl.episodes),
+                    'total_episodes': self.adaptive_rl.total_episodes,
                     'learning_enabled': self.adaptive_rl.learning_enabled
                 },
                 'cultural_intelligence': {
@@ -1116,6 +1404,9 @@ class EnhancedAgentOrchestrator:
             # Register local node
             await self.agent_swarm.register_local_node()
             
+            # Warm Q-tables from persisted episodes
+            await self.adaptive_rl.warm_start()
+            
             logger.info("All groundbreaking features started successfully")
             
         except Exception as e:
@@ -1127,6 +1418,8 @@ class EnhancedAgentOrchestrator:
             # Stop agent swarm
             await self.agent_swarm.stop_swarm()
             
+            self.adaptive_rl.close()
+            
             logger.info("All groundbreaking features stopped successfully")
             
         except Exception as e:
@@ -1135,4 +1428,9 @@ class EnhancedAgentOrchestrator:
 
 def create_enhanced_orchestrator(startup_id: str) -> EnhancedAgentOrchestrator:
     """Factory function to create enhanced orchestrator."""
-    return EnhancedAgentOrchestrator(startup_id) 
\ No newline at end of file
+    return EnhancedAgentOrchestrator(startup_id)
+
+
+def create_batch_orchestrator() -> EnhancedAgentOrchestrator:
+    """Factory function for an orchestrator serving many startups via execute_batch_workflows."""
+    return EnhancedAgentOrchestrator(generate_id("batch"), shared_agents=True) 
\ No newline at end of file
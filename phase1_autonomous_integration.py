@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from enum import Enum
 import sqlite3
 import pickle
+import threading
 
 # Configure logging
 logging.basicConfig(
@@ -64,75 +65,158 @@ class LearningOutcome:
     timestamp: datetime
 
 class SimpleVectorMemory:
-    """Simplified vector memory using SQLite and basic similarity"""
+    """Simplified vector memory using SQLite and basic similarity
+    
+    Memories are indexed into a persistent token inverted index on insert, so
+    searches only score memories sharing a token with the query instead of
+    scanning the whole table. Tokens present in a large share of memories are
+    skipped when gathering candidates and only count towards the final score.
+    """
+    
+    # Tokens in more than this fraction of memories are too common to drive candidate lookup
+    MAX_POSTING_FRACTION = 0.2
+    # Posting lists at or below this size are always used, however small the table
+    MIN_POSTING_CAP = 1000
+    # Candidates scored per requested result
+    CANDIDATES_PER_RESULT = 20
     
     def __init__(self, db_path: str = "phase1_memory.db"):
         self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._memory_count = 0
         self.init_database()
         logger.info(f"SimpleVectorMemory initialized with database: {db_path}")
     
     def init_database(self):
         """Initialize SQLite database for memory storage"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create memories table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS memories (
-                    id TEXT PRIMARY KEY,
-                    agent_type TEXT,
-                    action TEXT,
-                    context TEXT,
-                    outcome TEXT,
-                    success_score REAL,
-                    timestamp TEXT,
-                    importance_score REAL,
-                    embedding_hash TEXT
-                )
-            ''')
-            
-            # Create learning outcomes table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS learning_outcomes (
-                    id TEXT PRIMARY KEY,
-                    agent_id TEXT,
-                    action TEXT,
-                    state TEXT,
-                    reward REAL,
-                    next_state TEXT,
-                    success INTEGER,
-                    confidence REAL,
-                    timestamp TEXT
-                )
-            ''')
-            
-            # Create performance metrics table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS performance_metrics (
-                    id TEXT PRIMARY KEY,
-                    agent_id TEXT,
-                    metric_type TEXT,
-                    value REAL,
-                    timestamp TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute('PRAGMA journal_mode=WAL')
+                cursor.execute('PRAGMA synchronous=NORMAL')
+                
+                # Create memories table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS memories (
+                        id TEXT PRIMARY KEY,
+                        agent_type TEXT,
+                        action TEXT,
+                        context TEXT,
+                        outcome TEXT,
+                        success_score REAL,
+                        timestamp TEXT,
+                        importance_score REAL,
+                        embedding_hash TEXT
+                    )
+                ''')
+                
+                # Inverted index: token -> memories containing it
+                columns = {row[1] for row in cursor.execute('PRAGMA table_info(memories)')}
+                if 'token_count' not in columns:
+                    cursor.execute('ALTER TABLE memories ADD COLUMN token_count INTEGER')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS memory_tokens (
+                        token TEXT,
+                        agent_type TEXT,
+                        memory_id TEXT,
+                        PRIMARY KEY (token, agent_type, memory_id)
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS memory_token_stats (
+                        token TEXT PRIMARY KEY,
+                        document_count INTEGER
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_memories_agent_time ON memories (agent_type, timestamp)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_memories_time ON memories (timestamp)')
+                
+                # Create learning outcomes table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS learning_outcomes (
+                        id TEXT PRIMARY KEY,
+                        agent_id TEXT,
+                        action TEXT,
+                        state TEXT,
+                        reward REAL,
+                        next_state TEXT,
+                        success INTEGER,
+                        confidence REAL,
+                        timestamp TEXT
+                    )
+                ''')
+                
+                # Create performance metrics table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS performance_metrics (
+                        id TEXT PRIMARY KEY,
+                        agent_id TEXT,
+                        metric_type TEXT,
+                        value REAL,
+                        timestamp TEXT
+                    )
+                ''')
+                
+                self._conn.commit()
+                self._backfill_token_index(cursor)
+                self._memory_count = cursor.execute('SELECT COUNT(*) FROM memories').fetchone()[0]
             logger.info("Database initialized successfully")
             
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
     
+    def _backfill_token_index(self, cursor, batch_size: int = 5000):
+        """Index memories stored before the inverted index existed"""
+        indexed = 0
+        while True:
+            rows = cursor.execute('''
+                SELECT id, agent_type, action, context, outcome FROM memories
+                WHERE token_count IS NULL LIMIT ?
+            ''', (batch_size,)).fetchall()
+            if not rows:
+                break
+            self._index_rows(cursor, [
+                (memory_id, agent_type, f"{action} {context} {outcome}")
+                for memory_id, agent_type, action, context, outcome in rows
+            ])
+            self._conn.commit()
+            indexed += len(rows)
+        if indexed:
+            logger.info(f"Indexed {indexed} existing memories")
+    
+    @staticmethod
+    def _tokenize(text: str) -> set:
+        """Split text into the token set used for similarity"""
+        return set(text.lower().split())
+    
+    def _index_rows(self, cursor, rows: List[Tuple[str, str, str]]):
+        """Add (memory_id, agent_type, text) rows to the inverted index"""
+        postings = []
+        counts = []
+        document_counts: Dict[str, int] = {}
+        for memory_id, agent_type, text in rows:
+            tokens = self._tokenize(text)
+            counts.append((len(tokens), memory_id))
+            for token in tokens:
+                postings.append((token, agent_type, memory_id))
+                document_counts[token] = document_counts.get(token, 0) + 1
+        
+        cursor.executemany('INSERT OR IGNORE INTO memory_tokens (token, agent_type, memory_id) VALUES (?, ?, ?)', postings)
+        cursor.executemany('''
+            INSERT INTO memory_token_stats (token, document_count) VALUES (?, ?)
+            ON CONFLICT(token) DO UPDATE SET document_count = document_count + excluded.document_count
+        ''', list(document_counts.items()))
+        cursor.executemany('UPDATE memories SET token_count = ? WHERE id = ?', counts)
+    
     def _simple_hash(self, text: str) -> str:
         """Create simple hash for text similarity"""
         return str(hash(text.lower().replace(" ", "")) % 1000000)
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate simple text similarity"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        words1 = self._tokenize(text1)
+        words2 = self._tokenize(text2)
         
         if not words1 or not words2:
             return 0.0
@@ -145,18 +229,20 @@ class SimpleVectorMemory:
     async def add_memory(self, memory: Memory) -> bool:
         """Add a new memory to storage"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.add_memories_sync([memory])
+            logger.info(f"Memory added: {memory.id} for agent {memory.agent_type.value}")
+            return True
             
-            # Create embedding hash
+        except Exception as e:
+            logger.error(f"Error adding memory: {e}")
+            return False
+    
+    def add_memories_sync(self, memories: List[Memory]) -> int:
+        """Insert and index memories in a single transaction"""
+        rows = []
+        for memory in memories:
             text_for_hash = f"{memory.action} {memory.context} {memory.outcome}"
-            embedding_hash = self._simple_hash(text_for_hash)
-            
-            cursor.execute('''
-                INSERT INTO memories 
-                (id, agent_type, action, context, outcome, success_score, timestamp, importance_score, embedding_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            rows.append((
                 memory.id,
                 memory.agent_type.value,
                 memory.action,
@@ -165,77 +251,123 @@ class SimpleVectorMemory:
                 memory.success_score,
                 memory.timestamp.isoformat(),
                 memory.importance_score,
-                embedding_hash
+                self._simple_hash(text_for_hash)
             ))
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Memory added: {memory.id} for agent {memory.agent_type.value}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error adding memory: {e}")
-            return False
+        
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                cursor.executemany('''
+                    INSERT INTO memories 
+                    (id, agent_type, action, context, outcome, success_score, timestamp, importance_score, embedding_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                self._index_rows(cursor, [(row[0], row[1], f"{row[2]} {row[3]} {row[4]}") for row in rows])
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._memory_count += len(rows)
+        return len(rows)
+    
+    def _candidate_ids(self, cursor, tokens: set, agent_type: Optional[AgentType], limit: int) -> List[str]:
+        """Memory ids sharing the most selective query tokens, best overlap first"""
+        placeholders = ','.join('?' * len(tokens))
+        document_counts = dict(cursor.execute(
+            f'SELECT token, document_count FROM memory_token_stats WHERE token IN ({placeholders})',
+            list(tokens)
+        ).fetchall())
+        if not document_counts:
+            return []
+        
+        posting_cap = max(self.MIN_POSTING_CAP, int(self._memory_count * self.MAX_POSTING_FRACTION))
+        selective = [token for token, count in document_counts.items() if count <= posting_cap]
+        if not selective:
+            # Every token is common; the rarest one still narrows the search
+            selective = [min(document_counts, key=document_counts.get)]
+        
+        query = f'SELECT memory_id FROM memory_tokens WHERE token IN ({",".join("?" * len(selective))})'
+        params: List[Any] = list(selective)
+        if agent_type:
+            query += ' AND agent_type = ?'
+            params.append(agent_type.value)
+        query += ' GROUP BY memory_id ORDER BY COUNT(*) DESC LIMIT ?'
+        params.append(limit)
+        return [row[0] for row in cursor.execute(query, params).fetchall()]
     
     async def search_similar_memories(self, query: str, agent_type: Optional[AgentType] = None, 
                                     limit: int = 10) -> List[Dict]:
-        """Search for similar memories using simple similarity"""
+        """Search for similar memories using the token inverted index"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get all memories
-            if agent_type:
-                cursor.execute('''
-                    SELECT * FROM memories WHERE agent_type = ? ORDER BY timestamp DESC
-                ''', (agent_type.value,))
-            else:
-                cursor.execute('SELECT * FROM memories ORDER BY timestamp DESC')
-            
-            memories_data = cursor.fetchall()
-            conn.close()
-            
-            # Calculate similarities
-            similarities = []
-            for memory_data in memories_data:
-                memory_text = f"{memory_data[2]} {memory_data[3]} {memory_data[4]}"  # action + context + outcome
-                similarity = self._calculate_similarity(query, memory_text)
-                
-                similarities.append({
-                    "id": memory_data[0],
-                    "agent_type": memory_data[1],
-                    "action": memory_data[2],
-                    "context": memory_data[3],
-                    "outcome": memory_data[4],
-                    "success_score": memory_data[5],
-                    "timestamp": memory_data[6],
-                    "importance_score": memory_data[7],
-                    "similarity": similarity
-                })
-            
-            # Sort by similarity and return top results
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
-            return similarities[:limit]
+            return self.search_similar_memories_sync(query, agent_type, limit)
             
         except Exception as e:
             logger.error(f"Error searching memories: {e}")
             return []
     
+    def search_similar_memories_sync(self, query: str, agent_type: Optional[AgentType] = None,
+                                     limit: int = 10) -> List[Dict]:
+        """Top-k memories by Jaccard similarity, scoring only index candidates"""
+        tokens = self._tokenize(query)
+        with self._lock:
+            cursor = self._conn.cursor()
+            rows = []
+            if tokens:
+                candidate_ids = self._candidate_ids(
+                    cursor, tokens, agent_type, max(limit * self.CANDIDATES_PER_RESULT, limit)
+                )
+                if candidate_ids:
+                    rows = cursor.execute(
+                        f'SELECT * FROM memories WHERE id IN ({",".join("?" * len(candidate_ids))})',
+                        candidate_ids
+                    ).fetchall()
+            
+            if len(rows) < limit:
+                # Not enough matches: pad with the most recent memories like a full scan would
+                seen = {row[0] for row in rows}
+                recent_query = 'SELECT * FROM memories'
+                params: List[Any] = []
+                if agent_type:
+                    recent_query += ' WHERE agent_type = ?'
+                    params.append(agent_type.value)
+                recent_query += ' ORDER BY timestamp DESC LIMIT ?'
+                params.append(limit + len(seen))
+                rows.extend(
+                    row for row in cursor.execute(recent_query, params).fetchall()
+                    if row[0] not in seen
+                )
+        
+        # Calculate similarities
+        similarities = []
+        for memory_data in rows:
+            memory_text = f"{memory_data[2]} {memory_data[3]} {memory_data[4]}"  # action + context + outcome
+            similarities.append({
+                "id": memory_data[0],
+                "agent_type": memory_data[1],
+                "action": memory_data[2],
+                "context": memory_data[3],
+                "outcome": memory_data[4],
+                "success_score": memory_data[5],
+                "timestamp": memory_data[6],
+                "importance_score": memory_data[7],
+                "similarity": self._calculate_similarity(query, memory_text)
+            })
+        
+        # Most similar first, newest first among ties
+        similarities.sort(key=lambda x: (x["similarity"], x["timestamp"]), reverse=True)
+        return similarities[:limit]
+    
     async def get_successful_patterns(self, agent_type: AgentType, min_success_score: float = 0.7) -> List[Dict]:
         """Get successful patterns for an agent type"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM memories 
-                WHERE agent_type = ? AND success_score >= ?
-                ORDER BY success_score DESC, timestamp DESC
-            ''', (agent_type.value, min_success_score))
-            
-            patterns_data = cursor.fetchall()
-            conn.close()
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute('''
+                    SELECT * FROM memories 
+                    WHERE agent_type = ? AND success_score >= ?
+                    ORDER BY success_score DESC, timestamp DESC
+                ''', (agent_type.value, min_success_score))
+                patterns_data = cursor.fetchall()
             
             patterns = []
             for pattern_data in patterns_data:
@@ -253,6 +385,11 @@ class SimpleVectorMemory:
         except Exception as e:
             logger.error(f"Error getting successful patterns: {e}")
             return []
+    
+    def close(self):
+        """Close the shared database connection"""
+        with self._lock:
+            self._conn.close()
 
 class SimpleSelfTuningAgent:
     """Simplified self-tuning agent with basic learning capabilities"""
@@ -6,17 +6,27 @@ Implements caching for API responses, session management, and performance optimi
 
 import os
 import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import fnmatch
 import logging
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Any, Union
 from functools import wraps
 import pickle
 
 import redis
+import redis.asyncio as aioredis
 from redis.exceptions import RedisError
 
 from config import config
+from cache_codec import CacheCodec
 from utils import generate_id, log
 
 # Configure logging
@@ -28,6 +38,7 @@ REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 0))
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
 REDIS_SSL = os.getenv('REDIS_SSL', 'false').lower() == 'true'
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
 
 # Cache Configuration
 DEFAULT_CACHE_TTL = 3600  # 1 hour
@@ -35,14 +46,175 @@ API_CACHE_TTL = 300      # 5 minutes
 SESSION_CACHE_TTL = 86400 # 24 hours
 AGENT_CACHE_TTL = 1800   # 30 minutes
 
+# In-process L1 tier
+L1_CACHE_MAX_ENTRIES = int(os.getenv('L1_CACHE_MAX_ENTRIES', 10000))
+L1_CACHE_MAX_BYTES = int(os.getenv('L1_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+L1_CACHE_MAX_TTL = int(os.getenv('L1_CACHE_MAX_TTL', 60))  # bounds staleness if an invalidation is missed
+INVALIDATION_CHANNEL = 'autopilot:cache:invalidate'
+
+# Bulk invalidation
+SCAN_BATCH_SIZE = int(os.getenv('CACHE_SCAN_BATCH_SIZE', 1000))  # keys per SCAN page and per UNLINK
+TAG_INDEX_TTL = SESSION_CACHE_TTL  # outlives every tagged entry; refreshed on each write
+LOCAL_TAG_PRUNE_SIZE = 1000
+# Entries written before the tag index have no tags; also remove them by key until they have expired.
+# The first worker to start with tagging records when it began, so the pass stops after one TTL.
+LEGACY_KEY_INVALIDATION = os.getenv('CACHE_LEGACY_KEY_INVALIDATION', 'true').lower() == 'true'
+TAG_INDEX_SINCE_KEY = 'autopilot:cache:tag_index_since'
+
+# Stampede protection for computed entries
+LOAD_LOCK_TIMEOUT = int(os.getenv('CACHE_LOAD_LOCK_TIMEOUT', 30))  # seconds; bounds a crashed loader
+LOAD_LOCK_POLL_INTERVAL = 0.05  # seconds between checks while another worker computes
+EARLY_REFRESH_BETA = float(os.getenv('CACHE_EARLY_REFRESH_BETA', 1.0))  # 0 disables early refresh
+CACHE_ENTRY_MARKER = '__autopilot_cache_entry__'
+
+# Value encoding; unset picks the fastest installed serializer/compressor
+CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER') or None
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION') or None
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv('CACHE_COMPRESSION_THRESHOLD', 1024))  # bytes
+
+
+@dataclass
+class InvalidationResult:
+    """Outcome of a bulk cache invalidation."""
+    
+    removed: int
+    duration_ms: float
+    method: str
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL and a byte budget.
+
+    Stores encoded bytes so values behave exactly as they would after a
+    Redis round trip, and so entry sizes are known for eviction.
+    """
+    
+    def __init__(self, max_entries: int = L1_CACHE_MAX_ENTRIES, max_bytes: int = L1_CACHE_MAX_BYTES):
+        """Initialize local cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a live entry, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store an entry, evicting least recently used ones over budget."""
+        size = len(value)
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def ttl(self, key: str) -> Optional[float]:
+        """Remaining seconds for a live entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            return remaining if remaining > 0 else None
+    
+    def expire(self, key: str, ttl: float) -> bool:
+        """Reset an entry's TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._entries[key] = (time.monotonic() + ttl, entry[1])
+            return True
+    
+    def delete(self, key: str) -> bool:
+        """Remove an entry."""
+        with self._lock:
+            return self._remove(key)
+    
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove entries whose key matches a glob pattern."""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[1])
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
 
 class CacheManager:
-    """Redis cache manager for performance optimization."""
+    """Two-tier cache: in-process L1 in front of Redis L2.
     
-    def __init__(self):
-        """Initialize Redis connection."""
-        self.redis_client = None
-        self._initialize_redis()
+    L1 keeps serving when Redis is unavailable. Writes and deletes publish
+    invalidations on a Redis channel so other workers drop stale L1 entries.
+    Values are stored as codec-encoded bytes, so an injected client must use
+    ``decode_responses=False``.
+    """
+    
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        local_cache: Optional[LocalCache] = None,
+        codec: Optional[CacheCodec] = None
+    ):
+        """Initialize Redis connection and the local tier."""
+        self.redis_client = redis_client
+        self.local_cache = local_cache if local_cache is not None else LocalCache()
+        self.codec = codec or CacheCodec(
+            serializer=CACHE_SERIALIZER, compression=CACHE_COMPRESSION,
+            compression_threshold=CACHE_COMPRESSION_THRESHOLD
+        )
+        self.instance_id = uuid.uuid4().hex
+        self.stats = {
+            'l1_hits': 0, 'l1_misses': 0, 'l2_hits': 0, 'l2_misses': 0,
+            'sets': 0, 'invalidations_received': 0
+        }
+        self._pubsub_thread = None
+        # Tag -> keys for the local tier while Redis is unavailable
+        self._local_tags: Dict[str, set] = defaultdict(set)
+        if self.redis_client is None:
+            self._initialize_redis()
+        self._tag_index_since = self._record_tag_index_start()
+        self._subscribe_invalidations()
     
     def _initialize_redis(self):
         """Initialize Redis connection with fallback."""
@@ -54,7 +226,7 @@ class CacheManager:
                 db=REDIS_DB,
                 password=REDIS_PASSWORD,
                 ssl=REDIS_SSL,
-                decode_responses=True,
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 retry_on_timeout=True
@@ -68,54 +240,155 @@ class CacheManager:
             logger.warning(f"Redis connection failed: {e}. Using in-memory fallback.")
             self.redis_client = None
     
+    def _record_tag_index_start(self) -> Optional[float]:
+        """Record (once, shared by all workers) when keys started being tagged."""
+        if not self.redis_client or not LEGACY_KEY_INVALIDATION:
+            return None
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.set(TAG_INDEX_SINCE_KEY, time.time(), nx=True)
+            pipeline.get(TAG_INDEX_SINCE_KEY)
+            return float(pipeline.execute()[1])
+        except (RedisError, TypeError, ValueError) as e:
+            logger.warning(f"Recording tag index start failed: {e}")
+            return None
+    
+    def legacy_keys_may_exist(self, ttl: int) -> bool:
+        """Whether untagged entries with this TTL may still be live in Redis.
+        
+        Entries written before tagging began have expired once ``ttl`` has
+        elapsed, after which invalidation needs no key or pattern pass.
+        """
+        if self._tag_index_since is None:
+            return False
+        return time.time() < self._tag_index_since + ttl
+    
+    def _subscribe_invalidations(self):
+        """Listen for invalidations published by other workers."""
+        if not self.redis_client:
+            return
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: self._handle_invalidation})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except RedisError as e:
+            logger.warning(f"Cache invalidation subscription failed: {e}")
+    
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        """Apply an invalidation message to the local tier."""
+        try:
+            payload = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        if payload.get('origin') == self.instance_id:
+            return
+        self.stats['invalidations_received'] += 1
+        for key in payload.get('keys', []):
+            self.local_cache.delete(key)
+        if payload.get('pattern'):
+            self.local_cache.delete_pattern(payload['pattern'])
+    
+    def _publish_invalidation(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None):
+        """Tell other workers to drop keys from their local tier."""
+        if not self.redis_client:
+            return
+        try:
+            self.redis_client.publish(INVALIDATION_CHANNEL, json.dumps({
+                'origin': self.instance_id, 'keys': keys or [], 'pattern': pattern
+            }))
+        except RedisError as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+    
+    def close(self):
+        """Stop the invalidation listener."""
+        if self._pubsub_thread:
+            self._pubsub_thread.stop()
+            self._pubsub_thread.join(timeout=2)
+            self._pubsub_thread = None
+    
     def _get_cache_key(self, prefix: str, identifier: str) -> str:
         """Generate cache key with prefix."""
         return f"autopilot:{prefix}:{identifier}"
     
-    def _serialize_value(self, value: Any) -> str:
+    def _serialize_value(self, value: Any) -> bytes:
         """Serialize value for Redis storage."""
-        try:
-            if isinstance(value, (dict, list)):
-                return json.dumps(value, default=str)
-            elif isinstance(value, (datetime, timedelta)):
-                return json.dumps(value.isoformat())
-            else:
-                return str(value)
-        except Exception as e:
-            logger.error(f"Serialization failed: {e}")
-            return str(value)
+        return self.codec.encode(value)
     
-    def _deserialize_value(self, value: str, value_type: str = 'json') -> Any:
-        """Deserialize value from Redis storage."""
+    def _deserialize_value(self, value: Union[bytes, str], value_type: str = 'json') -> Any:
+        """Deserialize value from Redis storage.
+        
+        Values without a codec header were written by the previous
+        string-based serializer and are decoded the old way.
+        """
         try:
+            if CacheCodec.is_encoded(value):
+                return self.codec.decode(value)
+            if value_type == 'pickle':
+                return pickle.loads(value if isinstance(value, bytes) else value.encode('latin1'))
+            if isinstance(value, bytes):
+                value = value.decode('utf-8')
             if value_type == 'json':
                 return json.loads(value)
-            elif value_type == 'pickle':
-                return pickle.loads(value.encode('latin1'))
-            else:
-                return value
+            return value
         except Exception as e:
             logger.error(f"Deserialization failed: {e}")
             return value
     
-    def set(self, key: str, value: Any, ttl: int = DEFAULT_CACHE_TTL) -> bool:
-        """Set value in cache with TTL."""
+    def _tag_key(self, tag: str) -> str:
+        """Redis set holding the keys registered under a tag."""
+        return f"autopilot:tag:{tag}"
+    
+    def _tag_locally(self, keys: List[str], tags: Optional[List[str]]):
+        """Record tags for local-only entries, pruning keys already evicted."""
+        for tag in tags or []:
+            members = self._local_tags[tag]
+            members.update(keys)
+            if len(members) > LOCAL_TAG_PRUNE_SIZE:
+                self._local_tags[tag] = {key for key in members if key in self.local_cache}
+    
+    def set(self, key: str, value: Any, ttl: int = DEFAULT_CACHE_TTL, tags: Optional[List[str]] = None) -> bool:
+        """Set value in cache with TTL, optionally registering it under tags."""
+        serialized_value = self._serialize_value(value)
+        self.stats['sets'] += 1
+        if not self.redis_client:
+            self.local_cache.set(key, serialized_value, ttl)
+            self._tag_locally([key], tags)
+            return True
         try:
-            if self.redis_client:
-                serialized_value = self._serialize_value(value)
-                return self.redis_client.setex(key, ttl, serialized_value)
-            return False
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.setex(key, ttl, serialized_value)
+            for tag in tags or []:
+                pipeline.sadd(self._tag_key(tag), key)
+                pipeline.expire(self._tag_key(tag), TAG_INDEX_TTL)
+            stored = pipeline.execute()[0]
+            self.local_cache.set(key, serialized_value, min(ttl, L1_CACHE_MAX_TTL))
+            self._publish_invalidation(keys=[key])
+            return stored
         except RedisError as e:
             logger.error(f"Redis set failed: {e}")
+            self.local_cache.set(key, serialized_value, min(ttl, L1_CACHE_MAX_TTL))
             return False
     
     def get(self, key: str, value_type: str = 'json') -> Optional[Any]:
-        """Get value from cache."""
+        """Get value from cache, checking the local tier first."""
+        value = self.local_cache.get(key)
+        if value is not None:
+            self.stats['l1_hits'] += 1
+            return self._deserialize_value(value, value_type)
+        self.stats['l1_misses'] += 1
+        
         try:
             if self.redis_client:
-                value = self.redis_client.get(key)
-                if value:
+                pipeline = self.redis_client.pipeline(transaction=False)
+                pipeline.get(key)
+                pipeline.pttl(key)
+                value, ttl_ms = pipeline.execute()
+                if value is not None:
+                    self.stats['l2_hits'] += 1
+                    remaining = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else L1_CACHE_MAX_TTL
+                    self.local_cache.set(key, value, min(remaining, L1_CACHE_MAX_TTL))
                     return self._deserialize_value(value, value_type)
+                self.stats['l2_misses'] += 1
             return None
         except RedisError as e:
             logger.error(f"Redis get failed: {e}")
@@ -123,16 +396,20 @@ class CacheManager:
     
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
+        deleted = self.local_cache.delete(key)
         try:
             if self.redis_client:
-                return bool(self.redis_client.delete(key))
-            return False
+                deleted = bool(self.redis_client.delete(key)) or deleted
+                self._publish_invalidation(keys=[key])
+            return deleted
         except RedisError as e:
             logger.error(f"Redis delete failed: {e}")
-            return False
+            return deleted
     
     def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
+        if self.local_cache.get(key) is not None:
+            return True
         try:
             if self.redis_client:
                 return bool(self.redis_client.exists(key))
@@ -143,25 +420,94 @@ class CacheManager:
     
     def expire(self, key: str, ttl: int) -> bool:
         """Set expiration for key."""
+        local = self.local_cache.expire(key, min(ttl, L1_CACHE_MAX_TTL) if self.redis_client else ttl)
         try:
             if self.redis_client:
                 return bool(self.redis_client.expire(key, ttl))
-            return False
+            return local
         except RedisError as e:
             logger.error(f"Redis expire failed: {e}")
-            return False
+            return local
     
     def clear_pattern(self, pattern: str) -> int:
         """Clear all keys matching pattern."""
-        try:
-            if self.redis_client:
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    return self.redis_client.delete(*keys)
-            return 0
-        except RedisError as e:
-            logger.error(f"Redis clear pattern failed: {e}")
-            return 0
+        return self.invalidate_pattern(pattern).removed
+    
+    def _unlink_keys(self, keys: Iterable[Union[bytes, str]], publish: bool = False) -> int:
+        """UNLINK keys in chunks so no single command blocks Redis for long."""
+        removed = 0
+        chunk: List[Union[bytes, str]] = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) >= SCAN_BATCH_SIZE:
+                removed += self._unlink_chunk(chunk, publish)
+                chunk = []
+        if chunk:
+            removed += self._unlink_chunk(chunk, publish)
+        return removed
+    
+    def _unlink_chunk(self, keys: List[Union[bytes, str]], publish: bool) -> int:
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        for key in keys:
+            self.local_cache.delete(key)
+        if publish:
+            self._publish_invalidation(keys=keys)
+        return self.redis_client.unlink(*keys)
+    
+    def invalidate_pattern(self, pattern: str) -> InvalidationResult:
+        """Remove keys matching a glob pattern using cursor SCAN and chunked UNLINK."""
+        started = time.perf_counter()
+        removed = self.local_cache.delete_pattern(pattern)
+        if self.redis_client:
+            try:
+                self._publish_invalidation(pattern=pattern)
+                removed = self._unlink_keys(
+                    self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE)
+                )
+            except RedisError as e:
+                logger.error(f"Redis clear pattern failed: {e}")
+        
+        result = InvalidationResult(removed, (time.perf_counter() - started) * 1000, 'scan')
+        logger.info(f"Invalidated {result.removed} keys matching {pattern} in {result.duration_ms:.1f}ms")
+        return result
+    
+    def invalidate_tags(self, *tags: str) -> InvalidationResult:
+        """Remove every key registered under any of the tags, without scanning."""
+        started = time.perf_counter()
+        removed = 0
+        for tag in tags:
+            local_keys = self._local_tags.pop(tag, set())
+            local_removed = sum(1 for key in local_keys if self.local_cache.delete(key))
+            if not self.redis_client:
+                removed += local_removed
+                continue
+            try:
+                tag_key = self._tag_key(tag)
+                removed += self._unlink_keys(
+                    self.redis_client.sscan_iter(tag_key, count=SCAN_BATCH_SIZE), publish=True
+                )
+                self.redis_client.unlink(tag_key)
+            except RedisError as e:
+                logger.error(f"Redis tag invalidation failed for {tag}: {e}")
+        
+        result = InvalidationResult(removed, (time.perf_counter() - started) * 1000, 'tags')
+        logger.info(f"Invalidated {result.removed} keys tagged {', '.join(tags)} in {result.duration_ms:.1f}ms")
+        return result
+    
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """L1/L2 hit rates and local tier usage."""
+        l1_lookups = self.stats['l1_hits'] + self.stats['l1_misses']
+        l2_lookups = self.stats['l2_hits'] + self.stats['l2_misses']
+        total_hits = self.stats['l1_hits'] + self.stats['l2_hits']
+        return {
+            **self.stats,
+            'l1_hit_rate': self.stats['l1_hits'] / l1_lookups if l1_lookups else 0.0,
+            'l2_hit_rate': self.stats['l2_hits'] / l2_lookups if l2_lookups else 0.0,
+            'overall_hit_rate': total_hits / l1_lookups if l1_lookups else 0.0,
+            'l1_entries': len(self.local_cache),
+            'l1_bytes': self.local_cache.size_bytes,
+            'l1_evictions': self.local_cache.evictions
+        }
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -190,33 +536,408 @@ class CacheManager:
             }
 
 
+class AsyncCacheManager:
+    """Asyncio Redis client path for a CacheManager.
+    
+    Shares the sync manager's local tier, stats and serialization, so both
+    paths see the same entries, but talks to Redis through a pooled
+    ``redis.asyncio`` client and never blocks the event loop. Multi-key
+    operations are sent as one MGET or one pipeline.
+    """
+    
+    def __init__(self, cache_manager: CacheManager, redis_client: Optional[aioredis.Redis] = None):
+        """Initialize async client; Redis is used only if the sync manager reached it."""
+        self.cache_manager = cache_manager
+        self.local_cache = cache_manager.local_cache
+        self.stats = cache_manager.stats
+        self.redis_client = redis_client
+        if self.redis_client is None and cache_manager.redis_client is not None:
+            self.redis_client = aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                **({'connection_class': aioredis.SSLConnection} if REDIS_SSL else {})
+            ))
+    
+    def _serialize(self, value: Any) -> bytes:
+        return self.cache_manager._serialize_value(value)
+    
+    def _deserialize(self, value: bytes, value_type: str) -> Any:
+        return self.cache_manager._deserialize_value(value, value_type)
+    
+    async def _publish_invalidation(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None):
+        """Tell other workers to drop keys from their local tier."""
+        try:
+            await self.redis_client.publish(INVALIDATION_CHANNEL, json.dumps({
+                'origin': self.cache_manager.instance_id, 'keys': keys or [], 'pattern': pattern
+            }))
+        except RedisError as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+    
+    async def get(self, key: str, value_type: str = 'json') -> Optional[Any]:
+        """Get value from cache, checking the local tier first."""
+        return (await self.mget([key], value_type)).get(key)
+    
+    async def mget(self, keys: List[str], value_type: str = 'json') -> Dict[str, Any]:
+        """Get many values; local misses are fetched with a single round trip.
+        
+        Returns only the keys that were found.
+        """
+        found: Dict[str, Any] = {}
+        remote_keys = []
+        for key in keys:
+            value = self.local_cache.get(key)
+            if value is not None:
+                self.stats['l1_hits'] += 1
+                found[key] = self._deserialize(value, value_type)
+            else:
+                self.stats['l1_misses'] += 1
+                remote_keys.append(key)
+        
+        if not remote_keys or not self.redis_client:
+            return found
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.mget(remote_keys)
+            for key in remote_keys:
+                pipeline.pttl(key)
+            values, *ttls = await pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Redis mget failed: {e}")
+            return found
+        
+        for key, value, ttl_ms in zip(remote_keys, values, ttls):
+            if value is None:
+                self.stats['l2_misses'] += 1
+                continue
+            self.stats['l2_hits'] += 1
+            remaining = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else L1_CACHE_MAX_TTL
+            self.local_cache.set(key, value, min(remaining, L1_CACHE_MAX_TTL))
+            found[key] = self._deserialize(value, value_type)
+        return found
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = DEFAULT_CACHE_TTL,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """Set value in cache with TTL."""
+        return await self.mset({key: value}, ttl, tags)
+    
+    async def mset(
+        self,
+        mapping: Dict[str, Any],
+        ttl: int = DEFAULT_CACHE_TTL,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """Set many values with a TTL in one pipelined round trip."""
+        serialized = {key: self._serialize(value) for key, value in mapping.items()}
+        self.stats['sets'] += len(serialized)
+        local_ttl = min(ttl, L1_CACHE_MAX_TTL) if self.redis_client else ttl
+        for key, value in serialized.items():
+            self.local_cache.set(key, value, local_ttl)
+        if not self.redis_client:
+            self.cache_manager._tag_locally(list(serialized), tags)
+            return True
+        
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key, value in serialized.items():
+                pipeline.setex(key, ttl, value)
+            for tag in tags or []:
+                tag_key = self.cache_manager._tag_key(tag)
+                pipeline.sadd(tag_key, *serialized)
+                pipeline.expire(tag_key, TAG_INDEX_TTL)
+            pipeline.publish(INVALIDATION_CHANNEL, json.dumps({
+                'origin': self.cache_manager.instance_id, 'keys': list(serialized), 'pattern': None
+            }))
+            results = await pipeline.execute()
+            return all(results[:len(serialized)])
+        except RedisError as e:
+            logger.error(f"Redis mset failed: {e}")
+            return False
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete keys; returns how many existed."""
+        deleted = sum(1 for key in keys if self.local_cache.delete(key))
+        if not self.redis_client or not keys:
+            return deleted
+        try:
+            removed = await self.redis_client.delete(*keys)
+            await self._publish_invalidation(keys=list(keys))
+            return max(removed, deleted)
+        except RedisError as e:
+            logger.error(f"Redis delete failed: {e}")
+            return deleted
+    
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in cache."""
+        if self.local_cache.get(key) is not None:
+            return True
+        try:
+            if self.redis_client:
+                return bool(await self.redis_client.exists(key))
+            return False
+        except RedisError as e:
+            logger.error(f"Redis exists failed: {e}")
+            return False
+    
+    async def expire(self, key: str, ttl: int) -> bool:
+        """Set expiration for key."""
+        local = self.local_cache.expire(key, min(ttl, L1_CACHE_MAX_TTL) if self.redis_client else ttl)
+        try:
+            if self.redis_client:
+                return bool(await self.redis_client.expire(key, ttl))
+            return local
+        except RedisError as e:
+            logger.error(f"Redis expire failed: {e}")
+            return local
+    
+    async def close(self):
+        """Close pooled connections."""
+        if self.redis_client:
+            await self.redis_client.aclose()
+
+
+def unwrap_cached_value(value: Any) -> Any:
+    """Return the payload of a CacheLoader entry, or the value itself."""
+    if isinstance(value, dict) and value.get(CACHE_ENTRY_MARKER):
+        return value.get('value')
+    return value
+
+
+class CacheLoader:
+    """Read-through loading with stampede protection.
+    
+    Concurrent misses for a key share one computation: callers in this
+    process await the same future, and other workers wait on a short Redis
+    lock and then read the stored result. Entries record when they stop
+    being fresh and how long they took to compute, which drives
+    probabilistic early refresh (XFetch) and stale-while-revalidate.
+    """
+    
+    def __init__(self, async_cache_manager: AsyncCacheManager):
+        """Initialize loader."""
+        self.async_cache_manager = async_cache_manager
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: set = set()
+        self.stats = {
+            'loads': 0, 'coalesced': 0, 'lock_waits': 0,
+            'stale_served': 0, 'early_refreshes': 0
+        }
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader,
+        ttl: int,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Return the cached value for key, computing it at most once on a miss.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument coroutine function producing the value
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds an expired value may be served while one
+                background task refreshes it
+            tags: Invalidation tags for the stored entry
+        """
+        entry = await self.async_cache_manager.get(key)
+        if entry is not None:
+            if not (isinstance(entry, dict) and entry.get(CACHE_ENTRY_MARKER)):
+                return entry  # written directly, without load metadata
+            now = time.time()
+            if now < entry['fresh_until']:
+                if self._should_refresh_early(entry, now):
+                    self.stats['early_refreshes'] += 1
+                    self._refresh_in_background(key, loader, ttl, stale_ttl, tags)
+                return entry['value']
+            if stale_ttl > 0:
+                self.stats['stale_served'] += 1
+                self._refresh_in_background(key, loader, ttl, stale_ttl, tags)
+                return entry['value']
+        
+        return await self._load_once(key, loader, ttl, stale_ttl, tags)
+    
+    @staticmethod
+    def _should_refresh_early(entry: Dict[str, Any], now: float) -> bool:
+        """XFetch: refresh ahead of expiry with probability rising as expiry nears."""
+        if EARLY_REFRESH_BETA <= 0:
+            return False
+        delta = entry.get('delta', 0.0)
+        return now - delta * EARLY_REFRESH_BETA * math.log(1.0 - random.random()) >= entry['fresh_until']
+    
+    def _refresh_in_background(self, key: str, loader, ttl: int, stale_ttl: int, tags: Optional[List[str]]):
+        if key in self._inflight:
+            return
+        task = asyncio.create_task(self._refresh(key, loader, ttl, stale_ttl, tags))
+        self._background.add(task)
+        task.add_done_callback(self._finish_background)
+    
+    def _finish_background(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+    
+    async def _refresh(self, key: str, loader, ttl: int, stale_ttl: int, tags: Optional[List[str]]):
+        """Recompute an entry unless another worker is already doing so."""
+        token = await self._acquire_lock(key)
+        if token is not None:
+            await self._load_once(key, loader, ttl, stale_ttl, tags, token)
+    
+    async def _load_once(
+        self,
+        key: str,
+        loader,
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]],
+        token: Optional[str] = None
+    ) -> Any:
+        """Compute and store a value, coalescing with any in-flight load."""
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            self.stats['coalesced'] += 1
+            if token is not None:
+                await self._release_lock(key, token)
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load_with_lock(key, loader, ttl, stale_ttl, tags, token)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; the error is re-raised to this caller
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+    
+    async def _load_with_lock(
+        self,
+        key: str,
+        loader,
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]],
+        token: Optional[str]
+    ) -> Any:
+        """Compute under the cross-worker lock, or wait for the worker holding it."""
+        if token is None:
+            token = await self._acquire_lock(key)
+        if token is None:
+            self.stats['lock_waits'] += 1
+            deadline = time.monotonic() + LOAD_LOCK_TIMEOUT
+            while token is None and time.monotonic() < deadline:
+                await asyncio.sleep(LOAD_LOCK_POLL_INTERVAL)
+                entry = await self.async_cache_manager.get(key)
+                if entry is not None and time.time() < self._fresh_until(entry):
+                    return unwrap_cached_value(entry)
+                token = await self._acquire_lock(key)
+        
+        try:
+            started = time.perf_counter()
+            value = await loader()
+            delta = time.perf_counter() - started
+            self.stats['loads'] += 1
+            await self.async_cache_manager.set(key, {
+                CACHE_ENTRY_MARKER: 1,
+                'value': value,
+                'fresh_until': time.time() + ttl,
+                'delta': delta
+            }, ttl + stale_ttl, tags=tags)
+            return value
+        finally:
+            if token is not None:
+                await self._release_lock(key, token)
+    
+    @staticmethod
+    def _fresh_until(entry: Any) -> float:
+        if isinstance(entry, dict) and entry.get(CACHE_ENTRY_MARKER):
+            return entry['fresh_until']
+        return math.inf
+    
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """SET NX a lock for key; returns the owner token, or None if held elsewhere."""
+        token = uuid.uuid4().hex
+        client = self.async_cache_manager.redis_client
+        if not client:
+            return token
+        try:
+            acquired = await client.set(f"{key}:lock", token, nx=True, ex=LOAD_LOCK_TIMEOUT)
+            return token if acquired else None
+        except RedisError as e:
+            logger.warning(f"Cache load lock failed for {key}: {e}")
+            return token
+    
+    async def _release_lock(self, key: str, token: str):
+        """Delete the lock only if this loader still owns it."""
+        client = self.async_cache_manager.redis_client
+        if not client:
+            return
+        lock_key = f"{key}:lock"
+        try:
+            async with client.pipeline(transaction=True) as pipeline:
+                await pipeline.watch(lock_key)
+                owner = await pipeline.get(lock_key)
+                if owner is not None and owner.decode() == token:
+                    pipeline.multi()
+                    pipeline.delete(lock_key)
+                    await pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Cache load lock release failed for {key}: {e}")
+    
+    async def drain(self):
+        """Wait for background refreshes to finish."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+
 class APICache:
     """API response caching system."""
     
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        async_cache_manager: Optional[AsyncCacheManager] = None,
+        loader: Optional[CacheLoader] = None
+    ):
         """Initialize API cache."""
         self.cache_manager = cache_manager
+        self.async_cache_manager = async_cache_manager or AsyncCacheManager(cache_manager)
+        self.loader = loader or CacheLoader(self.async_cache_manager)
     
-    def cache_response(self, ttl: int = API_CACHE_TTL):
-        """Decorator to cache API responses."""
+    def cache_response(self, ttl: int = API_CACHE_TTL, stale_ttl: int = 0):
+        """Decorator to cache API responses.
+        
+        Concurrent misses run the function once; with ``stale_ttl`` an expired
+        response keeps being served for that long while it is refreshed.
+        """
         def decorator(func):
             @wraps(func)
             async def wrapper(*args, **kwargs):
                 # Generate cache key from function name and arguments
                 cache_key = self._generate_cache_key(func.__name__, args, kwargs)
-                
-                # Try to get from cache
-                cached_response = self.cache_manager.get(cache_key)
-                if cached_response:
-                    logger.debug(f"Cache hit for {func.__name__}")
-                    return cached_response
-                
-                # Execute function and cache result
-                result = await func(*args, **kwargs)
-                self.cache_manager.set(cache_key, result, ttl)
-                
-                logger.debug(f"Cache miss for {func.__name__}, cached result")
-                return result
+                return await self.loader.get_or_load(
+                    cache_key, lambda: func(*args, **kwargs), ttl, stale_ttl
+                )
             
             return wrapper
         return decorator
@@ -237,9 +958,10 @@ class APICache:
 class SessionCache:
     """Session management with Redis."""
     
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(self, cache_manager: CacheManager, async_cache_manager: Optional[AsyncCacheManager] = None):
         """Initialize session cache."""
         self.cache_manager = cache_manager
+        self.async_cache_manager = async_cache_manager or AsyncCacheManager(cache_manager)
     
     def store_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
         """Store session data."""
@@ -260,80 +982,133 @@ class SessionCache:
         """Refresh session TTL."""
         key = self.cache_manager._get_cache_key('session', session_id)
         return self.cache_manager.expire(key, SESSION_CACHE_TTL)
+    
+    async def get_sessions(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several sessions in one round trip."""
+        keys = {self.cache_manager._get_cache_key('session', sid): sid for sid in session_ids}
+        found = await self.async_cache_manager.mget(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+    
+    async def store_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> bool:
+        """Store several sessions in one round trip."""
+        return await self.async_cache_manager.mset({
+            self.cache_manager._get_cache_key('session', sid): data
+            for sid, data in sessions.items()
+        }, SESSION_CACHE_TTL)
 
 
 class AgentCache:
     """Agent-specific caching system."""
     
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(self, cache_manager: CacheManager, async_cache_manager: Optional[AsyncCacheManager] = None):
         """Initialize agent cache."""
         self.cache_manager = cache_manager
+        self.async_cache_manager = async_cache_manager or AsyncCacheManager(cache_manager)
     
     def cache_agent_result(self, agent_id: str, task_id: str, result: Any) -> bool:
         """Cache agent execution result."""
         key = self.cache_manager._get_cache_key('agent_result', f"{agent_id}:{task_id}")
-        return self.cache_manager.set(key, result, AGENT_CACHE_TTL)
+        return self.cache_manager.set(key, result, AGENT_CACHE_TTL, tags=[f"agent:{agent_id}"])
     
     def get_agent_result(self, agent_id: str, task_id: str) -> Optional[Any]:
         """Get cached agent result."""
         key = self.cache_manager._get_cache_key('agent_result', f"{agent_id}:{task_id}")
-        return self.cache_manager.get(key)
+        return unwrap_cached_value(self.cache_manager.get(key))
     
     def cache_agent_context(self, agent_id: str, context: Dict[str, Any]) -> bool:
         """Cache agent context for reuse."""
         key = self.cache_manager._get_cache_key('agent_context', agent_id)
-        return self.cache_manager.set(key, context, AGENT_CACHE_TTL)
+        return self.cache_manager.set(key, context, AGENT_CACHE_TTL, tags=[f"agent:{agent_id}"])
     
     def get_agent_context(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get cached agent context."""
         key = self.cache_manager._get_cache_key('agent_context', agent_id)
         return self.cache_manager.get(key)
     
+    async def get_agent_results(self, agent_id: str, task_ids: List[str]) -> Dict[str, Any]:
+        """Get cached results for several tasks in one round trip."""
+        keys = {
+            self.cache_manager._get_cache_key('agent_result', f"{agent_id}:{task_id}"): task_id
+            for task_id in task_ids
+        }
+        found = await self.async_cache_manager.mget(list(keys))
+        return {keys[key]: unwrap_cached_value(value) for key, value in found.items()}
+    
+    async def cache_agent_results(self, agent_id: str, results: Dict[str, Any]) -> bool:
+        """Cache results for several tasks in one round trip."""
+        return await self.async_cache_manager.mset({
+            self.cache_manager._get_cache_key('agent_result', f"{agent_id}:{task_id}"): result
+            for task_id, result in results.items()
+        }, AGENT_CACHE_TTL, tags=[f"agent:{agent_id}"])
+    
     def invalidate_agent_cache(self, agent_id: str) -> int:
         """Invalidate all cache entries for an agent."""
-        pattern = f"autopilot:agent_*:{agent_id}*"
-        return self.cache_manager.clear_pattern(pattern)
+        removed = self.cache_manager.invalidate_tags(f"agent:{agent_id}").removed
+        if self.cache_manager.legacy_keys_may_exist(AGENT_CACHE_TTL):
+            removed += self.cache_manager.delete(self.cache_manager._get_cache_key('agent_context', agent_id))
+            removed += self.cache_manager.invalidate_pattern(
+                self.cache_manager._get_cache_key('agent_result', f"{agent_id}:*")
+            ).removed
+        return removed
 
 
 class StartupCache:
     """Startup-specific caching system."""
     
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(self, cache_manager: CacheManager, async_cache_manager: Optional[AsyncCacheManager] = None):
         """Initialize startup cache."""
         self.cache_manager = cache_manager
+        self.async_cache_manager = async_cache_manager or AsyncCacheManager(cache_manager)
     
     def cache_startup_data(self, startup_id: str, data: Dict[str, Any]) -> bool:
         """Cache startup data."""
         key = self.cache_manager._get_cache_key('startup', startup_id)
-        return self.cache_manager.set(key, data, DEFAULT_CACHE_TTL)
+        return self.cache_manager.set(key, data, DEFAULT_CACHE_TTL, tags=[f"startup:{startup_id}"])
     
     def get_startup_data(self, startup_id: str) -> Optional[Dict[str, Any]]:
         """Get cached startup data."""
         key = self.cache_manager._get_cache_key('startup', startup_id)
-        return self.cache_manager.get(key)
+        return unwrap_cached_value(self.cache_manager.get(key))
     
     def cache_startup_metrics(self, startup_id: str, metrics: Dict[str, Any]) -> bool:
         """Cache startup metrics."""
         key = self.cache_manager._get_cache_key('startup_metrics', startup_id)
-        return self.cache_manager.set(key, metrics, DEFAULT_CACHE_TTL)
+        return self.cache_manager.set(key, metrics, DEFAULT_CACHE_TTL, tags=[f"startup:{startup_id}"])
     
     def get_startup_metrics(self, startup_id: str) -> Optional[Dict[str, Any]]:
         """Get cached startup metrics."""
         key = self.cache_manager._get_cache_key('startup_metrics', startup_id)
         return self.cache_manager.get(key)
     
+    async def get_startup_bundle(self, startup_id: str) -> Dict[str, Any]:
+        """Get startup data and metrics in one round trip."""
+        data_key = self.cache_manager._get_cache_key('startup', startup_id)
+        metrics_key = self.cache_manager._get_cache_key('startup_metrics', startup_id)
+        found = await self.async_cache_manager.mget([data_key, metrics_key])
+        return {'data': unwrap_cached_value(found.get(data_key)), 'metrics': found.get(metrics_key)}
+    
+    async def get_startups_data(self, startup_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get data for several startups in one round trip."""
+        keys = {self.cache_manager._get_cache_key('startup', sid): sid for sid in startup_ids}
+        found = await self.async_cache_manager.mget(list(keys))
+        return {keys[key]: unwrap_cached_value(value) for key, value in found.items()}
+    
     def invalidate_startup_cache(self, startup_id: str) -> int:
         """Invalidate all cache entries for a startup."""
-        pattern = f"autopilot:startup*:{startup_id}*"
-        return self.cache_manager.clear_pattern(pattern)
+        removed = self.cache_manager.invalidate_tags(f"startup:{startup_id}").removed
+        if self.cache_manager.legacy_keys_may_exist(DEFAULT_CACHE_TTL):
+            for prefix in ('startup', 'startup_metrics'):
+                removed += self.cache_manager.delete(self.cache_manager._get_cache_key(prefix, startup_id))
+        return removed
 
 
 class PerformanceCache:
     """Performance optimization caching."""
     
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(self, cache_manager: CacheManager, async_cache_manager: Optional[AsyncCacheManager] = None):
         """Initialize performance cache."""
         self.cache_manager = cache_manager
+        self.async_cache_manager = async_cache_manager or AsyncCacheManager(cache_manager)
     
     def cache_api_response(self, endpoint: str, params: Dict[str, Any], response: Any) -> bool:
         """Cache API response."""
@@ -362,6 +1137,19 @@ class PerformanceCache:
         key = self.cache_manager._get_cache_key('db_query', query_hash)
         return self.cache_manager.get(key)
     
+    async def get_cached_queries(self, query_hashes: List[str]) -> Dict[str, Any]:
+        """Get several cached query results in one round trip."""
+        keys = {self.cache_manager._get_cache_key('db_query', qh): qh for qh in query_hashes}
+        found = await self.async_cache_manager.mget(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+    
+    async def cache_database_queries(self, results: Dict[str, Any]) -> bool:
+        """Cache several query results in one round trip."""
+        return await self.async_cache_manager.mset({
+            self.cache_manager._get_cache_key('db_query', qh): result
+            for qh, result in results.items()
+        }, DEFAULT_CACHE_TTL)
+    
     def cache_external_api(self, api_name: str, params: Dict[str, Any], response: Any) -> bool:
         """Cache external API responses."""
         params_str = json.dumps(params, sort_keys=True)
@@ -382,35 +1170,32 @@ class PerformanceCache:
 # Global cache manager instance
 cache_manager = CacheManager()
 
+async_cache_manager = AsyncCacheManager(cache_manager)
+
 # Specialized cache instances
-api_cache = APICache(cache_manager)
-session_cache = SessionCache(cache_manager)
-agent_cache = AgentCache(cache_manager)
-startup_cache = StartupCache(cache_manager)
-performance_cache = PerformanceCache(cache_manager)
+cache_loader = CacheLoader(async_cache_manager)
+api_cache = APICache(cache_manager, async_cache_manager, cache_loader)
+session_cache = SessionCache(cache_manager, async_cache_manager)
+agent_cache = AgentCache(cache_manager, async_cache_manager)
+startup_cache = StartupCache(cache_manager, async_cache_manager)
+performance_cache = PerformanceCache(cache_manager, async_cache_manager)
 
 
 # Cache decorators for easy use
-def cache_api_response(ttl: int = API_CACHE_TTL):
+def cache_api_response(ttl: int = API_CACHE_TTL, stale_ttl: int = 0):
     """Decorator to cache API responses."""
-    return api_cache.cache_response(ttl)
+    return api_cache.cache_response(ttl, stale_ttl)
 
 
-def cache_agent_result(agent_id: str, task_id: str):
+def cache_agent_result(agent_id: str, task_id: str, stale_ttl: int = 0):
     """Decorator to cache agent results."""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Try to get from cache first
-            cached_result = agent_cache.get_agent_result(agent_id, task_id)
-            if cached_result:
-                return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            agent_cache.cache_agent_result(agent_id, task_id, result)
-            
-            return result
+            key = cache_manager._get_cache_key('agent_result', f"{agent_id}:{task_id}")
+            return await cache_loader.get_or_load(
+                key, lambda: func(*args, **kwargs), AGENT_CACHE_TTL, stale_ttl, tags=[f"agent:{agent_id}"]
+            )
         return wrapper
     return decorator
 
@@ -420,16 +1205,10 @@ def cache_startup_data(startup_id: str):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Try to get from cache first
-            cached_data = startup_cache.get_startup_data(startup_id)
-            if cached_data:
-                return cached_data
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            startup_cache.cache_startup_data(startup_id, result)
-            
-            return result
+            key = cache_manager._get_cache_key('startup', startup_id)
+            return await cache_loader.get_or_load(
+                key, lambda: func(*args, **kwargs), DEFAULT_CACHE_TTL, tags=[f"startup:{startup_id}"]
+            )
         return wrapper
     return decorator
 
@@ -443,7 +1222,9 @@ def clear_all_caches() -> Dict[str, int]:
         "autopilot:agent_*:*",
         "autopilot:startup*:*",
         "autopilot:db_query:*",
-        "autopilot:external_api:*"
+        "autopilot:external_api:*",
+        "autopilot:llm_response:*",
+        "autopilot:tag:*"
     ]
     
     results = {}
@@ -460,6 +1241,9 @@ def get_cache_stats() -> Dict[str, Any]:
     
     return {
         'redis': redis_stats,
+        'tiers': cache_manager.get_tier_stats(),
+        'codec': cache_manager.codec.get_stats(),
+        'loader': dict(cache_loader.stats),
         'cache_types': {
             'api_cache': 'API response caching',
             'session_cache': 'User session management',
@@ -0,0 +1,1845 @@
+"""Performance-path tests for AutoPilot Ventures platform."""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+
+from cryptography.fernet import Fernet
+
+import utils
+from utils import SecurityUtils
+
+
+@pytest.fixture
+def security():
+    """Security utils with an empty content safety cache."""
+    utils._content_safety_cache.clear()
+    yield SecurityUtils(Fernet.generate_key().decode())
+    utils._content_safety_cache.clear()
+
+
+class TestContentSafety:
+    """Test shared, cached content safety scoring."""
+
+    def test_batch_uses_single_model_pass(self, security):
+        """Test batch scoring calls the model once for all misses."""
+        model = Mock()
+        model.predict.side_effect = lambda texts: {
+            label: [0.1] * len(texts) for label in utils.CONTENT_SAFETY_LABELS
+        }
+
+        with patch.object(utils, 'get_detoxify_model', return_value=model):
+            results = security.check_content_safety_batch(['a', 'b', 'a'])
+            assert len(results) == 3
+            assert model.predict.call_count == 1
+            assert model.predict.call_args[0][0] == ['a', 'b']
+
+            security.check_content_safety('b')
+            assert model.predict.call_count == 1
+
+    def test_fallback_results_are_not_cached(self, security):
+        """Test keyword fallback results are not cached, so the model rescores them once it recovers."""
+        model = Mock()
+        model.predict.side_effect = RuntimeError("CUDA out of memory")
+
+        with patch.object(utils, 'get_detoxify_model', return_value=model):
+            fallback = security.check_content_safety("hate and violence")
+        assert fallback['toxicity'] > 0
+        assert len(utils._content_safety_cache) == 0
+
+        model.predict.side_effect = lambda texts: {
+            label: [0.9] * len(texts) for label in utils.CONTENT_SAFETY_LABELS
+        }
+        with patch.object(utils, 'get_detoxify_model', return_value=model):
+            recovered = security.check_content_safety("hate and violence")
+            assert security.check_content_safety("hate and violence") == recovered
+
+        assert recovered['threat'] == pytest.approx(0.9)
+        assert model.predict.call_count == 2
+
+
+class TestLLMExecutionPool:
+    """Test the shared LLM execution pool."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompts_are_coalesced(self):
+        """Test concurrent identical prompts share one LLM call."""
+        from llm_pool import LLMExecutionPool
+        import time
+
+        llm = Mock()
+        llm.model_name = 'gpt-4'
+        llm.temperature = 0.7
+
+        def slow_invoke(messages):
+            time.sleep(0.05)
+            return Mock(content='answer')
+
+        llm.invoke.side_effect = slow_invoke
+        pool = LLMExecutionPool(max_workers=2)
+        messages = [Mock(type='human', content='same prompt')]
+
+        results = await asyncio.gather(*[pool.invoke(llm, messages) for _ in range(5)])
+
+        assert all(r.content == 'answer' for r in results)
+        assert llm.invoke.call_count == 1
+        assert pool.get_stats()['coalesced'] == 4
+        await pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_priority_lanes(self):
+        """Test higher priority requests are dispatched first."""
+        from llm_pool import LLMExecutionPool, LLMPriority
+
+        order = []
+        llm = Mock()
+        llm.model_name = 'gpt-4'
+        llm.invoke.side_effect = lambda messages: order.append(messages[0].content)
+
+        pool = LLMExecutionPool(max_workers=1)
+        pool._ensure_started()
+        tasks = [
+            asyncio.create_task(pool.invoke(llm, [Mock(type='human', content='low')], LLMPriority.LOW)),
+            asyncio.create_task(pool.invoke(llm, [Mock(type='human', content='high')], LLMPriority.HIGH)),
+        ]
+        await asyncio.gather(*tasks)
+
+        assert order == ['high', 'low']
+        await pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_model_does_not_block_others(self):
+        """Test requests for a model out of tokens wait aside while other models keep the workers."""
+        from llm_pool import LLMExecutionPool
+
+        def make_llm(model_name):
+            llm = Mock()
+            llm.model_name = model_name
+            llm.max_tokens = 100
+            llm.invoke.side_effect = lambda messages: Mock(content=f"{model_name}: {messages[0].content}")
+            return llm
+
+        gpt4, gpt35 = make_llm('gpt-4'), make_llm('gpt-3.5-turbo')
+        pool = LLMExecutionPool(max_workers=2, model_tokens_per_minute={'gpt-4': 100})
+        pool._ensure_started()
+
+        throttled = [
+            asyncio.create_task(pool.invoke(gpt4, [Mock(type='human', content=f"report {i}")]))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.05)
+        answer = await asyncio.wait_for(pool.invoke(gpt35, [Mock(type='human', content='summary')]), 1.0)
+
+        assert answer.content == 'gpt-3.5-turbo: summary'
+        assert gpt4.invoke.call_count == 1
+        stats = pool.get_stats()
+        assert stats['parked'] == 3 and stats['rate_limited'] >= 3
+
+        await pool.shutdown()
+        results = await asyncio.gather(*throttled, return_exceptions=True)
+        assert sum(isinstance(result, asyncio.CancelledError) for result in results) == 3
+
+    @pytest.mark.asyncio
+    async def test_parked_requests_run_when_budget_refills(self):
+        """Test parked requests are requeued in priority order once their bucket can pay."""
+        from llm_pool import LLMExecutionPool, LLMPriority
+
+        order = []
+        llm = Mock()
+        llm.model_name = 'gpt-4'
+        llm.max_tokens = 0
+        llm.invoke.side_effect = lambda messages: order.append(messages[0].content.strip())
+
+        def prompt(text):
+            # 40 characters are estimated at 10 tokens
+            return [Mock(type='human', content=text.ljust(40))]
+
+        # 600 tokens per minute refill one 10-token request every second
+        pool = LLMExecutionPool(max_workers=1, model_tokens_per_minute={'gpt-4': 600})
+        pool._get_bucket('gpt-4').tokens = 10
+        pool._ensure_started()
+        first = asyncio.create_task(pool.invoke(llm, prompt('first')))
+        await asyncio.sleep(0.01)
+        tasks = [
+            asyncio.create_task(pool.invoke(llm, prompt('low'), LLMPriority.LOW)),
+            asyncio.create_task(pool.invoke(llm, prompt('high'), LLMPriority.HIGH)),
+        ]
+        await asyncio.wait_for(asyncio.gather(first, *tasks), 5.0)
+
+        assert order == ['first', 'high', 'low']
+        assert pool.get_stats()['parked'] == 0
+        await pool.shutdown()
+
+
+class TestLLMResponseCache:
+    """Test the two-tier LLM response cache."""
+
+    def test_normalized_prompt_hits_l1(self):
+        """Test whitespace differences map to the same cache entry."""
+        from llm_response_cache import LLMResponseCache
+
+        cache = LLMResponseCache()
+        first = [Mock(type='human', content='Analyze   niche:\n  pets')]
+        second = [Mock(type='human', content='Analyze niche: pets')]
+
+        assert cache.get('gpt-4', 0.7, first, 'niche_research') is None
+        cache.set('gpt-4', 0.7, first, 'analysis', 'niche_research')
+
+        assert cache.get('gpt-4', 0.7, second, 'niche_research') == 'analysis'
+        assert cache.get('gpt-4', 0.2, second, 'niche_research') is None
+        assert cache.get_stats()['l1_hits'] == 1
+
+    def test_l2_backfills_l1(self):
+        """Test L2 hits are promoted into L1."""
+        from llm_response_cache import LLMResponseCache
+
+        store = {}
+        l2 = Mock()
+        l2.set.side_effect = lambda key, value, ttl: store.__setitem__(key, value)
+        l2.get.side_effect = lambda key: store.get(key)
+        messages = [Mock(type='human', content='prompt')]
+
+        LLMResponseCache(l2_cache=l2).set('gpt-4', 0.7, messages, 'answer')
+        cache = LLMResponseCache(l2_cache=l2)
+
+        assert cache.get('gpt-4', 0.7, messages) == 'answer'
+        assert cache.get('gpt-4', 0.7, messages) == 'answer'
+        assert cache.stats['l2_hits'] == 1
+        assert cache.stats['l1_hits'] == 1
+
+    def test_async_lookups_use_async_l2(self):
+        """Test aget/aset reach L2 through the async client."""
+        from unittest.mock import AsyncMock
+        from llm_response_cache import LLMResponseCache
+
+        store = {}
+        async_l2 = AsyncMock()
+        async_l2.set.side_effect = lambda key, value, ttl: store.__setitem__(key, value)
+        async_l2.get.side_effect = lambda key: store.get(key)
+        sync_l2 = Mock()
+        messages = [Mock(type='human', content='prompt')]
+
+        async def run():
+            await LLMResponseCache(l2_cache=sync_l2, async_l2_cache=async_l2).aset('gpt-4', 0.7, messages, 'answer')
+            cache = LLMResponseCache(l2_cache=sync_l2, async_l2_cache=async_l2)
+            return await cache.aget('gpt-4', 0.7, messages), cache.stats
+
+        content, stats = asyncio.run(run())
+        assert content == 'answer' and stats['l2_hits'] == 1
+        assert not sync_l2.get.called and not sync_l2.set.called
+
+    def test_near_duplicate_lookup(self):
+        """Test opt-in near-duplicate lookup."""
+        from llm_response_cache import LLMResponseCache
+
+        cache = LLMResponseCache(enable_near_duplicate=True, near_duplicate_threshold=0.8)
+        base = 'analyze the niche market for ai powered pet care startup opportunities today'
+        cache.set('gpt-4', 0.7, [Mock(type='human', content=base)], 'analysis')
+
+        similar = [Mock(type='human', content=base + ' now')]
+        assert cache.get('gpt-4', 0.7, similar) == 'analysis'
+        assert cache.stats['near_hits'] == 1
+
+    def test_hits_and_misses_are_exported(self):
+        """Test lookups increment the Prometheus counter per agent type and outcome."""
+        from prometheus_client import REGISTRY
+        from llm_response_cache import LLMResponseCache
+
+        def count(outcome):
+            return REGISTRY.get_sample_value(
+                'llm_response_cache_lookups_total',
+                {'agent_type': 'metrics_probe', 'outcome': outcome}
+            ) or 0.0
+
+        cache = LLMResponseCache()
+        messages = [Mock(type='human', content='prompt')]
+        misses, hits = count('misses'), count('l1_hits')
+
+        assert cache.get('gpt-4', 0.7, messages, 'metrics_probe') is None
+        cache.set('gpt-4', 0.7, messages, 'answer', 'metrics_probe')
+        assert cache.get('gpt-4', 0.7, messages, 'metrics_probe') == 'answer'
+
+        assert count('misses') == misses + 1
+        assert count('l1_hits') == hits + 1
+
+
+class TestAgentStatsAccumulator:
+    """Test batched agent stats persistence."""
+
+    def test_flush_applies_deltas(self, tmp_path):
+        """Test accumulated stats are merged into stored totals."""
+        from database import DatabaseManager
+        from agent_stats import AgentStatsAccumulator
+
+        db = DatabaseManager(f"sqlite:///{tmp_path / 'stats.db'}")
+        startup = db.create_startup("Stats Startup")
+        agent = db.create_agent(startup.id, 'analytics')
+        other = db.create_agent(startup.id, 'content_creation')
+        accumulator = AgentStatsAccumulator(db)
+
+        accumulator.record(agent.id, True)
+        accumulator.record(agent.id, False)
+        assert accumulator.flush() == 1
+
+        accumulator.record(agent.id, True)
+        accumulator.record(agent.id, True)
+        accumulator.flush()
+
+        agents = {a.id: a for a in db.get_agents_by_startup(startup.id)}
+        assert agents[agent.id].execution_count == 4
+        assert agents[agent.id].success_rate == pytest.approx(0.75)
+        assert agents[agent.id].last_execution is not None
+        assert agents[other.id].execution_count == 0
+        assert accumulator.pending_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self):
+        """Test stop() performs a final flush."""
+        from agent_stats import AgentStatsAccumulator
+
+        db = Mock()
+        db.apply_agent_stats.return_value = 1
+        accumulator = AgentStatsAccumulator(db, flush_interval=60)
+        accumulator.record('agent_1', True)
+
+        await accumulator.stop()
+
+        batch = db.apply_agent_stats.call_args[0][0]
+        assert batch[0]['agent_id'] == 'agent_1'
+        assert batch[0]['executions'] == 1
+
+
+class TestAsyncDatabaseManager:
+    """Test the async database layer."""
+
+    def test_async_url_rewrite(self):
+        """Test sync URLs are mapped to asyncio drivers."""
+        from database_async import to_async_url
+
+        assert to_async_url('sqlite:///app.db') == 'sqlite+aiosqlite:///app.db'
+        assert to_async_url('postgresql://u:p@h/db') == 'postgresql+asyncpg://u:p@h/db'
+
+    @pytest.mark.asyncio
+    async def test_crud_roundtrip(self, tmp_path):
+        """Test async CRUD mirrors the sync manager."""
+        from database_async import AsyncDatabaseManager
+
+        db = AsyncDatabaseManager(f"sqlite:///{tmp_path / 'async.db'}", pool_size=2, max_overflow=2)
+        await db.initialize()
+
+        startup = await db.create_startup("Async Startup", niche="ai")
+        agent = await db.create_agent(startup.id, 'analytics')
+        await db.create_task(startup.id, 'research')
+        await db.create_metric(startup.id, 'revenue', 10.0)
+
+        await db.apply_agent_stats([{
+            'agent_id': agent.id, 'executions': 2, 'successes': 1, 'last_execution': None
+        }])
+        updated = await db.update_startup(startup.id, {'status': 'paused'})
+
+        stats = await db.get_database_stats()
+        agents = await db.get_agents_by_startup(startup.id)
+
+        assert updated.status == 'paused'
+        assert stats['startups'] == 1 and stats['tasks'] == 1 and stats['metrics'] == 1
+        assert agents[0].execution_count == 2
+        assert agents[0].success_rate == pytest.approx(0.5)
+        assert db.get_pool_status()['pool_class']
+
+        agent_ids = await db.create_agents_bulk([
+            {'startup_id': startup.id, 'agent_type': agent_type, 'metadata': {'shared': True}}
+            for agent_type in ('marketing', 'legal')
+        ])
+        agents = await db.get_agents_by_startup(startup.id)
+        assert len(set(agent_ids)) == 2 and len(agents) == 3
+        assert {a.agent_type for a in agents if a.id in agent_ids} == {'marketing', 'legal'}
+        assert await db.create_agents_bulk([]) == []
+        await db.dispose()
+
+
+class TestBulkWrites:
+    """Test bulk inserts and the write-behind buffer."""
+
+    def test_bulk_insert(self, tmp_path):
+        """Test bulk task and metric creation."""
+        from database import DatabaseManager
+
+        db = DatabaseManager(f"sqlite:///{tmp_path / 'bulk.db'}")
+        startup = db.create_startup("Bulk Startup")
+
+        metric_ids = db.create_metrics_bulk([
+            {'startup_id': startup.id, 'metric_type': 'revenue', 'value': float(i)}
+            for i in range(250)
+        ])
+        task_ids = db.create_tasks_bulk([
+            {'startup_id': startup.id, 'task_type': 'research', 'priority': 2}
+            for _ in range(10)
+        ])
+
+        assert len(set(metric_ids)) == 250
+        assert len(task_ids) == 10
+        assert len(db.get_metrics_by_startup(startup.id, 'revenue')) == 250
+        assert db.get_tasks_by_startup(startup.id)[0].priority == 2
+
+    def test_write_buffer_flushes_on_size(self):
+        """Test the buffer groups rows by table and flushes at the size threshold."""
+        from write_buffer import WriteBehindBuffer
+        import threading
+
+        flushed = []
+        done = threading.Event()
+
+        def insert_rows(table, rows):
+            flushed.append((table, len(rows)))
+            done.set()
+            return len(rows)
+
+        buffer = WriteBehindBuffer(insert_rows, max_batch_size=5, flush_interval=60)
+        buffer.add_many('metrics', [{'n': i} for i in range(5)])
+
+        assert done.wait(5)
+        assert flushed == [('metrics', 5)]
+
+        buffer.add('tasks', {'n': 1})
+        buffer.close()
+        assert ('tasks', 1) in flushed
+        assert buffer.stats['rows_written'] == 6
+
+    def test_write_buffer_isolates_bad_row(self):
+        """Test one failing row is dropped without blocking the good rows after it."""
+        from write_buffer import WriteBehindBuffer
+
+        inserts = []
+
+        def insert_rows(table, rows):
+            if any(row['n'] == 'bad' for row in rows):
+                raise ValueError("constraint failed")
+            inserts.append([row['n'] for row in rows])
+            return len(rows)
+
+        buffer = WriteBehindBuffer(insert_rows, max_batch_size=2, flush_interval=60, max_attempts=2)
+        buffer._ensure_thread = lambda: None
+        buffer.add_many('metrics', [{'n': n} for n in (1, 'bad', 2, 3)])
+
+        assert buffer.flush() == 0
+        assert buffer.pending() == {'metrics': 4}
+        assert buffer.flush() == 3
+        assert inserts == [[1], [2, 3]]
+        assert buffer.pending() == {}
+        assert buffer.stats['dropped'] == 1
+
+    def test_write_buffer_keeps_rows_through_an_outage(self):
+        """Test connection errors back off and keep every row instead of dropping them."""
+        from sqlalchemy.exc import OperationalError
+        from write_buffer import WriteBehindBuffer
+
+        inserts = []
+        outage = {'on': True}
+
+        def insert_rows(table, rows):
+            if outage['on']:
+                raise OperationalError("INSERT", {}, Exception("connection refused"))
+            inserts.append([row['n'] for row in rows])
+            return len(rows)
+
+        buffer = WriteBehindBuffer(insert_rows, max_batch_size=2, flush_interval=60, max_attempts=2)
+        buffer._ensure_thread = lambda: None
+        buffer.add_many('metrics', [{'n': n} for n in range(5)])
+
+        for _ in range(4):
+            assert buffer.flush() == 0
+        assert buffer.pending() == {'metrics': 5}
+        assert buffer.stats['dropped'] == 0 and buffer.stats['retries'] == 4
+
+        # The background loop skips a table that is still backing off
+        outage['on'] = False
+        assert buffer._flush(respect_backoff=True) == 0
+        assert buffer.flush() == 5
+        assert inserts == [[0, 1], [2, 3], [4]]
+        assert buffer.pending() == {}
+
+    def test_buffered_metrics_reach_database(self, tmp_path):
+        """Test buffered rows are written by flush_writes."""
+        from database import DatabaseManager
+
+        db = DatabaseManager(f"sqlite:///{tmp_path / 'buffer.db'}")
+        startup = db.create_startup("Buffered Startup")
+        for i in range(3):
+            db.buffer_metric(startup.id, 'latency', float(i))
+
+        db.flush_writes()
+        assert len(db.get_metrics_by_startup(startup.id)) == 3
+        db.write_buffer.close()
+
+    def test_async_buffer_drops_batch_that_keeps_failing(self):
+        """Test a permanently failing batch is dropped instead of blocking producers."""
+        from write_buffer import AsyncBatchBuffer
+
+        async def run():
+            attempts = []
+
+            async def flush_batch(items):
+                attempts.append(list(items))
+                raise ValueError("duplicate id")
+
+            buffer = AsyncBatchBuffer(
+                flush_batch, name='failing', max_batch_size=2, flush_interval=0.01,
+                max_pending=2, max_attempts=2
+            )
+            await asyncio.wait_for(buffer.put_many(list(range(6))), 5)
+            await buffer.close()
+            return attempts, buffer
+
+        attempts, buffer = asyncio.run(run())
+        assert buffer.pending() == 0
+        assert buffer.stats['dropped'] == 6 and buffer.stats['items_written'] == 0
+        assert attempts[:2] == [[0, 1], [0, 1]]
+
+    def test_async_buffer_retries_through_an_outage(self):
+        """Test a batch failing with connection errors is kept and written once the store is back."""
+        from write_buffer import AsyncBatchBuffer
+
+        async def run():
+            written = []
+            failures = {'left': 5}
+
+            async def flush_batch(items):
+                if failures['left']:
+                    failures['left'] -= 1
+                    raise ConnectionError("store unreachable")
+                written.extend(items)
+
+            buffer = AsyncBatchBuffer(
+                flush_batch, name='outage', max_batch_size=2, flush_interval=60, max_attempts=2
+            )
+            await buffer.put_many(list(range(4)))
+            for _ in range(5):
+                assert await buffer.flush() == 0
+            assert buffer.pending() == 4
+            assert await buffer.flush() == 4
+            await buffer.close()
+            return written, buffer
+
+        written, buffer = asyncio.run(run())
+        assert written == [0, 1, 2, 3]
+        assert buffer.stats['dropped'] == 0 and buffer.stats['retries'] == 5
+
+
+class TestCleanup:
+    """Test chunked set-based retention cleanup."""
+
+    def test_cleanup_deletes_in_chunks_and_keeps_recent(self, tmp_path):
+        """Test old rows are removed across several chunks and recent rows survive."""
+        from datetime import datetime, timedelta
+        from database import DatabaseManager
+
+        db = DatabaseManager(f"sqlite:///{tmp_path / 'cleanup.db'}")
+        startup = db.create_startup("Cleanup Startup")
+        old = datetime.utcnow() - timedelta(days=60)
+        db.create_metrics_bulk([
+            {'startup_id': startup.id, 'metric_type': 'cpu', 'value': float(i), 'timestamp': old}
+            for i in range(25)
+        ])
+        db.create_metric(startup.id, 'cpu', 1.0)
+
+        deleted = db.cleanup_old_data(days=30, batch_size=10, pause=0)
+
+        assert deleted == 25
+        assert len(db.get_metrics_by_startup(startup.id)) == 1
+
+
+class TestMemoryIndex:
+    """Test inverted-index memory search."""
+
+    def test_search_scores_only_candidates(self, tmp_path, monkeypatch):
+        """Test indexed search returns the same top match as a full scan."""
+        from datetime import datetime
+        monkeypatch.chdir(tmp_path)
+        from phase1_autonomous_integration import SimpleVectorMemory, Memory, AgentType
+
+        memory = SimpleVectorMemory(str(tmp_path / 'memory.db'))
+        memory.add_memories_sync([
+            Memory(f"m{i}", AgentType.NICHE_RESEARCHER, f"action {i}", f"context topic{i}",
+                   "ok", 0.5, datetime.utcnow(), 0.5)
+            for i in range(50)
+        ])
+        asyncio.run(memory.add_memory(Memory(
+            "target", AgentType.MVP_DESIGNER, "design saas prototype", "fitness niche",
+            "launched", 0.9, datetime.utcnow(), 0.9
+        )))
+
+        results = asyncio.run(memory.search_similar_memories("saas prototype for fitness", limit=3))
+        assert results[0]["id"] == "target"
+        assert results[0]["similarity"] == memory._calculate_similarity(
+            "saas prototype for fitness", "design saas prototype fitness niche launched"
+        )
+        assert len(results) == 3
+
+        filtered = asyncio.run(memory.search_similar_memories(
+            "saas prototype", agent_type=AgentType.NICHE_RESEARCHER, limit=5
+        ))
+        assert all(r["agent_type"] == "niche_researcher" for r in filtered)
+
+        reopened = SimpleVectorMemory(str(tmp_path / 'memory.db'))
+        assert reopened.search_similar_memories_sync("topic7")[0]["id"] == "m7"
+
+
+class TestVectorMemoryEmbeddings:
+    """Test local embeddings for the Chroma vector memory."""
+
+    def test_embeddings_are_cached_and_meaningful(self, tmp_path, monkeypatch):
+        """Test retrieval ranks the related memory first and embeddings are cached."""
+        from datetime import datetime
+        monkeypatch.chdir(tmp_path)
+        from config import config
+        monkeypatch.setattr(config.vector_memory, 'chroma_path', str(tmp_path / 'chroma'))
+        from autonomous_enhancements import VectorMemoryManager, Memory, AgentType
+        from embeddings import EmbeddingService, EmbeddingCache, HashingEmbeddingBackend
+
+        service = EmbeddingService(HashingEmbeddingBackend(256), EmbeddingCache(str(tmp_path / 'emb.db')))
+        memory = VectorMemoryManager("perf_test", embedding_service=service)
+        assert memory.collection.metadata["embedding_dimension"] == 256
+
+        topics = {
+            "m1": ("research fitness market", "gym owners need scheduling software"),
+            "m2": ("write blog copy", "seo articles about cooking recipes"),
+            "m3": ("prepare investor pitch", "seed round funding deck"),
+        }
+        for memory_id, (action, context) in topics.items():
+            asyncio.run(memory.add_memory(Memory(
+                memory_id, AgentType.NICHE_RESEARCHER, action, context, "done",
+                0.8, datetime.utcnow(), 0.5
+            )))
+        asyncio.run(memory.store_workflow_memory("wf1", {"niche": "fitness"}, "2026-01-01"))
+
+        results = asyncio.run(memory.search_similar_memories("funding pitch for investors", limit=3))
+        assert results[0]["id"] == "m3"
+        assert all(r["metadata"]["kind"] == "memory" for r in results)
+        assert asyncio.run(memory.search_similar_workflows("fitness"))[0]["id"] == "workflow_wf1"
+
+        computed = service.stats['computed']
+        service.embed_batch(["funding pitch for investors", "funding pitch for investors"])
+        assert service.stats['computed'] == computed
+
+    def test_single_writes_run_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Test add_memory and store_workflow_memory embed and write in a worker thread."""
+        import threading
+        from datetime import datetime
+        monkeypatch.chdir(tmp_path)
+        from config import config
+        monkeypatch.setattr(config.vector_memory, 'chroma_path', str(tmp_path / 'chroma'))
+        from autonomous_enhancements import VectorMemoryManager, Memory, AgentType
+        from embeddings import EmbeddingService, EmbeddingCache, HashingEmbeddingBackend
+
+        service = EmbeddingService(HashingEmbeddingBackend(64), EmbeddingCache(str(tmp_path / 'emb.db')))
+        memory = VectorMemoryManager("off_loop_test", embedding_service=service)
+        add_records = memory._add_records
+        threads = []
+
+        def recording_add(records):
+            threads.append(threading.current_thread())
+            return add_records(records)
+
+        monkeypatch.setattr(memory, '_add_records', recording_add)
+
+        async def run():
+            assert await memory.add_memory(Memory(
+                "m1", AgentType.NICHE_RESEARCHER, "research", "pets", "done", 0.8, datetime.utcnow(), 0.5
+            ))
+            assert await memory.store_workflow_memory("wf1", {"niche": "pets"}, "2026-01-01")
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(run())
+        assert len(threads) == 2 and loop_thread not in threads
+        assert memory.collection.count() == 2
+
+    def test_buffered_results_are_coalesced(self, tmp_path, monkeypatch):
+        """Test buffered records are written in batches and backpressure applies."""
+        monkeypatch.chdir(tmp_path)
+        from config import config
+        monkeypatch.setattr(config.vector_memory, 'chroma_path', str(tmp_path / 'chroma'))
+        from autonomous_enhancements import VectorMemoryManager
+        from embeddings import EmbeddingService, HashingEmbeddingBackend
+
+        memory = VectorMemoryManager("perf_buffer", embedding_service=EmbeddingService(HashingEmbeddingBackend(64)))
+        memory.write_buffer.max_batch_size = 10
+        memory.write_buffer.max_pending = 10
+        memory.write_buffer.flush_interval = 60
+        adds = []
+        original_add = memory.collection.add
+        monkeypatch.setattr(memory.collection, 'add', lambda **kw: adds.append(len(kw['ids'])) or original_add(**kw))
+
+        async def run():
+            for i in range(25):
+                await memory.store_agent_result("analytics", {"step": i}, {"ok": True}, True)
+            await memory.close()
+
+        asyncio.run(run())
+        assert sum(adds) == 25
+        assert max(adds) == 10 and len(adds) <= 4
+        assert memory.write_buffer.stats['backpressure_waits'] > 0
+        assert memory.collection.count() == 25
+
+
+class TestTwoTierCache:
+    """Test the L1 + Redis L2 cache manager."""
+
+    def test_local_tier_serves_without_redis(self):
+        """Test the local tier works as a fallback and evicts by size."""
+        from redis_cache import CacheManager, LocalCache
+
+        with patch.object(CacheManager, '_initialize_redis', lambda self: None):
+            manager = CacheManager(local_cache=LocalCache(max_entries=100, max_bytes=40))
+        assert manager.set('k1', {'a': 1}, ttl=60)
+        assert manager.get('k1') == {'a': 1}
+        manager.set('k2', {'b': 'x' * 20}, ttl=60)
+        manager.set('k3', {'c': 'y' * 20}, ttl=60)
+        assert manager.get('k1') is None
+        assert manager.get_tier_stats()['l1_evictions'] >= 1
+
+    def test_invalidation_reaches_other_workers(self):
+        """Test a write in one worker drops the stale L1 entry in another."""
+        import time
+        import fakeredis
+        from redis_cache import CacheManager
+
+        server = fakeredis.FakeServer()
+        worker_a = CacheManager(fakeredis.FakeRedis(server=server, decode_responses=False))
+        worker_b = CacheManager(fakeredis.FakeRedis(server=server, decode_responses=False))
+        try:
+            worker_a.set('autopilot:test:key', {'v': 1})
+            assert worker_b.get('autopilot:test:key') == {'v': 1}
+            assert worker_b.get('autopilot:test:key') == {'v': 1}
+            assert worker_b.stats['l2_hits'] == 1 and worker_b.stats['l1_hits'] == 1
+
+            worker_a.set('autopilot:test:key', {'v': 2})
+            deadline = time.time() + 5
+            while worker_b.stats['invalidations_received'] == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert worker_b.get('autopilot:test:key') == {'v': 2}
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+    def test_async_manager_batches_domain_cache_reads(self):
+        """Test async mset/mget round-trips values for the domain caches."""
+        import fakeredis
+        import fakeredis.aioredis
+        from redis_cache import CacheManager, AsyncCacheManager, AgentCache
+
+        server = fakeredis.FakeServer()
+        manager = CacheManager(fakeredis.FakeRedis(server=server, decode_responses=False))
+        async_manager = AsyncCacheManager(
+            manager, fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+        )
+        agents = AgentCache(manager, async_manager)
+
+        async def run():
+            await agents.cache_agent_results('agent_1', {'t1': {'score': 1}, 't2': [1, 2]})
+            manager.local_cache.clear()
+            found = await agents.get_agent_results('agent_1', ['t1', 't2', 'missing'])
+            await async_manager.close()
+            return found
+
+        try:
+            assert asyncio.run(run()) == {'t1': {'score': 1}, 't2': [1, 2]}
+            assert manager.stats['l2_hits'] == 2 and manager.stats['l2_misses'] == 1
+            assert manager.get(manager._get_cache_key('agent_result', 'agent_1:t1')) == {'score': 1}
+        finally:
+            manager.close()
+
+    def test_codec_round_trips_types_and_compresses(self):
+        """Test encoded values keep their types, large ones shrink, legacy ones still load."""
+        import json
+        import fakeredis
+        from dataclasses import dataclass
+        from pydantic import BaseModel
+        from cache_codec import CacheCodec, register_cache_type
+        from redis_cache import CacheManager, CACHE_ENTRY_MARKER
+
+        @register_cache_type
+        @dataclass
+        class Result:
+            score: float
+            tags: list
+
+        @register_cache_type
+        class Outcome(BaseModel):
+            success: bool
+            data: dict
+
+        client = fakeredis.FakeRedis(decode_responses=False)
+        manager = CacheManager(client, codec=CacheCodec(serializer='json', compression='zlib'))
+        try:
+            for key, value in [('n', 42), ('f', 0.5), ('s', 'text'), ('b', False), ('l', [1, 'a'])]:
+                manager.set(f"autopilot:t:{key}", value)
+                manager.local_cache.clear()
+                assert manager.get(f"autopilot:t:{key}") == value
+            manager.set("autopilot:t:dc", Result(0.9, ['x']))
+            manager.local_cache.clear()
+            restored = manager.get("autopilot:t:dc")
+            assert isinstance(restored, Result) and restored == Result(0.9, ['x'])
+
+            # Nested in a loader entry, as cache_response stores it
+            manager.set("autopilot:t:model", {CACHE_ENTRY_MARKER: 1, 'value': Outcome(success=True, data={'k': 1})})
+            manager.local_cache.clear()
+            restored = manager.get("autopilot:t:model")['value']
+            assert isinstance(restored, Outcome) and restored.data == {'k': 1}
+
+            large = {'content': 'marketing copy ' * 500}
+            manager.set("autopilot:t:large", large)
+            stored = client.get("autopilot:t:large")
+            assert CacheCodec.is_encoded(stored) and len(stored) < len(json.dumps(large)) / 10
+            manager.local_cache.clear()
+            assert manager.get("autopilot:t:large") == large
+
+            client.set("autopilot:t:legacy", json.dumps({'old': True}))
+            assert manager.get("autopilot:t:legacy") == {'old': True}
+        finally:
+            manager.close()
+
+    def test_loader_single_flight_and_stale_while_revalidate(self):
+        """Test concurrent misses compute once, falsy results are cached and stale values are served."""
+        import time
+        import fakeredis
+        import fakeredis.aioredis
+        import redis_cache
+        from redis_cache import CacheManager, AsyncCacheManager, APICache
+
+        server = fakeredis.FakeServer()
+        manager = CacheManager(fakeredis.FakeRedis(server=server, decode_responses=False))
+        async_manager = AsyncCacheManager(
+            manager, fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+        )
+        api = APICache(manager, async_manager)
+        calls = []
+
+        @api.cache_response(ttl=60)
+        async def search(query):
+            calls.append(query)
+            await asyncio.sleep(0.05)
+            return []
+
+        @api.cache_response(ttl=60, stale_ttl=60)
+        async def report(version):
+            calls.append(version)
+            return {'version': len(calls)}
+
+        async def run():
+            results = await asyncio.gather(*(search('q') for _ in range(10)))
+            assert results == [[]] * 10 and calls == ['q']
+            assert await search('q') == [] and calls == ['q']
+            assert api.loader.stats['coalesced'] == 9
+
+            # Another worker holds the lock: wait for its result instead of computing
+            key = api._generate_cache_key('search', ('other',), {})
+            await async_manager.redis_client.set(f"{key}:lock", 'worker-b')
+            waiting = asyncio.create_task(search('other'))
+            await asyncio.sleep(0.1)
+            await api.loader.async_cache_manager.set(key, {
+                redis_cache.CACHE_ENTRY_MARKER: 1, 'value': ['from b'],
+                'fresh_until': time.time() + 60, 'delta': 0.0
+            })
+            assert await waiting == ['from b'] and 'other' not in calls
+
+            assert await report(1) == {'version': 2}
+            key = api._generate_cache_key('report', (1,), {})
+            entry = await async_manager.get(key)
+            entry['fresh_until'] = time.time() - 1
+            await async_manager.set(key, entry)
+            assert await report(1) == {'version': 2}
+            await api.loader.drain()
+            assert await report(1) == {'version': 3}
+            assert api.loader.stats['stale_served'] == 1
+            await async_manager.close()
+
+        try:
+            asyncio.run(run())
+        finally:
+            manager.close()
+
+    def test_scan_and_tag_invalidation(self):
+        """Test pattern invalidation scans in chunks and tag invalidation is exact."""
+        import fakeredis
+        import redis_cache
+        from redis_cache import AgentCache, CacheManager, StartupCache
+
+        manager = CacheManager(fakeredis.FakeRedis(decode_responses=False))
+        startups = StartupCache(manager)
+        try:
+            with patch.object(redis_cache, 'SCAN_BATCH_SIZE', 7):
+                for i in range(30):
+                    manager.set(f"autopilot:api:item{i}", i)
+                result = manager.invalidate_pattern("autopilot:api:*")
+            assert result.removed == 30 and result.method == 'scan'
+            assert manager.get("autopilot:api:item3") is None
+
+            startups.cache_startup_data('s1', {'name': 'one'})
+            startups.cache_startup_metrics('s1', {'mrr': 10})
+            startups.cache_startup_data('s10', {'name': 'ten'})
+            assert startups.invalidate_startup_cache('s1') == 2
+            assert startups.get_startup_metrics('s1') is None
+            assert startups.get_startup_data('s10') == {'name': 'ten'}
+
+            # Entries cached before tagging existed are still removed by key
+            manager.set("autopilot:startup_metrics:s2", {'mrr': 20})
+            manager.set("autopilot:agent_result:a1:t1", {'ok': True})
+            assert startups.invalidate_startup_cache('s2') == 1
+            assert AgentCache(manager).invalidate_agent_cache('a1') == 1
+            assert manager.get("autopilot:agent_result:a1:t1") is None
+        finally:
+            manager.close()
+
+    def test_tag_invalidation_stops_scanning_once_legacy_entries_expired(self):
+        """Test agent invalidation issues no SCAN once untagged entries can no longer exist."""
+        import time
+        import fakeredis
+        import redis_cache
+        from redis_cache import AgentCache, CacheManager
+
+        client = fakeredis.FakeRedis(decode_responses=False)
+        client.set(redis_cache.TAG_INDEX_SINCE_KEY, time.time() - redis_cache.AGENT_CACHE_TTL - 1)
+        manager = CacheManager(client)
+        agents = AgentCache(manager)
+        try:
+            manager.set("autopilot:agent_result:a1:t1", {'ok': True}, tags=['agent:a1'])
+            with patch.object(client, 'scan_iter', wraps=client.scan_iter) as scan_iter:
+                assert agents.invalidate_agent_cache('a1') == 1
+            scan_iter.assert_not_called()
+            assert manager.get("autopilot:agent_result:a1:t1") is None
+        finally:
+            manager.close()
+
+
+class TestMessageBusDispatch:
+    """Test priority dispatch and subscriber delivery on the message bus."""
+
+    def test_critical_messages_skip_queued_broadcasts(self, monkeypatch):
+        """Test a critical alert is delivered ahead of a backlog of data shares."""
+        from config import config
+        from agent_message_bus import AgentMessageBus, MessageType, MessagePriority
+
+        monkeypatch.setattr(config.message_bus, 'max_concurrent_processing', 2)
+
+        async def run():
+            bus = AgentMessageBus('startup_test')
+            bus.register_agent('planner', 'strategy')
+            received = []
+
+            async def on_message(message):
+                received.append(message.priority)
+
+            bus.subscribe('planner', on_message, inbox_size=1000)
+            for i in range(500):
+                await bus.broadcast_message('analyst', MessageType.DATA_SHARE, {'data_key': f"k{i}"})
+            await bus.send_message(
+                'monitor', ['strategy'], MessageType.CONFLICT_ALERT,
+                {'conflict_type': 'unknown'}, priority=MessagePriority.CRITICAL
+            )
+            await bus.start()
+            await bus.drain()
+            status = bus.get_bus_status()
+            await bus.stop()
+            return received, status
+
+        received, status = asyncio.run(run())
+        assert received[0] == MessagePriority.CRITICAL
+        assert len(received) == 501
+        assert status['processed'] == 501 and status['inboxes']['planner']['delivered'] == 501
+
+    def test_full_inbox_applies_backpressure_then_drops(self, monkeypatch):
+        """Test a stalled subscriber loses messages without blocking others."""
+        from config import config
+        from agent_message_bus import AgentMessageBus, MessageType
+
+        monkeypatch.setattr(config.message_bus, 'delivery_timeout', 0.01)
+
+        async def run():
+            bus = AgentMessageBus('startup_test')
+            stalled = asyncio.Event()
+            fast = []
+            bus.subscribe('slow', lambda message: stalled.wait(), inbox_size=2)
+            bus.subscribe('fast', fast.append)
+            await bus.start()
+            for i in range(10):
+                await bus.send_message('a', ['slow', 'fast'], MessageType.STATUS_UPDATE, {'i': i})
+            await bus.message_queue.join()
+            await asyncio.sleep(0.05)
+            status = bus.get_bus_status()
+            await bus.stop()
+            return fast, status
+
+        fast, status = asyncio.run(run())
+        assert len(fast) == 10
+        assert status['inboxes']['slow']['dropped'] >= 7
+
+    def test_history_is_bounded_and_expired_entries_are_swept(self, monkeypatch):
+        """Test the history ring, pending-response retention and TTL sweeping."""
+        from datetime import datetime, timedelta
+        from config import config
+        from agent_message_bus import AgentMessageBus, MessageType
+
+        monkeypatch.setattr(config.message_bus, 'max_message_history', 50)
+
+        async def run():
+            bus = AgentMessageBus('startup_test')
+            question = await bus.send_message(
+                'a', ['b'], MessageType.DECISION_REQUEST, {'q': 1}, requires_response=True
+            )
+            for i in range(200):
+                await bus.send_message('a', ['b'], MessageType.STATUS_UPDATE, {'i': i})
+            bus.set_shared_context('short', {'v': 1}, ttl=1)
+            bus.set_shared_context('long', {'v': 2}, ttl=3600)
+
+            status = bus.get_bus_status()
+            assert status['history_messages'] == 50 and status['evicted_messages'] == 150
+            assert bus.get_message(question) is not None
+
+            await bus.send_message('b', ['a'], MessageType.DECISION_RESPONSE, {}, response_to=question)
+            assert bus.get_message(question) is None and bus.stats['answered'] == 1
+
+            removed = bus.sweep_expired(datetime.utcnow() + timedelta(seconds=2))
+            assert removed == 1 and bus.get_shared_context('long') is not None
+            assert 'startup_test_short' not in bus.shared_context
+            bus.sweep_expired(datetime.utcnow() + timedelta(seconds=400))
+            assert bus.get_bus_status()['total_messages'] == 0
+
+        asyncio.run(run())
+
+    def test_redis_streams_transport_shares_traffic_between_buses(self):
+        """Test two buses on one Redis resolve a conflict once and reclaim abandoned entries."""
+        import fakeredis
+        import fakeredis.aioredis
+        from agent_message_bus import (
+            AgentMessageBus, RedisStreamsTransport, MessageType, MessagePriority, encode_message,
+            AgentMessage
+        )
+        from datetime import datetime
+
+        server = fakeredis.FakeServer()
+
+        def transport(name):
+            return RedisStreamsTransport(
+                fakeredis.aioredis.FakeRedis(server=server, decode_responses=False),
+                consumer_name=name, block_ms=20, claim_idle_ms=100
+            )
+
+        async def wait_for(condition):
+            for _ in range(200):
+                if condition():
+                    return
+                await asyncio.sleep(0.01)
+
+        async def run():
+            worker_a = AgentMessageBus('startup_test', transport('worker_a'))
+            worker_b = AgentMessageBus('startup_test', transport('worker_b'))
+            worker_a.register_agent('analyst_1', 'analyst')
+            worker_b.register_agent('planner_1', 'strategy')
+            received = []
+            worker_b.subscribe('planner_1', lambda message: received.append(message.message_type))
+
+            # An entry worker_b's previous run read for its strategy group and never acknowledged
+            raw = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+            stream = worker_b.transport.streams[MessagePriority.LOW]
+            await raw.xgroup_create(stream, 'strategy:worker_b', id='0', mkstream=True)
+            await raw.xadd(stream, {'data': encode_message(AgentMessage(
+                id='orphan', sender='x', recipients=['strategy'], message_type=MessageType.STATUS_UPDATE,
+                priority=MessagePriority.LOW, content={}, timestamp=datetime.utcnow()
+            ))})
+            await raw.xreadgroup('strategy:worker_b', 'crashed', {stream: '>'}, count=10)
+            await asyncio.sleep(0.15)
+
+            await worker_a.start()
+            await worker_b.start()
+            await worker_a.send_message(
+                'analyst_1', ['strategy'], MessageType.CONFLICT_ALERT,
+                {'conflict_type': 'budget_conflict', 'conflict_data': {'total_budget': 10, 'requests': []}},
+                priority=MessagePriority.CRITICAL
+            )
+            await wait_for(lambda: len(received) >= 3)
+            await asyncio.sleep(0.1)
+            published = worker_a.transport.stats['published'] + worker_b.transport.stats['published']
+            reclaimed = worker_b.transport.stats['reclaimed']
+            await worker_a.stop()
+            await worker_b.stop()
+            pending = await raw.xpending(
+                worker_b.transport.streams[MessagePriority.CRITICAL], 'strategy:worker_b'
+            )
+            await raw.aclose()
+            return received, published, reclaimed, pending['pending']
+
+        received, published, reclaimed, pending = asyncio.run(run())
+        assert sorted(t.value for t in received) == ['conflict_alert', 'decision_response', 'status_update']
+        assert published == 2  # the alert and exactly one resolution
+        assert reclaimed >= 1
+        assert pending == 0
+
+    def test_redis_streams_delivers_to_every_process_with_the_type(self):
+        """Test agents of one type in different processes each get their messages."""
+        import fakeredis
+        import fakeredis.aioredis
+        from agent_message_bus import AgentMessageBus, RedisStreamsTransport, MessageType
+
+        server = fakeredis.FakeServer()
+
+        def bus(name):
+            return AgentMessageBus('startup_test', RedisStreamsTransport(
+                fakeredis.aioredis.FakeRedis(server=server, decode_responses=False),
+                consumer_name=name, block_ms=20
+            ))
+
+        async def run():
+            buses = [bus('worker_b'), bus('worker_c')]
+            received = {}
+            for i, worker in enumerate(buses, start=1):
+                agent_id = f"planner_{i}"
+                worker.register_agent(agent_id, 'strategy')
+                worker.subscribe(agent_id, lambda message, agent_id=agent_id: received.setdefault(
+                    agent_id, []
+                ).append(message.content['n']))
+                await worker.start()
+            await buses[0].send_message('analyst', ['planner_2'], MessageType.STATUS_UPDATE, {'n': 1})
+            await buses[0].send_message('analyst', ['strategy'], MessageType.STATUS_UPDATE, {'n': 2})
+            for _ in range(200):
+                if len(received.get('planner_2', [])) == 2 and received.get('planner_1'):
+                    break
+                await asyncio.sleep(0.01)
+            for worker in buses:
+                await worker.stop()
+            return received
+
+        received = asyncio.run(run())
+        assert sorted(received['planner_2']) == [1, 2]
+        assert received['planner_1'] == [2]
+
+    def test_redis_streams_shares_data_with_every_process(self):
+        """Test shared data and handlers apply in every process, not one."""
+        import fakeredis
+        import fakeredis.aioredis
+        from agent_message_bus import AgentMessageBus, RedisStreamsTransport, MessageType
+
+        server = fakeredis.FakeServer()
+
+        def bus(name):
+            return AgentMessageBus('startup_test', RedisStreamsTransport(
+                fakeredis.aioredis.FakeRedis(server=server, decode_responses=False),
+                consumer_name=name, block_ms=20
+            ))
+
+        async def run():
+            buses = [bus('worker_a'), bus('worker_b')]
+            handled = []
+            for worker in buses:
+                worker.add_message_handler(
+                    MessageType.DATA_SHARE,
+                    lambda message, worker=worker: handled.append(worker.transport.consumer_name)
+                )
+                await worker.start()
+            await buses[0].send_message(
+                'analyst', ['y'], MessageType.DATA_SHARE,
+                {'data_key': 'market', 'data_value': {'size': 10}}
+            )
+            for _ in range(200):
+                if all(worker.get_shared_context('market') for worker in buses):
+                    break
+                await asyncio.sleep(0.01)
+            contexts = [worker.get_shared_context('market') for worker in buses]
+            for worker in buses:
+                await worker.stop()
+            return contexts, handled
+
+        contexts, handled = asyncio.run(run())
+        assert [context.data for context in contexts] == [{'size': 10}, {'size': 10}]
+        assert sorted(handled) == ['worker_a', 'worker_b']
+
+    def test_redis_streams_drops_ephemeral_groups_on_stop(self, monkeypatch):
+        """Test unnamed consumers clean up their groups and named ones keep them."""
+        import fakeredis
+        import fakeredis.aioredis
+        from config import config
+        from agent_message_bus import AgentMessageBus, RedisStreamsTransport, MessagePriority
+
+        monkeypatch.setattr(config.message_bus, 'consumer_name', '')
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=False)
+
+        async def groups_after_stop(consumer_name):
+            bus = AgentMessageBus('startup_test', RedisStreamsTransport(
+                redis_client, consumer_name=consumer_name, block_ms=20
+            ))
+            bus.register_agent('planner_1', 'strategy')
+            await bus.start()
+            await bus.stop()
+            groups = await redis_client.xinfo_groups(bus.transport.streams[MessagePriority.NORMAL])
+            return sorted(group['name'].decode() for group in groups)
+
+        async def run():
+            ephemeral = await groups_after_stop(None)
+            stable = await groups_after_stop('worker_a')
+            return ephemeral, stable
+
+        ephemeral, stable = asyncio.run(run())
+        assert ephemeral == ['bus']
+        assert stable == ['bus', 'local:worker_a', 'strategy:worker_a']
+
+
+class TestReinforcementLearningReplay:
+    """Test the replay buffer and incremental Q-learning."""
+
+    def test_ring_buffer_and_incremental_learning(self, monkeypatch):
+        """Test episodes are bounded per agent type and each is learned once."""
+        import fakeredis
+        from config import config
+        from adaptive_reinforcement_learning import (
+            AdaptiveReinforcementLearning, AgentAction, AgentType, NumpyQTable
+        )
+
+        monkeypatch.setattr(config.reinforcement_learning, 'replay_capacity', 20)
+        monkeypatch.setattr(config.reinforcement_learning, 'q_table_backend', 'numpy')
+        rl = AdaptiveReinforcementLearning(fakeredis.FakeRedis())
+        q_table = rl.agents[AgentType.ANALYTICS]
+        assert isinstance(q_table, NumpyQTable)
+
+        updates = []
+        original = q_table.update_batch
+        monkeypatch.setattr(q_table, 'update_batch', lambda *a: (updates.append(len(a[0])), original(*a)))
+
+        async def run():
+            for i in range(50):
+                await rl.record_episode(
+                    AgentType.ANALYTICS, {'stage': i % 3},
+                    AgentAction(AgentType.ANALYTICS, 'exploit', {}, {}, language='en'),
+                    1.0, {'stage': (i + 1) % 3}, False, {}
+                )
+
+        asyncio.run(run())
+        assert len(rl.replay_buffers[AgentType.ANALYTICS]) == 20
+        assert rl.total_episodes == 50 and len(rl.episodes) == 20
+        assert sum(updates) == 50 and len(updates) == 41  # first batch of 10, then one per episode
+        assert q_table.get_state_value('stage:0') > 0
+        q_table.epsilon = 0
+        assert q_table.get_action('stage:0', rl._get_available_actions(AgentType.ANALYTICS)) == 'exploit:en'
+
+    def test_numpy_table_matches_dict_table(self):
+        """Test single updates give the same values as the dict-based table."""
+        from adaptive_reinforcement_learning import SimpleQTable, NumpyQTable
+
+        actions = ['a', 'b', 'c']
+        simple, dense = SimpleQTable(), NumpyQTable(actions=actions)
+        transitions = [('s0', 'a', 1.0, 's1'), ('s1', 'b', 0.5, 's0'), ('s0', 'a', -0.2, 's2')] * 5
+        for state, action, reward, next_state in transitions:
+            simple.update(state, action, reward, next_state, actions)
+            dense.update(state, action, reward, next_state, actions)
+        for state in ('s0', 's1'):
+            assert dense.get_state_value(state) == pytest.approx(simple.get_state_value(state))
+
+
+class TestEpisodeSink:
+    """Test batched episode persistence and warm start."""
+
+    def test_redis_sink_batches_and_warm_starts(self):
+        """Test episodes land in one sorted set per type and reload on restart."""
+        import fakeredis
+        from adaptive_reinforcement_learning import AdaptiveReinforcementLearning, AgentAction, AgentType
+        from episode_sink import EpisodeSink, RedisEpisodeStore
+
+        client = fakeredis.FakeRedis(decode_responses=False)
+        rl = AdaptiveReinforcementLearning(
+            client, EpisodeSink(RedisEpisodeStore(client, max_per_type=15, retention_days=1), flush_interval=60)
+        )
+
+        async def record():
+            for i in range(20):
+                await rl.record_episode(
+                    AgentType.ANALYTICS, {'stage': i % 3},
+                    AgentAction(AgentType.ANALYTICS, 'exploit', {}, {}, language='en'),
+                    1.0, {'stage': (i + 1) % 3}, False, {}
+                )
+
+        asyncio.run(record())
+        assert rl.episode_sink.get_stats()['pending'] == 20
+        assert not client.exists('rl_episodes:analytics')
+        rl.close()
+        assert client.zcard('rl_episodes:analytics') == 15
+        assert client.ttl('rl_episodes:analytics') > 0
+        assert rl.episode_sink.get_stats()['written'] == 20
+
+        restarted = AdaptiveReinforcementLearning(
+            client, EpisodeSink(RedisEpisodeStore(client, max_per_type=15, retention_days=1))
+        )
+        assert asyncio.run(restarted.warm_start()) == 15
+        episodes, _ = restarted.replay_buffers[AgentType.ANALYTICS].since(0)
+        assert len(episodes) == 15
+        assert episodes[0].action.agent_type is AgentType.ANALYTICS
+        assert restarted.agents[AgentType.ANALYTICS].get_state_value('stage:0') > 0
+        restarted.close()
+
+    def test_file_sink_drops_when_full(self, tmp_path):
+        """Test the file fallback round-trips and counts dropped episodes."""
+        from adaptive_reinforcement_learning import AgentAction, AgentType, LearningEpisode
+        from episode_sink import create_episode_sink
+
+        sink = create_episode_sink(
+            'redis', None, path=str(tmp_path / 'episodes.jsonl'),
+            max_batch_size=100, flush_interval=60, max_buffered=5
+        )
+        for i in range(8):
+            sink.record(LearningEpisode(
+                f'ep{i}', AgentType.LEGAL_COMPLIANCE, {'i': i},
+                AgentAction(AgentType.LEGAL_COMPLIANCE, 'explore', {}, {}), 0.5, {}, False, {}
+            ))
+        stats = sink.get_stats()
+        assert stats['store'] == 'FileEpisodeStore'
+        assert stats['dropped'] == 3 and stats['pending'] == 5 and stats['lag_seconds'] >= 0
+        sink.close()
+        loaded = sink.load(['legal_compliance'], limit=10)['legal_compliance']
+        assert [episode['episode_id'] for episode in loaded] == ['ep3', 'ep4', 'ep5', 'ep6', 'ep7']
+
+    def test_file_compaction_keeps_concurrent_appends(self, tmp_path, monkeypatch):
+        """Test a batch appended while load compacts the file is not overwritten."""
+        import json
+        import os
+        import threading
+        import episode_sink
+        from adaptive_reinforcement_learning import AgentAction, AgentType, LearningEpisode
+        from episode_sink import FileEpisodeStore
+
+        def row(i):
+            episode = LearningEpisode(
+                f'ep{i}', AgentType.ANALYTICS, {'i': i},
+                AgentAction(AgentType.ANALYTICS, 'explore', {}, {}), 0.5, {}, False, {}
+            )
+            return {'agent_type': 'analytics', 'episode': episode}
+
+        store = FileEpisodeStore(str(tmp_path / 'episodes.jsonl'))
+        store.write([row(i) for i in range(4)])
+        writer = threading.Thread(target=store.write, args=([row(4)],))
+        real_replace = os.replace
+
+        def replace_during_append(src, dst):
+            writer.start()
+            writer.join(0.2)
+            assert writer.is_alive()  # the append waits for compaction
+            real_replace(src, dst)
+
+        monkeypatch.setattr(episode_sink.os, 'replace', replace_during_append)
+        assert len(store.load(['analytics'], limit=2)['analytics']) == 2
+        writer.join(5)
+
+        loaded = store.load(['analytics'], limit=10)['analytics']
+        assert [json.loads(encoded)['episode_id'] for encoded in loaded] == ['ep2', 'ep3', 'ep4']
+
+    def test_unreachable_redis_falls_back_to_file(self, tmp_path):
+        """Test a client whose server does not answer gets the file store."""
+        import redis
+        from episode_sink import create_episode_sink
+
+        client = redis.Redis(host='127.0.0.1', port=1, socket_connect_timeout=0.1)
+        sink = create_episode_sink('redis', client, path=str(tmp_path / 'episodes.jsonl'), flush_interval=60)
+        assert sink.get_stats()['store'] == 'FileEpisodeStore'
+        sink.close()
+
+
+class TestWorkflowScheduler:
+    """Test dependency-aware workflow step scheduling."""
+
+    def _step(self, name, dependencies=(), **kwargs):
+        from types import SimpleNamespace
+        options = {'priority': 1, 'timeout': 5, 'retry_count': 0, 'required': True}
+        options.update(kwargs)
+        return SimpleNamespace(agent_type=name, dependencies=list(dependencies), **options)
+
+    def test_branches_run_in_parallel_with_upstream_results(self):
+        """Test a diamond finishes in critical-path time and passes results downstream."""
+        from workflow_scheduler import DAGScheduler
+
+        durations = {'research': 0.1, 'design': 0.2, 'marketing': 0.05, 'launch': 0.1}
+        steps = [
+            self._step('research'),
+            self._step('design', ['research']),
+            self._step('marketing', ['research']),
+            self._step('launch', ['design', 'marketing'])
+        ]
+        seen = {}
+
+        async def execute(step, upstream):
+            seen[step.agent_type] = dict(upstream)
+            await asyncio.sleep(durations[step.agent_type])
+            return f"{step.agent_type} done"
+
+        scheduler = DAGScheduler(steps, max_concurrent=3)
+        outcomes = asyncio.run(scheduler.run(execute))
+        stats = scheduler.get_stats()
+
+        assert all(outcome.success for outcome in outcomes.values())
+        assert seen['launch'] == {'design': 'design done', 'marketing': 'marketing done'}
+        assert outcomes['launch'].started_at >= outcomes['design'].finished_at
+        assert stats['critical_path'] == ['research', 'design', 'launch']
+        assert stats['makespan'] == pytest.approx(0.4, abs=0.08)
+        assert stats['makespan'] < sum(durations.values())
+
+    def test_retries_timeouts_and_failure_propagation(self):
+        """Test flaky steps are retried, and a failed required step skips its dependents."""
+        from workflow_scheduler import DAGScheduler
+
+        calls = {'flaky': 0}
+
+        async def execute(step, upstream):
+            if step.agent_type == 'flaky':
+                calls['flaky'] += 1
+                if calls['flaky'] < 3:
+                    raise RuntimeError('transient')
+            if step.agent_type in ('slow', 'optional'):
+                await asyncio.sleep(1)
+            return step.agent_type
+
+        steps = [
+            self._step('flaky', retry_count=3),
+            self._step('slow', timeout=0.05, retry_count=1),
+            self._step('after_slow', ['slow']),
+            self._step('optional', timeout=0.05, required=False),
+            self._step('after_optional', ['optional', 'flaky'])
+        ]
+        scheduler = DAGScheduler(steps, retry_backoff=0.01)
+        outcomes = asyncio.run(scheduler.run(execute))
+
+        assert outcomes['flaky'].success and outcomes['flaky'].attempts == 3
+        assert not outcomes['slow'].success and outcomes['slow'].attempts == 2
+        assert 'Timed out' in outcomes['slow'].error
+        assert outcomes['after_slow'].skipped
+        assert outcomes['after_optional'].success
+        assert scheduler.get_stats()['skipped'] == ['after_slow']
+
+        with pytest.raises(ValueError, match='cycle'):
+            DAGScheduler([self._step('a', ['b']), self._step('b', ['a'])])
+
+
+class TestBatchWorkflowRunner:
+    """Test running many startups over shared agents."""
+
+    def test_fair_global_budget_and_startup_attribution(self):
+        """Test a startup with many steps cannot starve the others and calls are attributed."""
+        from types import SimpleNamespace
+        from agents import NicheResearchAgent
+        from batch_runner import BatchWorkflowRunner
+
+        shared_agent = NicheResearchAgent()
+        assert shared_agent.startup_id is None and shared_agent.db_agent_id is None
+
+        def step(name):
+            return SimpleNamespace(
+                agent_type=name, dependencies=[], priority=1, timeout=5, retry_count=0, required=True
+            )
+
+        started, running, peak, agent_ids = [], [0], [0], {}
+
+        async def execute(context, workflow_step, upstream):
+            assert shared_agent.startup_id == context.startup_id
+            agent_ids.setdefault(context.startup_id, set()).add(
+                (workflow_step.agent_type, shared_agent.db_agent_id)
+            )
+            started.append(context.startup_id)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.02)
+            running[0] -= 1
+            return workflow_step.agent_type
+
+        runner = BatchWorkflowRunner(execute, max_concurrent=2, max_concurrent_per_startup=8)
+        workflows = {
+            'busy': [step(f"s{i}") for i in range(8)],
+            'quiet_a': [step('niche_research'), step('s1')],
+            'quiet_b': [step('niche_research'), step('s1')]
+        }
+        contexts = asyncio.run(runner.run(workflows))
+
+        assert peak[0] == 2
+        assert all(outcome.success for context in contexts.values() for outcome in context.outcomes.values())
+        # Round-robin grants: a FIFO semaphore would run all eight busy steps first
+        assert {'quiet_a', 'quiet_b'} <= set(started[:5])
+        assert started[:8].count('quiet_a') == 2 and started[:8].count('quiet_b') == 2
+        assert runner.get_stats()['startups'] == 3 and runner.get_stats()['slot_waits'] > 0
+        assert shared_agent.startup_id is None and shared_agent.db_agent_id is None
+        # Each startup's agent rows were registered up front; the shared agent keeps none
+        quiet_a, quiet_b = dict(agent_ids['quiet_a']), dict(agent_ids['quiet_b'])
+        assert quiet_a['niche_research'] and quiet_b['niche_research']
+        assert quiet_a['niche_research'] != quiet_b['niche_research']
+        assert all(agent_id is None for _, agent_id in agent_ids['busy'])
+
+
+class TestWorkflowCheckpoint:
+    """Test checkpointed, resumable workflow steps."""
+
+    def _step(self, name, dependencies=()):
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            agent_type=name, dependencies=list(dependencies), priority=1, timeout=5, retry_count=0, required=True
+        )
+
+    def test_resume_skips_finished_steps(self, tmp_path):
+        """Test a rerun only executes steps that had not finished, with restored upstream results."""
+        from workflow_checkpoint import SQLiteCheckpointStore, WorkflowCheckpointer
+        from workflow_scheduler import DAGScheduler, StepOutcome
+
+        checkpointer = WorkflowCheckpointer(SQLiteCheckpointStore(str(tmp_path / 'checkpoints.db')), flush_interval=60)
+        steps = [self._step('research'), self._step('design', ['research']), self._step('launch', ['design'])]
+        calls = []
+
+        async def crashing(step, upstream):
+            calls.append(step.agent_type)
+            if step.agent_type == 'launch':
+                raise RuntimeError('process died')
+            return {'output': f"{step.agent_type} v1", 'upstream': sorted(upstream)}
+
+        checkpointer.begin('wf1', 'startup_1', {'niche': 'tools'})
+        asyncio.run(DAGScheduler(steps).run(
+            crashing, on_outcome=lambda outcome: checkpointer.record_step('wf1', outcome)
+        ))
+        assert checkpointer.get_stats()['pending'] == 3  # nothing written on the step path
+        checkpointer.finish('wf1', 'failed')
+
+        checkpoint = checkpointer.load('wf1')
+        assert checkpoint['config'] == {'niche': 'tools'} and checkpoint['status'] == 'failed'
+        assert set(checkpoint['steps']) == {'research', 'design'}
+
+        completed = {
+            name: StepOutcome(name, True, result=stored['result'], restored=True)
+            for name, stored in checkpoint['steps'].items()
+        }
+        calls.clear()
+        seen = {}
+
+        async def resumed(step, upstream):
+            calls.append(step.agent_type)
+            seen.update(upstream)
+            return 'launched'
+
+        scheduler = DAGScheduler(steps)
+        outcomes = asyncio.run(scheduler.run(resumed, completed=completed))
+        assert calls == ['launch']
+        assert seen == {'design': {'output': 'design v1', 'upstream': ['research']}}
+        assert all(outcome.success for outcome in outcomes.values())
+        assert sorted(scheduler.get_stats()['restored']) == ['design', 'research']
+        checkpointer.close()
+
+    def test_sqlite_store_prunes_expired_workflows(self, tmp_path):
+        """Test workflows past the TTL are deleted with their steps on the write path."""
+        import time
+        from workflow_checkpoint import SQLiteCheckpointStore, STEP_TABLE, WORKFLOW_TABLE
+
+        store = SQLiteCheckpointStore(str(tmp_path / 'checkpoints.db'), ttl=3600, prune_interval=0)
+        store.write(STEP_TABLE, [
+            {'workflow_id': workflow_id, 'step': 'research', 'result': '{}', 'attempts': 1, 'duration': 1.0}
+            for workflow_id in ('old', 'new')
+        ])
+        store.write(WORKFLOW_TABLE, [
+            {'workflow_id': workflow_id, 'startup_id': 's1', 'config': '{}', 'status': 'completed',
+             'updated_at': updated_at}
+            for workflow_id, updated_at in (('old', time.time() - 7200), ('new', time.time()))
+        ])
+
+        assert store.load('old') is None
+        assert set(store.load('new')['steps']) == {'research'}
+        assert store._conn.execute('SELECT COUNT(*) FROM workflow_steps').fetchone()[0] == 1
+        store.close()
+
+    def test_redis_store_keeps_config_across_status_updates(self):
+        """Test the Redis backend stores steps and workflow fields in one hash."""
+        import fakeredis
+        from workflow_checkpoint import RedisCheckpointStore, WorkflowCheckpointer
+        from workflow_scheduler import StepOutcome
+
+        client = fakeredis.FakeRedis()
+        checkpointer = WorkflowCheckpointer(RedisCheckpointStore(client, ttl=60), flush_interval=60)
+        checkpointer.begin('wf2', 'startup_2', {'steps': []})
+        checkpointer.record_step('wf2', StepOutcome('research', True, result={'data': {'a': 1}}, attempts=2))
+        checkpointer.record_step('wf2', StepOutcome('design', False, error='boom'))
+        checkpointer.finish('wf2', 'completed')
+
+        checkpoint = checkpointer.load('wf2')
+        assert checkpoint['startup_id'] == 'startup_2' and checkpoint['config'] == {'steps': []}
+        assert checkpoint['status'] == 'completed'
+        assert checkpoint['steps'] == {'research': {'result': {'data': {'a': 1}}, 'attempts': 2, 'duration': 0.0}}
+        assert 0 < client.ttl('workflow_checkpoint:wf2') <= 60
+        assert checkpointer.load('missing') is None
+        checkpointer.close()
+
+
+class TestWorkflowHistory:
+    """Test the bounded workflow history and result archive."""
+
+    def test_bounded_summaries_with_full_aggregates(self, tmp_path):
+        """Test only recent compact summaries are kept while totals cover every workflow."""
+        from types import SimpleNamespace
+        from workflow_history import WorkflowHistory, WorkflowResultArchive
+
+        archive = WorkflowResultArchive(str(tmp_path / 'results.db'), flush_interval=60)
+        history = WorkflowHistory(max_entries=3, archive=archive)
+        for i in range(10):
+            history.record(SimpleNamespace(
+                workflow_id=f"wf{i}", startup_id='s1', success=i % 2 == 0,
+                steps_completed=['a'] * (i % 2 + 1), steps_failed=['b'],
+                total_cost=0.5, execution_time=2.0, timestamp=f"t{i}",
+                results={'a': {'analysis': 'x' * 1000}}
+            ))
+
+        assert [summary['workflow_id'] for summary in history] == ['wf7', 'wf8', 'wf9']
+        assert 'results' not in history.get('wf9')
+        assert history.get('wf0') is None
+        stats = history.get_stats()
+        assert stats['workflows'] == 10 and stats['retained'] == 3
+        assert stats['total_cost'] == pytest.approx(5.0) and stats['success_rate'] == 0.5
+        assert history.average_success_rate == pytest.approx((5 * 0.5 + 5 * 2 / 3) / 10)
+        assert history.last_timestamp == 't9'
+
+        archived = history.load_full('wf0')
+        assert archived['results']['a']['analysis'] == 'x' * 1000
+        archive.close()
+
+
+class StubAgent:
+    """Agent recording its calls and returning a fixed AgentResult."""
+
+    def __init__(self, agent_type, fail=False, delay=0.01):
+        self.agent_type = agent_type
+        self.fail = fail
+        self.delay = delay
+        self.calls = []
+
+    async def execute(self, **params):
+        from agents import AgentResult
+        self.calls.append(params)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.agent_type} crashed")
+        return AgentResult(
+            success=True, data={'analysis': f"{self.agent_type} output"}, message='ok', cost=0.1
+        )
+
+
+class TestEnhancedOrchestratorWorkflows:
+    """Test EnhancedAgentOrchestrator workflow paths with stub agents."""
+
+    @pytest.fixture
+    def make_orchestrator(self, tmp_path, monkeypatch):
+        """Build orchestrators without __init__, which wraps every agent in SelfTuningAgent."""
+        from unittest.mock import AsyncMock
+        import autonomous_enhancements
+        # orchestrator_enhanced imports a factory that autonomous_enhancements does not define
+        monkeypatch.setattr(autonomous_enhancements, 'get_autonomous_workflow_engine', Mock(), raising=False)
+        from orchestrator_enhanced import EnhancedAgentOrchestrator
+        from workflow_checkpoint import SQLiteCheckpointStore, WorkflowCheckpointer
+        from workflow_history import WorkflowHistory
+
+        checkpointer = WorkflowCheckpointer(SQLiteCheckpointStore(str(tmp_path / 'checkpoints.db')), flush_interval=60)
+
+        def make(agents, startup_id='startup_1'):
+            orchestrator = EnhancedAgentOrchestrator.__new__(EnhancedAgentOrchestrator)
+            orchestrator.startup_id = startup_id
+            orchestrator.agents = {agent.agent_type: agent for agent in agents}
+            orchestrator.autonomy_level = 0.75
+            orchestrator.step_duration_estimates = {}
+            orchestrator.checkpointer = checkpointer
+            orchestrator.execution_history = WorkflowHistory(10)
+            orchestrator.vector_memory = AsyncMock()
+            orchestrator.vector_memory.search_similar_workflows.return_value = []
+            orchestrator.rl_engine = AsyncMock()
+            return orchestrator
+
+        yield make
+        checkpointer.close()
+
+    @staticmethod
+    def _workflow(*agent_types):
+        """A linear workflow over the agent types."""
+        return {'steps': [
+            {'agent_type': agent_type, 'dependencies': list(agent_types[index - 1:index]), 'retry_count': 0}
+            for index, agent_type in enumerate(agent_types)
+        ]}
+
+    def test_batch_runs_are_checkpointed_and_remembered_per_startup(self, make_orchestrator, monkeypatch):
+        """Test each startup's batch workflow is resumable and its memory is stored under its own id."""
+        from unittest.mock import AsyncMock
+        import orchestrator_enhanced
+
+        memories = {}
+
+        def memory_for(startup_id):
+            memories[startup_id] = AsyncMock()
+            return memories[startup_id]
+
+        monkeypatch.setattr(orchestrator_enhanced, 'VectorMemoryManager', memory_for)
+        orchestrator = make_orchestrator([StubAgent('niche_research'), StubAgent('mvp_design')], 'batch')
+        results = asyncio.run(orchestrator.execute_batch_workflows(
+            ['s1', 's2'], self._workflow('niche_research', 'mvp_design')
+        ))
+
+        assert set(memories) == {'s1', 's2'}
+        orchestrator.vector_memory.store_workflow_memory.assert_not_called()
+        for startup_id, result in results.items():
+            assert result.success and result.startup_id == startup_id
+            stored = memories[startup_id].store_workflow_memory.call_args.kwargs
+            assert stored['workflow_id'] == result.workflow_id
+            memories[startup_id].close.assert_awaited_once()
+
+            checkpoint = orchestrator.checkpointer.load(result.workflow_id)
+            assert checkpoint['startup_id'] == startup_id and checkpoint['status'] == 'completed'
+            assert set(checkpoint['steps']) == {'niche_research', 'mvp_design'}
+        assert results['s1'].workflow_id != results['s2'].workflow_id
+
+    def test_resume_reuses_checkpointed_steps(self, make_orchestrator):
+        """Test resume_workflow skips finished steps and feeds their restored results downstream."""
+        research, design = StubAgent('niche_research'), StubAgent('mvp_design', fail=True)
+        orchestrator = make_orchestrator([research, design])
+
+        first = asyncio.run(orchestrator.execute_enhanced_workflow(self._workflow('niche_research', 'mvp_design')))
+        assert first.steps_completed == ['niche_research'] and first.steps_failed == ['mvp_design']
+
+        design.fail = False
+        resumed = asyncio.run(orchestrator.resume_workflow(first.workflow_id))
+
+        assert resumed.workflow_id == first.workflow_id
+        assert resumed.steps_completed == ['niche_research', 'mvp_design']
+        assert len(research.calls) == 1
+        assert resumed.results['niche_research'] == {'analysis': 'niche_research output'}
+        assert '- niche_research: niche_research output' in design.calls[-1]['requirements']
+        assert orchestrator.checkpointer.load(first.workflow_id)['status'] == 'completed'
+
+    def test_stream_yields_events_in_order(self, make_orchestrator):
+        """Test stream_workflow_events reports the start, each step as it finishes, then the summary."""
+        orchestrator = make_orchestrator([StubAgent('niche_research'), StubAgent('mvp_design', fail=True)])
+
+        async def collect():
+            return [event async for event in orchestrator.stream_workflow_events(
+                self._workflow('niche_research', 'mvp_design')
+            )]
+
+        events = asyncio.run(collect())
+
+        assert [event['event'] for event in events] == [
+            'workflow_started', 'step_completed', 'step_failed', 'workflow_completed'
+        ]
+        assert events[0]['steps'] == ['niche_research', 'mvp_design']
+        assert events[1]['step'] == 'niche_research' and events[1]['data'] == {'analysis': 'niche_research output'}
+        assert events[2]['step'] == 'mvp_design' and 'crashed' in events[2]['error']
+        assert events[3]['steps_completed'] == ['niche_research'] and events[3]['steps_failed'] == ['mvp_design']
+        assert len({event['workflow_id'] for event in events}) == 1
+
+    def test_closing_stream_cancels_remaining_steps(self, make_orchestrator):
+        """Test closing the event stream early cancels the running and pending steps."""
+        research = StubAgent('niche_research')
+        design = StubAgent('mvp_design', delay=0.5)
+        marketing = StubAgent('marketing_strategy')
+        orchestrator = make_orchestrator([research, design, marketing])
+
+        async def consume_first_step():
+            stream = orchestrator.stream_workflow_events(
+                self._workflow('niche_research', 'mvp_design', 'marketing_strategy')
+            )
+            seen = [(await stream.__anext__())['event'], (await stream.__anext__())['event']]
+            await stream.aclose()
+            await asyncio.sleep(0.7)
+            return seen
+
+        assert asyncio.run(consume_first_step()) == ['workflow_started', 'step_completed']
+        assert len(design.calls) == 1
+        assert marketing.calls == []
+
+    def test_dependent_step_receives_bounded_upstream_output(self, make_orchestrator, monkeypatch):
+        """Test a dependent step's input carries each upstream output within upstream_context_chars."""
+        from config import config
+        monkeypatch.setattr(config.workflow, 'upstream_context_chars', 20)
+        design = StubAgent('mvp_design')
+        orchestrator = make_orchestrator([StubAgent('niche_research'), StubAgent('content_creation'), design])
+        workflow = {'steps': [
+            {'agent_type': 'niche_research', 'dependencies': [], 'retry_count': 0},
+            {'agent_type': 'content_creation', 'dependencies': [], 'retry_count': 0},
+            {'agent_type': 'mvp_design', 'dependencies': ['niche_research', 'content_creation'], 'retry_count': 0}
+        ]}
+
+        result = asyncio.run(orchestrator.execute_enhanced_workflow(workflow))
+
+        assert result.steps_completed == ['niche_research', 'content_creation', 'mvp_design']
+        requirements = design.calls[0]['requirements']
+        assert requirements.startswith('Simple, intuitive interface with AI assistance\n\nResults from earlier steps:')
+        # 20 characters split over two upstream steps
+        assert '- niche_research: niche_rese\n' in requirements
+        assert requirements.endswith('- content_creation: content_cr')
+
+
+class TestSwarmDispatcher:
+    """Test priority dispatch, timeouts and cancellation in the agent swarm."""
+
+    def _swarm(self, monkeypatch, workers, executed):
+        import fakeredis
+        from config import config
+        from agent_swarm import DecentralizedAgentSwarm, SwarmNode, SwarmNodeType
+
+        monkeypatch.setattr(config.swarm, 'max_workers', workers)
+        swarm = DecentralizedAgentSwarm(fakeredis.FakeRedis(decode_responses=True))
+        swarm._get_system_load = lambda: 0.1
+        swarm.nodes['local'] = SwarmNode('local', SwarmNodeType.WORKER, '127.0.0.1', 1, ['general_computing'])
+
+        async def execute_local(task):
+            executed.append(task.payload['name'])
+            await asyncio.sleep(task.payload.get('delay', 0))
+            return {'name': task.payload['name']}
+
+        swarm._execute_local_task = execute_local
+        return swarm
+
+    def test_critical_task_overtakes_queued_backlog(self, monkeypatch):
+        """Test the most urgent task runs first and per-priority metrics are reported."""
+        from agent_swarm import TaskPriority
+
+        executed = []
+
+        async def run():
+            swarm = self._swarm(monkeypatch, 1, executed)
+            for i in range(5):
+                await swarm.submit_task('generic', {'name': f"low{i}"}, priority=TaskPriority.LOW)
+            await swarm.submit_task('generic', {'name': 'urgent'}, priority=TaskPriority.CRITICAL)
+            queued = (await swarm.get_swarm_metrics()).queue_depth
+            await swarm.start_swarm()
+            await swarm.drain()
+            metrics = await swarm.get_swarm_metrics()
+            await swarm.stop_swarm()
+            return queued, metrics
+
+        queued, metrics = asyncio.run(run())
+        assert executed == ['urgent', 'low0', 'low1', 'low2', 'low3', 'low4']
+        assert queued == {'critical': 1, 'high': 0, 'medium': 0, 'low': 5}
+        assert metrics.completed_tasks == 6 and metrics.workers == 1
+        assert sum(metrics.queue_depth.values()) == 0
+        assert metrics.priority_latency['low']['dispatched'] == 5
+        assert metrics.priority_latency['low']['average_wait'] >= metrics.priority_latency['critical']['average_wait']
+
+    def test_timeouts_and_cancellation(self, monkeypatch):
+        """Test timed-out, running and queued tasks stop without losing workers."""
+        from agent_swarm import TaskStatus
+
+        executed = []
+
+        async def run():
+            swarm = self._swarm(monkeypatch, 2, executed)
+            queued = await swarm.submit_task('generic', {'name': 'queued'})
+            assert await swarm.cancel_task(queued)
+            slow = await swarm.submit_task('generic', {'name': 'slow', 'delay': 10}, timeout=0.05)
+            stuck = await swarm.submit_task('generic', {'name': 'stuck', 'delay': 10})
+            await swarm.start_swarm()
+            await asyncio.sleep(0.01)
+            assert await swarm.cancel_task(stuck)
+            await swarm.drain()
+            after = await swarm.submit_task('generic', {'name': 'after'})
+            await swarm.drain()
+            metrics = await swarm.get_swarm_metrics()
+            await swarm.stop_swarm()
+            return swarm, queued, slow, stuck, after, metrics
+
+        swarm, queued, slow, stuck, after, metrics = asyncio.run(run())
+        assert 'queued' not in executed
+        assert swarm.tasks[queued].status == TaskStatus.CANCELLED
+        assert swarm.tasks[slow].status == TaskStatus.TIMEOUT
+        assert swarm.tasks[stuck].status == TaskStatus.CANCELLED
+        assert swarm.tasks[after].status == TaskStatus.COMPLETED
+        assert metrics.cancelled_tasks == 2 and metrics.timed_out_tasks == 1
+        assert metrics.running_tasks == 0
@@ -9,9 +9,11 @@ import base64
 import hashlib
 import logging
 import smtplib
+import threading
 import requests
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from pathlib import Path
 from functools import wraps
 from ratelimit import limits, sleep_and_retry
@@ -183,6 +185,77 @@ class SecretsManager:
             return None
 
 
+CONTENT_SAFETY_LABELS = (
+    'toxicity', 'severe_toxicity', 'obscene',
+    'threat', 'insult', 'identity_attack'
+)
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache."""
+
+    def __init__(self, max_size: int = 1024):
+        """Initialize cache with maximum number of entries."""
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value and mark it as recently used."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        """Set value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_detoxify_model = None
+_detoxify_load_failed = False
+_detoxify_lock = threading.Lock()
+_content_safety_cache = LRUCache(config.security.content_safety_cache_size)
+
+
+def get_detoxify_model():
+    """Get the process-wide Detoxify model, loading it on first use."""
+    global _detoxify_model, _detoxify_load_failed
+    if not DETOXIFY_AVAILABLE or _detoxify_load_failed:
+        return None
+    if _detoxify_model is None:
+        with _detoxify_lock:
+            if _detoxify_model is None and not _detoxify_load_failed:
+                try:
+                    _detoxify_model = Detoxify('original')
+                except Exception as e:
+                    logger.warning(f"Failed to load Detoxify model: {e}")
+                    _detoxify_load_failed = True
+    return _detoxify_model
+
+
+def _content_safety_key(text: str) -> str:
+    """Cache key for content safety results."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
 class SecurityUtils:
     """Enhanced security utilities for encryption and content safety."""
 
@@ -208,22 +281,62 @@ class SecurityUtils:
 
     def check_content_safety(self, text: str) -> Dict[str, float]:
         """Check content safety using Detoxify or fallback."""
-        if DETOXIFY_AVAILABLE:
+        return self.check_content_safety_batch([text])[0]
+
+    def check_content_safety_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Check content safety for many texts in a single model pass.
+
+        Results are served from a process-wide LRU cache keyed by text hash;
+        only cache misses are sent to the model.
+        """
+        results: List[Optional[Dict[str, float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+
+        for index, text in enumerate(texts):
+            key = _content_safety_key(text)
+            cached = _content_safety_cache.get(key)
+            if cached is not None:
+                results[index] = dict(cached)
+            else:
+                pending.setdefault(key, []).append(index)
+
+        if pending:
+            keys = list(pending)
+            unique_texts = [texts[pending[key][0]] for key in keys]
+            scores, from_model = self._score_content_safety(unique_texts)
+            for key, score in zip(keys, scores):
+                # Keyword scores are a stopgap; rescore once the model is back
+                if from_model:
+                    _content_safety_cache.set(key, score)
+                for index in pending[key]:
+                    results[index] = dict(score)
+
+        return results
+
+    def _score_content_safety(self, texts: List[str]) -> Tuple[List[Dict[str, float]], bool]:
+        """Score texts with the shared Detoxify model, falling back to keywords.
+
+        Returns the scores and whether the model produced them.
+        """
+        model = get_detoxify_model()
+        if model is not None:
             try:
-                model = Detoxify('original')
-                results = model.predict(text)
-                return {
-                    'toxicity': results['toxicity'],
-                    'severe_toxicity': results['severe_toxicity'],
-                    'obscene': results['obscene'],
-                    'threat': results['threat'],
-                    'insult': results['insult'],
-                    'identity_attack': results['identity_attack']
-                }
+                predictions = model.predict(texts)
+                return [
+                    {
+                        label: float(predictions[label][i])
+                        for label in CONTENT_SAFETY_LABELS
+                    }
+                    for i in range(len(texts))
+                ], True
             except Exception as e:
                 logger.warning(f"Detoxify failed: {e}")
 
-        # Fallback: simple keyword-based check
+        return [self._keyword_content_safety(text) for text in texts], False
+
+    @staticmethod
+    def _keyword_content_safety(text: str) -> Dict[str, float]:
+        """Fallback: simple keyword-based check."""
         toxic_keywords = [
             'hate', 'violence', 'abuse', 'threat', 'kill', 'death',
             'scam', 'fraud', 'illegal', 'drugs', 'weapons'
@@ -0,0 +1,299 @@
+"""Durable checkpoints for enhanced workflow steps."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from config import config
+from workflow_scheduler import StepOutcome
+from write_buffer import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_TABLE = 'workflows'
+STEP_TABLE = 'workflow_steps'
+
+
+def encode_result(result: Any) -> str:
+    """Serialize a step result (pydantic model, dict or scalar) to JSON."""
+    if hasattr(result, 'model_dump'):
+        result = result.model_dump()
+    elif hasattr(result, 'dict'):
+        result = result.dict()
+    return json.dumps(result, default=str)
+
+
+class SQLiteCheckpointStore:
+    """Workflow and step checkpoints in a local SQLite file.
+
+    Like the Redis store's TTL, workflows not updated for ``ttl`` seconds are
+    deleted with their steps; pruning runs from the write path at most every
+    ``prune_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'workflow_checkpoints.db',
+        ttl: Optional[int] = None,
+        prune_interval: float = 3600.0
+    ):
+        """Initialize store; ``ttl`` of None keeps checkpoints forever."""
+        self.db_path = db_path
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS workflows (
+                workflow_id TEXT PRIMARY KEY,
+                startup_id TEXT,
+                config TEXT,
+                status TEXT,
+                updated_at REAL
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_steps (
+                workflow_id TEXT,
+                step TEXT,
+                result TEXT,
+                attempts INTEGER,
+                duration REAL,
+                PRIMARY KEY (workflow_id, step)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.commit()
+
+    def write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Upsert a batch of workflow or step rows."""
+        with self._lock:
+            if table == WORKFLOW_TABLE:
+                self._conn.executemany(
+                    '''INSERT INTO workflows (workflow_id, startup_id, config, status, updated_at)
+                       VALUES (:workflow_id, :startup_id, :config, :status, :updated_at)
+                       ON CONFLICT (workflow_id) DO UPDATE SET
+                           status = excluded.status,
+                           updated_at = excluded.updated_at,
+                           startup_id = COALESCE(excluded.startup_id, workflows.startup_id),
+                           config = COALESCE(excluded.config, workflows.config)''',
+                    rows
+                )
+            else:
+                self._conn.executemany(
+                    '''INSERT OR REPLACE INTO workflow_steps (workflow_id, step, result, attempts, duration)
+                       VALUES (:workflow_id, :step, :result, :attempts, :duration)''',
+                    rows
+                )
+            self._conn.commit()
+        if self.ttl is not None and time.time() - self._last_prune >= self.prune_interval:
+            self.prune(time.time() - self.ttl)
+
+    def prune(self, older_than: float) -> int:
+        """Delete workflows last updated before ``older_than`` and their steps."""
+        self._last_prune = time.time()
+        with self._lock:
+            self._conn.execute(
+                '''DELETE FROM workflow_steps WHERE workflow_id IN
+                   (SELECT workflow_id FROM workflows WHERE updated_at < ?)''',
+                (older_than,)
+            )
+            removed = self._conn.execute(
+                'DELETE FROM workflows WHERE updated_at < ?', (older_than,)
+            ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Pruned {removed} expired workflow checkpoints")
+        return removed
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Workflow row and its finished steps, or None."""
+        with self._lock:
+            workflow = self._conn.execute(
+                'SELECT startup_id, config, status FROM workflows WHERE workflow_id = ?',
+                (workflow_id,)
+            ).fetchone()
+            if workflow is None:
+                return None
+            steps = self._conn.execute(
+                'SELECT step, result, attempts, duration FROM workflow_steps WHERE workflow_id = ?',
+                (workflow_id,)
+            ).fetchall()
+        return {
+            'startup_id': workflow[0],
+            'config': workflow[1],
+            'status': workflow[2],
+            'steps': {
+                step: {'result': result, 'attempts': attempts, 'duration': duration}
+                for step, result, attempts, duration in steps
+            }
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCheckpointStore:
+    """Workflow checkpoints as one Redis hash per workflow, expiring after ``ttl``.
+
+    Step results are stored under the step name and workflow fields under
+    ``__<name>__``, so a status update never rewrites the stored config.
+    """
+
+    WORKFLOW_FIELDS = ('startup_id', 'config', 'status')
+
+    def __init__(self, redis_client: redis.Redis, ttl: int):
+        self.redis_client = redis_client
+        self.ttl = ttl
+
+    def _key(self, workflow_id: str) -> str:
+        return f"workflow_checkpoint:{workflow_id}"
+
+    def write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Write a batch of workflow or step rows in one pipeline."""
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for row in rows:
+            key = self._key(row['workflow_id'])
+            if table == WORKFLOW_TABLE:
+                pipeline.hset(key, mapping={
+                    f"__{name}__": row[name] for name in self.WORKFLOW_FIELDS if row[name] is not None
+                })
+            else:
+                pipeline.hset(key, row['step'], json.dumps(
+                    {'result': row['result'], 'attempts': row['attempts'], 'duration': row['duration']}
+                ))
+            pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Workflow fields and its finished steps, or None."""
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in self.redis_client.hgetall(self._key(workflow_id)).items()
+        }
+        if '__status__' not in fields:
+            return None
+        checkpoint = {name: fields.pop(f"__{name}__", None) for name in self.WORKFLOW_FIELDS}
+        checkpoint['steps'] = {step: json.loads(value) for step, value in fields.items()}
+        return checkpoint
+
+    def close(self) -> None:
+        pass
+
+
+class WorkflowCheckpointer:
+    """Records workflow progress without blocking step execution.
+
+    Checkpoints are buffered and written in batches from a background
+    thread; ``load`` flushes first so it always sees every recorded step.
+    """
+
+    def __init__(self, store, flush_interval: float = 0.5, max_batch_size: int = 100):
+        """Initialize checkpointer over a SQLite or Redis checkpoint store."""
+        self.store = store
+        self.buffer = WriteBehindBuffer(
+            self.store.write,
+            max_batch_size=max_batch_size,
+            flush_interval=flush_interval
+        )
+
+    def begin(self, workflow_id: str, startup_id: str, workflow_config: Dict[str, Any]) -> None:
+        """Record that a workflow has started."""
+        self.buffer.add(WORKFLOW_TABLE, {
+            'workflow_id': workflow_id,
+            'startup_id': startup_id,
+            'config': json.dumps(workflow_config, default=str),
+            'status': 'running',
+            'updated_at': time.time()
+        })
+
+    def record_step(self, workflow_id: str, outcome: StepOutcome) -> None:
+        """Queue a successful step's result for persistence."""
+        if not outcome.success or outcome.restored:
+            return
+        self.buffer.add(STEP_TABLE, {
+            'workflow_id': workflow_id,
+            'step': outcome.name,
+            'result': encode_result(outcome.result),
+            'attempts': outcome.attempts,
+            'duration': outcome.duration
+        })
+
+    def finish(self, workflow_id: str, status: str) -> None:
+        """Record the final workflow status."""
+        self.buffer.add(WORKFLOW_TABLE, {
+            'workflow_id': workflow_id,
+            'startup_id': None,
+            'config': None,
+            'status': status,
+            'updated_at': time.time()
+        })
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Stored workflow with decoded config and step results; blocking."""
+        self.buffer.flush()
+        checkpoint = self.store.load(workflow_id)
+        if checkpoint is None:
+            return None
+        checkpoint['config'] = json.loads(checkpoint['config']) if checkpoint['config'] else {}
+        for step in checkpoint['steps'].values():
+            step['result'] = json.loads(step['result'])
+        return checkpoint
+
+    def flush(self) -> int:
+        """Write buffered checkpoints now; blocking."""
+        return self.buffer.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write counters for the checkpoint buffer."""
+        return {
+            'store': type(self.store).__name__,
+            'pending': sum(self.buffer.pending().values()),
+            **self.buffer.stats
+        }
+
+    def close(self) -> None:
+        """Write remaining checkpoints and release the store."""
+        self.buffer.close()
+        self.store.close()
+
+
+def create_checkpoint_store(backend: Optional[str] = None):
+    """Build the configured checkpoint store, falling back to SQLite."""
+    workflow_config = config.workflow
+    backend = backend or workflow_config.checkpoint_backend
+    if backend == 'none':
+        return None
+    if backend == 'redis':
+        try:
+            client = redis.Redis.from_url(workflow_config.checkpoint_redis_url)
+            client.ping()
+            return RedisCheckpointStore(client, workflow_config.checkpoint_ttl)
+        except Exception as e:
+            logger.warning(f"Redis checkpoint store unavailable, using SQLite: {e}")
+    elif backend != 'sqlite':
+        logger.warning(f"Unknown checkpoint backend '{backend}', using SQLite")
+    return SQLiteCheckpointStore(workflow_config.checkpoint_path, ttl=workflow_config.checkpoint_ttl)
+
+
+# Global workflow checkpointer instance
+_workflow_checkpointer: Optional[WorkflowCheckpointer] = None
+
+
+def get_workflow_checkpointer() -> Optional[WorkflowCheckpointer]:
+    """Get or create the process-wide workflow checkpointer; None when disabled."""
+    global _workflow_checkpointer
+    if _workflow_checkpointer is None:
+        store = create_checkpoint_store()
+        if store is None:
+            return None
+        _workflow_checkpointer = WorkflowCheckpointer(store, config.workflow.checkpoint_flush_interval)
+    return _workflow_checkpointer
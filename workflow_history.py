@@ -0,0 +1,187 @@
+"""Bounded workflow history with rolling aggregates and an on-disk archive."""
+
+import dataclasses
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import config
+from write_buffer import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLE = 'workflow_results'
+
+
+class WorkflowResultArchive:
+    """Full workflow results in SQLite, written in batches off the caller's path."""
+
+    def __init__(self, db_path: str = 'workflow_results.db', flush_interval: float = 2.0):
+        """Initialize archive."""
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_results (
+                workflow_id TEXT PRIMARY KEY,
+                startup_id TEXT,
+                timestamp TEXT,
+                payload TEXT
+            ) WITHOUT ROWID
+        ''')
+        self._conn.commit()
+        self.buffer = WriteBehindBuffer(self._write, flush_interval=flush_interval)
+
+    def _write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                '''INSERT OR REPLACE INTO workflow_results (workflow_id, startup_id, timestamp, payload)
+                   VALUES (:workflow_id, :startup_id, :timestamp, :payload)''',
+                rows
+            )
+            self._conn.commit()
+
+    def add(self, result: Any) -> None:
+        """Queue a full workflow result for storage."""
+        if dataclasses.is_dataclass(result):
+            payload = dataclasses.asdict(result)
+        else:
+            payload = dict(result) if isinstance(result, dict) else dict(vars(result))
+        self.buffer.add(ARCHIVE_TABLE, {
+            'workflow_id': payload['workflow_id'],
+            'startup_id': payload.get('startup_id'),
+            'timestamp': payload.get('timestamp'),
+            'payload': json.dumps(payload, default=str)
+        })
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Stored result as a dictionary, or None; blocking."""
+        self.buffer.flush()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM workflow_results WHERE workflow_id = ?', (workflow_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        """Write remaining results and close the database."""
+        self.buffer.close()
+        with self._lock:
+            self._conn.close()
+
+
+class WorkflowHistory:
+    """Recent workflow summaries plus aggregates over every workflow ever recorded.
+
+    Only the newest ``max_entries`` compact summaries (no step outputs) are
+    kept in memory. Totals and averages are updated as each workflow is
+    recorded, so status queries never scan the history, and full results go
+    to the archive when one is configured.
+    """
+
+    def __init__(self, max_entries: int = 1000, archive: Optional[WorkflowResultArchive] = None):
+        self.max_entries = max_entries
+        self.archive = archive
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.totals = {
+            'workflows': 0,
+            'successful_workflows': 0,
+            'steps_completed': 0,
+            'steps_failed': 0,
+            'total_cost': 0.0,
+            'total_execution_time': 0.0,
+            'step_success_rate_sum': 0.0
+        }
+        self.last_timestamp: Optional[str] = None
+
+    def record(self, result: Any) -> Dict[str, Any]:
+        """Add a finished workflow; returns its compact summary."""
+        completed = len(result.steps_completed)
+        failed = len(result.steps_failed)
+        summary = {
+            'workflow_id': result.workflow_id,
+            'startup_id': result.startup_id,
+            'success': result.success,
+            'steps_completed': list(result.steps_completed),
+            'steps_failed': list(result.steps_failed),
+            'total_cost': result.total_cost,
+            'execution_time': result.execution_time,
+            'timestamp': result.timestamp
+        }
+
+        totals = self.totals
+        totals['workflows'] += 1
+        totals['successful_workflows'] += int(bool(result.success))
+        totals['steps_completed'] += completed
+        totals['steps_failed'] += failed
+        totals['total_cost'] += result.total_cost
+        totals['total_execution_time'] += result.execution_time
+        if completed + failed:
+            totals['step_success_rate_sum'] += completed / (completed + failed)
+        self.last_timestamp = result.timestamp
+
+        self._entries[result.workflow_id] = summary
+        self._entries.move_to_end(result.workflow_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        if self.archive is not None:
+            try:
+                self.archive.add(result)
+            except Exception as e:
+                logger.error(f"Failed to archive workflow {result.workflow_id}: {e}")
+        return summary
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Compact summary of a recent workflow."""
+        return self._entries.get(workflow_id)
+
+    def load_full(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Full archived result including step outputs; blocking."""
+        return self.archive.get(workflow_id) if self.archive is not None else None
+
+    @property
+    def total_workflows(self) -> int:
+        """Workflows recorded, including those no longer held in memory."""
+        return self.totals['workflows']
+
+    @property
+    def average_success_rate(self) -> float:
+        """Mean per-workflow step success rate across all recorded workflows."""
+        workflows = self.totals['workflows']
+        return self.totals['step_success_rate_sum'] / workflows if workflows else 0.0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Recent summaries, oldest first."""
+        return iter(list(self._entries.values()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregates over every recorded workflow."""
+        workflows = self.totals['workflows']
+        return {
+            **self.totals,
+            'retained': len(self._entries),
+            'success_rate': self.totals['successful_workflows'] / workflows if workflows else 0.0,
+            'average_step_success_rate': self.average_success_rate,
+            'average_execution_time': self.totals['total_execution_time'] / workflows if workflows else 0.0,
+            'last_timestamp': self.last_timestamp
+        }
+
+
+# Global workflow result archive instance
+_result_archive: Optional[WorkflowResultArchive] = None
+
+
+def get_workflow_result_archive() -> Optional[WorkflowResultArchive]:
+    """Get or create the process-wide result archive; None when disabled."""
+    global _result_archive
+    if _result_archive is None and config.workflow.result_archive_path:
+        try:
+            _result_archive = WorkflowResultArchive(config.workflow.result_archive_path)
+        except sqlite3.Error as e:
+            logger.error(f"Workflow result archive unavailable: {e}")
+    return _result_archive
@@ -0,0 +1,263 @@
+"""Dependency-aware scheduling for workflow steps."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepOutcome:
+    """Result of running one workflow step."""
+
+    name: str
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    started_at: float = 0.0  # seconds since the run started
+    finished_at: float = 0.0
+    skipped: bool = False
+    restored: bool = False  # loaded from a checkpoint rather than run
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+
+class DAGScheduler:
+    """Runs workflow steps as soon as their dependencies have finished.
+
+    Steps are objects with ``agent_type``, ``dependencies``, ``priority``,
+    ``timeout``, ``retry_count`` and ``required`` attributes, such as
+    ``EnhancedWorkflowStep``. When more steps are ready than there are free
+    slots, the one with the longest estimated path to the end of the workflow
+    starts first, so slack branches never delay the critical path.
+    """
+
+    def __init__(
+        self,
+        steps: List[Any],
+        max_concurrent: int = 3,
+        duration_estimates: Optional[Dict[str, float]] = None,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        slot: Optional[Callable[[], AsyncContextManager]] = None
+    ):
+        """Initialize scheduler; raises ValueError for unknown dependencies or cycles.
+
+        ``slot`` returns a context manager entered around each attempt, outside
+        the step timeout, to share a wider concurrency budget.
+        """
+        self.steps = {step.agent_type: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Workflow step names must be unique")
+        self.max_concurrent = max(1, max_concurrent)
+        self.duration_estimates = duration_estimates or {}
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.slot = slot
+
+        self.dependencies: Dict[str, List[str]] = {}
+        self.dependents: Dict[str, List[str]] = {name: [] for name in self.steps}
+        for name, step in self.steps.items():
+            self.dependencies[name] = list(step.dependencies or [])
+            for dependency in self.dependencies[name]:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step {name} depends on unknown step {dependency}")
+                self.dependents[dependency].append(name)
+
+        self.order = self._topological_order()
+        self.rank = self._critical_path_ranks()
+        self.outcomes: Dict[str, StepOutcome] = {}
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm over the dependency graph."""
+        remaining = {name: len(deps) for name, deps in self.dependencies.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.steps):
+            cyclic = sorted(name for name, count in remaining.items() if count > 0)
+            raise ValueError(f"Workflow dependencies contain a cycle: {', '.join(cyclic)}")
+        return order
+
+    def _estimate(self, name: str) -> float:
+        """Expected duration of a step, defaulting to the mean of known steps."""
+        if name in self.duration_estimates:
+            return self.duration_estimates[name]
+        known = [value for key, value in self.duration_estimates.items() if key in self.steps]
+        return sum(known) / len(known) if known else 1.0
+
+    def _critical_path_ranks(self) -> Dict[str, float]:
+        """Estimated time from each step's start to the end of the workflow."""
+        rank: Dict[str, float] = {}
+        for name in reversed(self.order):
+            downstream = max((rank[dependent] for dependent in self.dependents[name]), default=0.0)
+            rank[name] = self._estimate(name) + downstream
+        return rank
+
+    async def run(
+        self,
+        execute: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        completed: Optional[Dict[str, StepOutcome]] = None,
+        on_outcome: Optional[Callable[[StepOutcome], None]] = None
+    ) -> Dict[str, StepOutcome]:
+        """Run every step and return outcomes by step name.
+
+        ``execute(step, upstream)`` receives the results of the step's
+        successful dependencies. A result with ``success`` set to False
+        counts as a failure. When a required step fails, everything that
+        depends on it is skipped; optional steps do not block dependents.
+        Outcomes passed in ``completed`` are treated as already finished, and
+        ``on_outcome`` is called as each step finishes or is skipped.
+        """
+        started = time.monotonic()
+        completed = {name: outcome for name, outcome in (completed or {}).items() if name in self.steps}
+        self.outcomes = dict(completed)
+        waiting = {
+            name: len(deps) for name, deps in self.dependencies.items() if name not in completed
+        }
+        sequence = itertools.count()
+        ready: List[tuple] = []
+
+        def push(name: str):
+            heapq.heappush(ready, (-self.rank[name], self.steps[name].priority, next(sequence), name))
+
+        def finish(outcome: StepOutcome):
+            self.outcomes[outcome.name] = outcome
+            if on_outcome is not None:
+                try:
+                    on_outcome(outcome)
+                except Exception as e:
+                    logger.error(f"Outcome callback for step {outcome.name} failed: {e}")
+            release(outcome)
+
+        def release(outcome: StepOutcome):
+            blocks = not outcome.success and self.steps[outcome.name].required
+            for dependent in self.dependents[outcome.name]:
+                if dependent not in waiting:
+                    continue
+                if blocks:
+                    del waiting[dependent]
+                    now = time.monotonic() - started
+                    finish(StepOutcome(
+                        dependent, False, error=f"Dependency {outcome.name} failed",
+                        started_at=now, finished_at=now, skipped=True
+                    ))
+                    continue
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    del waiting[dependent]
+                    push(dependent)
+
+        for name in self.order:
+            if waiting.get(name) == 0:
+                del waiting[name]
+                push(name)
+        for name in self.order:
+            if name in completed:
+                release(completed[name])
+
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrent:
+                    name = heapq.heappop(ready)[-1]
+                    task = asyncio.create_task(self._run_step(self.steps[name], execute, started))
+                    running[task] = name
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.pop(task)
+                    finish(task.result())
+        finally:
+            for task in running:
+                task.cancel()
+        return self.outcomes
+
+    async def _run_step(
+        self,
+        step: Any,
+        execute: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        started: float
+    ) -> StepOutcome:
+        """Run one step with its timeout, retrying with exponential backoff."""
+        name = step.agent_type
+        upstream = {
+            dependency: self.outcomes[dependency].result
+            for dependency in self.dependencies[name]
+            if self.outcomes[dependency].success
+        }
+        outcome = StepOutcome(name, False, started_at=time.monotonic() - started)
+        attempts = 1 + max(0, step.retry_count)
+        for attempt in range(attempts):
+            outcome.attempts = attempt + 1
+            try:
+                if self.slot is None:
+                    result = await asyncio.wait_for(execute(step, upstream), step.timeout)
+                else:
+                    async with self.slot():
+                        result = await asyncio.wait_for(execute(step, upstream), step.timeout)
+            except asyncio.TimeoutError:
+                outcome.error = f"Timed out after {step.timeout}s"
+            except Exception as e:
+                outcome.error = str(e)
+            else:
+                outcome.result = result
+                if getattr(result, 'success', True):
+                    outcome.success = True
+                    outcome.error = None
+                    break
+                outcome.error = getattr(result, 'message', 'Step reported failure')
+
+            if attempt + 1 < attempts:
+                logger.warning(f"Step {name} attempt {attempt + 1} failed: {outcome.error}")
+                await asyncio.sleep(min(self.retry_backoff * 2 ** attempt, self.max_retry_backoff))
+
+        outcome.finished_at = time.monotonic() - started
+        return outcome
+
+    def critical_path(self) -> List[str]:
+        """Chain of dependencies that finished last in the most recent run."""
+        ran = [
+            name for name, outcome in self.outcomes.items() if not (outcome.skipped or outcome.restored)
+        ]
+        if not ran:
+            return []
+        name = max(ran, key=lambda key: self.outcomes[key].finished_at)
+        path = [name]
+        while True:
+            finished = [dep for dep in self.dependencies[name] if dep in ran]
+            if not finished:
+                break
+            name = max(finished, key=lambda key: self.outcomes[key].finished_at)
+            path.append(name)
+        return list(reversed(path))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Timing summary for the most recent run."""
+        ran = [outcome for outcome in self.outcomes.values() if not (outcome.skipped or outcome.restored)]
+        makespan = max((outcome.finished_at for outcome in ran), default=0.0)
+        busy = sum(outcome.duration for outcome in ran)
+        path = self.critical_path()
+        return {
+            'makespan': makespan,
+            'step_time_total': busy,
+            'parallelism': busy / makespan if makespan > 0 else 0.0,
+            'critical_path': path,
+            'critical_path_time': sum(self.outcomes[name].duration for name in path),
+            'retries': sum(max(0, outcome.attempts - 1) for outcome in ran),
+            'skipped': [outcome.name for outcome in self.outcomes.values() if outcome.skipped],
+            'restored': [outcome.name for outcome in self.outcomes.values() if outcome.restored]
+        }
@@ -0,0 +1,437 @@
+"""Write-behind buffer for batched database inserts."""
+
+import asyncio
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Histogram, Counter
+from redis import exceptions as redis_exceptions
+from sqlalchemy import exc as sa_exc
+
+logger = logging.getLogger(__name__)
+
+DB_FLUSH_DURATION = Histogram(
+    'db_write_buffer_flush_duration_seconds',
+    'Write-behind buffer flush latency in seconds',
+    ['table']
+)
+
+DB_FLUSH_BATCH_SIZE = Histogram(
+    'db_write_buffer_batch_size',
+    'Rows written per write-behind buffer flush',
+    ['table'],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+DB_FLUSH_FAILURES = Counter(
+    'db_write_buffer_flush_failures_total',
+    'Failed write-behind buffer flushes',
+    ['table']
+)
+
+MAX_RETRY_BACKOFF = 60.0  # seconds between retries while the store is unreachable
+
+# Failures of the store itself rather than of the rows: retrying the same batch can succeed
+TRANSIENT_ERRORS = (
+    sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.DisconnectionError, sa_exc.TimeoutError,
+    sqlite3.OperationalError, sqlite3.InterfaceError,
+    redis_exceptions.ConnectionError, redis_exceptions.TimeoutError,
+    ConnectionError, TimeoutError
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed write should be retried as is (outage, lock, timeout)."""
+    return isinstance(error, TRANSIENT_ERRORS) or bool(getattr(error, 'connection_invalidated', False))
+
+
+def retry_backoff(failures: int, base: float) -> float:
+    """Exponential delay before the next attempt after consecutive transient failures."""
+    return min(base * 2 ** max(0, failures - 1), MAX_RETRY_BACKOFF)
+
+
+class WriteBehindBuffer:
+    """Groups rows by table and inserts them in batches.
+
+    Rows are flushed when a table reaches ``max_batch_size`` rows or when
+    ``flush_interval`` seconds have passed. Flushing happens on a daemon
+    thread so callers (including coroutines) never wait on the database.
+
+    When the store is unreachable (``is_transient_error``: operational,
+    connection and timeout errors) the rows are kept and the table is
+    retried with exponential backoff; only ``max_buffered_rows`` bounds
+    what is held. Any other failure is treated as bad data (e.g.
+    ``IntegrityError``/``DataError``): a batch failing ``max_attempts``
+    flushes in a row is retried one row at a time and the rows that still
+    fail are dropped, so one bad row cannot hold back the rest of its table.
+    """
+
+    def __init__(
+        self,
+        insert_rows: Callable[[str, List[Dict[str, Any]]], int],
+        max_batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_buffered_rows: int = 50000,
+        max_attempts: int = 3
+    ):
+        """Initialize buffer.
+
+        Args:
+            insert_rows: callable inserting a list of rows into a table name
+            max_batch_size: rows per insert, and the count that triggers an early flush
+            flush_interval: maximum seconds a row waits before being flushed
+            max_buffered_rows: rows kept per table before the oldest are dropped
+            max_attempts: consecutive data errors before a batch is split into rows
+        """
+        self.insert_rows = insert_rows
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows
+        self.max_attempts = max(1, max_attempts)
+
+        self._rows: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._head_failures: Dict[str, int] = defaultdict(int)  # failed inserts of each table's first batch
+        self._outage_failures: Dict[str, int] = defaultdict(int)  # consecutive transient failures per table
+        self._retry_at: Dict[str, float] = {}  # monotonic time before which a table is not retried
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {'rows_written': 0, 'flushes': 0, 'failures': 0, 'retries': 0, 'dropped': 0}
+        atexit.register(self.close)
+
+    def add(self, table: str, row: Dict[str, Any]) -> None:
+        """Buffer one row for a table."""
+        self.add_many(table, [row])
+
+    def add_many(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Buffer several rows for a table."""
+        if not rows:
+            return
+        self._ensure_thread()
+        with self._lock:
+            buffered = self._rows[table]
+            buffered.extend(rows)
+            overflow = len(buffered) - self.max_buffered_rows
+            if overflow > 0:
+                del buffered[:overflow]
+                self.stats['dropped'] += overflow
+                logger.warning(f"Write buffer for {table} full, dropped {overflow} rows")
+            should_flush = len(buffered) >= self.max_batch_size
+        if should_flush:
+            self._wakeup.set()
+
+    def pending(self) -> Dict[str, int]:
+        """Buffered row counts per table."""
+        with self._lock:
+            return {table: len(rows) for table, rows in self._rows.items() if rows}
+
+    def oldest_pending(self, table: str) -> Optional[Dict[str, Any]]:
+        """The longest-waiting buffered row for a table."""
+        with self._lock:
+            rows = self._rows.get(table)
+            return rows[0] if rows else None
+
+    def flush(self) -> int:
+        """Flush all buffered rows synchronously; returns rows written."""
+        return self._flush(respect_backoff=False)
+
+    def _flush(self, respect_backoff: bool) -> int:
+        """Flush buffered rows, optionally skipping tables still backing off after an outage."""
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                batches = {
+                    table: rows for table, rows in self._rows.items()
+                    if rows and not (respect_backoff and self._retry_at.get(table, 0) > now)
+                }
+                for table in batches:
+                    self._rows[table] = []
+
+            written = 0
+            for table, rows in batches.items():
+                for start in range(0, len(rows), self.max_batch_size):
+                    batch = rows[start:start + self.max_batch_size]
+                    try:
+                        written += self._insert(table, batch)
+                    except Exception as e:
+                        self.stats['failures'] += 1
+                        DB_FLUSH_FAILURES.labels(table=table).inc()
+                        if is_transient_error(e):
+                            self._back_off(table, rows[start:], e)
+                            break
+                        self._head_failures[table] += 1
+                        if self._head_failures[table] < self.max_attempts:
+                            logger.error(f"Write buffer flush for {table} failed: {e}")
+                            # Keep order: this batch and everything after it wait for the next flush
+                            self._requeue(table, rows[start:])
+                            break
+                        logger.error(
+                            f"Write buffer flush for {table} failed {self.max_attempts} times, "
+                            f"retrying {len(batch)} rows one at a time: {e}"
+                        )
+                        done, processed, error = self._insert_each(table, batch)
+                        written += done
+                        if error is not None:
+                            self._back_off(table, rows[start + processed:], error)
+                            break
+                    self._head_failures.pop(table, None)
+                    self._outage_failures.pop(table, None)
+                    self._retry_at.pop(table, None)
+
+            if batches:
+                self.stats['flushes'] += 1
+                self.stats['rows_written'] += written
+            return written
+
+    def _back_off(self, table: str, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Keep rows from a flush the store could not take and delay the table's next attempt."""
+        self._outage_failures[table] += 1
+        delay = retry_backoff(self._outage_failures[table], self.flush_interval)
+        self._retry_at[table] = time.monotonic() + delay
+        self.stats['retries'] += 1
+        logger.warning(
+            f"Write buffer flush for {table} failed ({error}); "
+            f"keeping {len(rows)} rows, retrying in {delay:.1f}s"
+        )
+        self._requeue(table, rows)
+
+    def _insert(self, table: str, batch: List[Dict[str, Any]]) -> int:
+        started = time.perf_counter()
+        self.insert_rows(table, batch)
+        DB_FLUSH_DURATION.labels(table=table).observe(time.perf_counter() - started)
+        DB_FLUSH_BATCH_SIZE.labels(table=table).observe(len(batch))
+        return len(batch)
+
+    def _insert_each(
+        self, table: str, batch: List[Dict[str, Any]]
+    ) -> Tuple[int, int, Optional[Exception]]:
+        """Insert a repeatedly failing batch row by row, dropping rows that fail.
+
+        Stops at the first transient error so the remaining rows can be kept.
+        Returns rows written, rows processed and that error, if any.
+        """
+        written = 0
+        for index, row in enumerate(batch):
+            try:
+                written += self._insert(table, [row])
+            except Exception as e:
+                if is_transient_error(e):
+                    return written, index, e
+                self.stats['dropped'] += 1
+                logger.error(f"Write buffer dropped a row for {table}: {e}")
+        return written, len(batch), None
+
+    def _requeue(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Put rows from a failed flush back in front of the buffer."""
+        with self._lock:
+            rows = rows + self._rows[table]
+            overflow = len(rows) - self.max_buffered_rows
+            if overflow > 0:
+                # Drop the oldest rows, as add_many does when the buffer is full
+                del rows[:overflow]
+                self.stats['dropped'] += overflow
+                logger.warning(f"Write buffer for {table} full, dropped {overflow} rows")
+            self._rows[table] = rows
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='db-write-buffer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Background flush loop."""
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush(respect_backoff=True)
+
+    def close(self) -> None:
+        """Stop the flush thread and write any remaining rows."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self._thread = None
+        self.flush()
+
+
+class AsyncBatchBuffer:
+    """Coalesces items produced by coroutines into batched async writes.
+
+    Items are flushed when ``max_batch_size`` are pending or after
+    ``flush_interval`` seconds. ``put`` waits once ``max_pending`` items are
+    buffered, so producers slow down instead of growing memory unbounded.
+    Transient failures (``is_transient_error``) keep the batch and back off
+    before retrying; ``max_pending`` bounds what is held meanwhile. A batch
+    failing any other way ``max_attempts`` flushes in a row is dropped, so
+    bad data cannot stall producers indefinitely.
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[List[Any]], Awaitable[Any]],
+        name: str = 'batch',
+        max_batch_size: int = 64,
+        flush_interval: float = 1.0,
+        max_pending: int = 1000,
+        max_attempts: int = 3
+    ):
+        """Initialize buffer.
+
+        Args:
+            flush_batch: coroutine function writing a list of items
+            name: label used in flush metrics
+            max_batch_size: items per write, and the count that triggers a flush
+            flush_interval: maximum seconds an item waits before being flushed
+            max_pending: buffered items at which ``put`` starts waiting
+            max_attempts: consecutive data errors before a batch is dropped
+        """
+        self.flush_batch = flush_batch
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max(1, max_attempts)
+
+        self._items: List[Any] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self._head_failures = 0  # consecutive failed writes of the batch at the front
+        self._outage_failures = 0  # consecutive transient failures
+        self._retry_at = 0.0  # monotonic time before which the flush task does not retry
+
+        self.stats = {
+            'items_written': 0, 'flushes': 0, 'failures': 0, 'retries': 0, 'dropped': 0,
+            'backpressure_waits': 0
+        }
+
+    def pending(self) -> int:
+        """Number of buffered items."""
+        return len(self._items)
+
+    def _bind_loop(self) -> None:
+        """Create loop-bound primitives when first used on a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._not_full = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = None
+
+    def _ensure_started(self) -> None:
+        """Start the flush task on the running event loop."""
+        self._bind_loop()
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+
+    async def put(self, item: Any) -> None:
+        """Buffer an item, waiting while the buffer is full."""
+        await self.put_many([item])
+
+    async def put_many(self, items: List[Any]) -> None:
+        """Buffer several items, waiting while the buffer is full."""
+        self._ensure_started()
+        for item in items:
+            while len(self._items) >= self.max_pending:
+                self.stats['backpressure_waits'] += 1
+                self._not_full.clear()
+                self._wakeup.set()
+                await self._not_full.wait()
+            self._items.append(item)
+        if len(self._items) >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write all buffered items; returns items written."""
+        self._bind_loop()
+        written = 0
+        async with self._flush_lock:
+            while self._items:
+                batch = self._items[:self.max_batch_size]
+                del self._items[:len(batch)]
+                self._not_full.set()
+
+                started = time.perf_counter()
+                try:
+                    await self.flush_batch(batch)
+                except Exception as e:
+                    self.stats['failures'] += 1
+                    DB_FLUSH_FAILURES.labels(table=self.name).inc()
+                    if is_transient_error(e):
+                        self._outage_failures += 1
+                        delay = retry_backoff(self._outage_failures, self.flush_interval)
+                        self._retry_at = time.monotonic() + delay
+                        self.stats['retries'] += 1
+                        logger.warning(
+                            f"Batch buffer flush for {self.name} failed ({e}); "
+                            f"keeping {len(batch)} items, retrying in {delay:.1f}s"
+                        )
+                        self._items[:0] = batch
+                        break
+                    self._head_failures += 1
+                    if self._head_failures >= self.max_attempts:
+                        self._head_failures = 0
+                        self.stats['dropped'] += len(batch)
+                        logger.error(
+                            f"Batch buffer flush for {self.name} failed {self.max_attempts} times, "
+                            f"dropped {len(batch)} items: {e}"
+                        )
+                        continue
+                    logger.error(f"Batch buffer flush for {self.name} failed: {e}")
+                    # Items are only appended at the back, so the same batch is retried next
+                    self._items[:0] = batch
+                    break
+                self._head_failures = 0
+                self._outage_failures = 0
+                self._retry_at = 0.0
+                DB_FLUSH_DURATION.labels(table=self.name).observe(time.perf_counter() - started)
+                DB_FLUSH_BATCH_SIZE.labels(table=self.name).observe(len(batch))
+                written += len(batch)
+                self.stats['flushes'] += 1
+        self.stats['items_written'] += written
+        return written
+
+    async def _run(self) -> None:
+        """Background flush loop."""
+        while not self._closing:
+            timeout = max(self.flush_interval, self._retry_at - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._closing and time.monotonic() < self._retry_at:
+                continue  # backing off after a transient failure
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the flush task and write any remaining items.
+
+        The task is allowed to finish its current batch rather than being
+        cancelled mid-write, which could lose or duplicate a batch.
+        """
+        if self._task and not self._task.done() and self._loop is asyncio.get_running_loop():
+            self._closing = True
+            self._wakeup.set()
+            try:
+                await self._task
+            finally:
+                self._closing = False
+        self._task = None
+        await self.flush()